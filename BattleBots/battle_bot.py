@@ -1,9 +1,17 @@
-import json
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from BattleBots.decision_executor import run_decision
 from Engine.team import Team
+from Engine.battle_state import BattleState
 from Engine.pokemon import create_pokemon_objects_from_json, EnemyPokemon
 from Engine.move import create_active_moves_list
-from constant_variable import ACTION
+from Engine.names import to_id
+from Engine.request import BattleRequest, LegalActions, parse_request, is_new_request, legal_actions
+from constant_variable import ACTION, SPECULATION_ENABLED, DECISION_DEADLINE
+from metrics import MAKE_ACTION_LATENCY, DECISION_TIMEOUTS, record_cache_lookup
+
+SPECULATION_CACHE = 'speculation'
 
 
 class BattleBot(ABC):
@@ -15,6 +23,7 @@ class BattleBot(ABC):
     Attributes:
         battle_id (str): The identifier for the current battle.
         player_id (NoneType): The identifier for the player controlled by the bot.
+        opponent (str): The name of the user the bot plays against, once known.
         sender: A tool for sending messages and commands in the battle.
         bot_team (Team): The team of the bot's Pokemon.
         enemy_team (Team): The team of the enemy's Pokemon.
@@ -22,6 +31,19 @@ class BattleBot(ABC):
         curr_pokemon_ref: The reference to the current Pokemon in battle.
         active_moves: The move list of the active pokemon's.
         turn (int): The current turn number in the battle.
+        turns_played (int): The last turn number announced by the server.
+        decision_latencies (list[float]): The seconds taken by every decision of the bot.
+        resyncing (bool): True when the battle was rejoined after a reconnection and waits for its next request.
+        enemy_aliases (dict[str, str]): Ids of the nicknames of enemy Pokemon, mapped to the ids of their species.
+        state (BattleState): The state of the battle, changed by the minor actions of the protocol.
+        request (BattleRequest): The last request of the server that was handled.
+        legal_actions (LegalActions): The legal actions of the last request, computed once when it's handled.
+        revealed_usage (set[tuple[str, str, str]]): The (species id, kind, name) revealed by the enemy Pokemon that
+                                                    were counted in the usage statistics.
+        speculation_enabled (bool): Whether the idle time between a choice and the next request is used to
+                                    precompute the decisions of the likely next states.
+        decision_deadline (float): The seconds a decision run by run_decision() may take on a thread or process
+                                   executor.
 
     Note:
         This class serves as a foundation for implementing specific bots that participate in battles.
@@ -30,6 +52,7 @@ class BattleBot(ABC):
     def __init__(self, battle_id: str, sender):
         self.battle_id = battle_id
         self.player_id = None
+        self.opponent = None
         self.sender = sender
         self.bot_team = Team()
         self.enemy_team = Team()
@@ -39,6 +62,18 @@ class BattleBot(ABC):
         self.active_moves = None
         # Data:
         self.turn = 0
+        self.turns_played = 0
+        self.decision_latencies = []
+        self.resyncing = False
+        self.enemy_aliases = {}
+        self.state = BattleState(self.resolve_pokemon)
+        self.request = None
+        self.legal_actions = LegalActions()
+        self.revealed_usage = set()
+        self.speculation_enabled = SPECULATION_ENABLED
+        self.decision_deadline = DECISION_DEADLINE
+        self._speculations = {}
+        self._speculation_task = None
 
     def get_bot_team(self):
         return self.bot_team
@@ -51,13 +86,27 @@ class BattleBot(ABC):
         """
         Get the count of bot's Pokemon that are not alive.
         """
+        if isinstance(bot_team, Team):
+            return bot_team.alive_count
         return sum(1 for pokemon in bot_team if pokemon.is_alive())
 
     @staticmethod
-    def find_enemy_pokemon_by_name(team, pokemon_name):
-        pokemon_name = pokemon_name.lower()
-        found_pokemon = next((pokemon for pokemon in team if pokemon_name in pokemon.name), None)
+    def find_enemy_pokemon_by_name(team, pokemon_name, aliases: dict[str, str] = None):
+        """
+        Find a Pokemon of a team by its species name, or by the nickname it uses in the protocol.
 
+        Args:
+            team (Team | list[Pokemon]): The Pokemon to look in.
+            pokemon_name (str): A species name or a nickname, e.g. "Indeedee-F" or "Indeedee".
+            aliases (dict[str, str], optional): Ids of nicknames mapped to the ids of their species.
+        """
+        pokemon_id = to_id(pokemon_name)
+        if aliases:
+            pokemon_id = aliases.get(pokemon_id, pokemon_id)
+        if isinstance(team, Team):
+            found_pokemon = team.get(pokemon_id)
+        else:
+            found_pokemon = next((pokemon for pokemon in team if pokemon.id == pokemon_id), None)
         if found_pokemon is None:
             raise ValueError(f'Error in looking for {pokemon_name}, an enemy pokemon. We have only {[pokemon.name for pokemon in team]}')
 
@@ -66,9 +115,39 @@ class BattleBot(ABC):
 
         return found_pokemon
 
+    def resolve_pokemon(self, ident: str):
+        """
+        Get the team and the object of a Pokemon of the protocol, e.g. "p2a: Pikachu".
+
+        Returns:
+            tuple[Team, Pokemon | None] | None: The team of the side and the Pokemon (None if it isn't known), or None
+            if the side of the bot isn't known yet.
+        """
+        if self.player_id is None:
+            return None
+        side, _, name = ident.partition(': ')
+        pokemon_id = to_id(name)
+        if side.startswith(self.player_id):
+            team = self.bot_team
+        else:
+            team = self.enemy_team
+            pokemon_id = self.enemy_aliases.get(pokemon_id, pokemon_id)
+        return team, team.get(pokemon_id) if pokemon_id else None
+
     # getters...
 
-    async def update_bot_team(self, request: str) -> None:
+    def accept_request(self, request: BattleRequest) -> bool:
+        """
+        Check whether a request is new to the battle, and keep it as the last request if so. Stale or duplicate
+        requests (by their rqid) are refused, except the repeated request of a rejoined battle.
+        """
+        last_rqid = self.request.rqid if self.request is not None else None
+        if not is_new_request(request, last_rqid, self.resyncing):
+            return False
+        self.request = request
+        return True
+
+    async def update_bot_team(self, request) -> None:
         """
         Updates the bot team's status and actions based on the provided JSON request.
 
@@ -77,33 +156,40 @@ class BattleBot(ABC):
         for the current Pokemon. Additionally, it updates the current turn and the reference to the currently active Pokemon.
 
         Args:
-            request (str): A JSON-formatted string containing information about the bot's team and battle state.
+            request (BattleRequest | str): The request, decoded once by the caller, or its JSON-formatted string.
 
         Returns:
             None
         """
+        request = parse_request(request)
+        self.legal_actions = legal_actions(request)
+
+        # The next state is known now: stop guessing it
+        self.stop_speculation()
 
         # To update the bot team, create updated objects and set them as the new team
         try:
             updated_team = create_pokemon_objects_from_json(request)
-            self.bot_team = updated_team
+            # The request doesn't carry the stat stages, so keep the ones of the previous objects
+            for pokemon in updated_team:
+                previous = self.bot_team.get(pokemon.id)
+                if previous is not None:
+                    pokemon.boosts = previous.boosts
+            self.bot_team = Team(updated_team)
 
         except RuntimeError:
             print("Error in update team")
 
-        # Parse the JSON data from the request
-        json_data = json.loads(request)
-
         # Increment the turn counter
         self.turn += 1
 
         # Checks if a switch is forced
-        if 'forceSwitch' in json_data.keys():
-            await self.make_action(self.sender, ACTION.SWITCH)
+        if request.force_switch is not None:
+            await self.take_action(self.sender, ACTION.SWITCH)
 
         # Check if the current pokemon is the active
-        elif 'active' in json_data.keys():
-            self.curr_pokemon_data = json_data['active']
+        elif request.active:
+            self.curr_pokemon_data = request.active
 
             # Gets its optional known_moves
             try:
@@ -117,17 +203,15 @@ class BattleBot(ABC):
                 print("Error in updating active known_moves")
 
         # Update the reference to the currently active Pokemon
-        for pokemon in self.bot_team:
-            print(f'%%% {pokemon.name} is active? {pokemon.active}')
-            if pokemon.active:
-                self.curr_pokemon_ref = pokemon
-                print("%%% done.")
+        active_pokemon = self.bot_team.get_active()
+        if active_pokemon is not None:
+            self.curr_pokemon_ref = active_pokemon
 
     async def update_enemy_team(self, pokemon_name: str, level: str, condition: str) -> None:
         """
         Updates the enemy team with the given Pokemon's information.
 
-        This function sets all enemy Pokemon to be inactive and then updates the data of the specified Pokemon. If the
+        This function makes the specified Pokemon the active one of the enemy team and updates its data. If the
         specified Pokemon is not known, it creates a new object and adds it to the enemy team.
 
         Args:
@@ -138,17 +222,12 @@ class BattleBot(ABC):
         Returns:
             None
         """
-        # Make every enemy Pokemon not active
-        for enemy_pokemon in self.enemy_team.team:
-            enemy_pokemon.active = False
-
-        # Get the object of the given Pokemon
-        found_pokemon = next((pokemon for pokemon in self.enemy_team.team if pokemon.name == pokemon_name), None)
+        # Make the given Pokemon the active one, and the previous active Pokemon not active
+        found_pokemon = self.enemy_team.set_active(pokemon_name)
 
         if found_pokemon is not None:
             # If the Pokemon is known, updates its data
-            found_pokemon.active = True
-            found_pokemon.curr_health = condition.split('/')[0]
+            self.enemy_team.update_condition(pokemon_name, condition)
         else:
             # If the Pokemon is not known yet, create an object and add it to the enemy team
             new_enemy_pokemon = EnemyPokemon(pokemon_name, level, condition)
@@ -161,8 +240,8 @@ class BattleBot(ABC):
         Call function to correctly choose the first pokemon to send.
         :param websocket: Websocket stream.
         """
-        order = ''.join([str(x[0]) for x in self.bot_team.team])
-        await self.sender.send(self.battle_id, f'/team {order}', str(self.turn))
+        order = ''.join(str(index + 1) for index in range(len(self.bot_team)))
+        await self.sender.send_message(self.battle_id, f'/team {order}')
 
     @abstractmethod
     async def make_action(self, sender, forced_action=ACTION.NONE):
@@ -181,62 +260,141 @@ class BattleBot(ABC):
         """
         pass
 
-    async def make_move(self, value: int):
+    async def take_action(self, sender, forced_action=ACTION.NONE):
         """
-        Sends a move command to the server.
+        Make a battle action and record how long the decision took.
 
         Args:
-            value (int): The index of the move to make.
+            sender:  A  tool for sending messages and commands.
+            forced_action (ACTION, optional): A forced action to be performed. Defaults to `ACTION.NONE`.
         """
-        await self.sender.send_move(self.battle_id, value + 1)
+        start = time.perf_counter()
+        try:
+            await self.make_action(sender, forced_action)
+        finally:
+            latency = time.perf_counter() - start
+            self.decision_latencies.append(latency)
+            MAKE_ACTION_LATENCY.labels(type(self).__name__).observe(latency)
+        self.start_speculation()
+
+    async def run_decision(self, function, state):
+        """
+        Run the CPU-heavy part of a decision on the decision executor, so the loop keeps handling the other battles.
+
+        Args:
+            function: A module-level function of the state, which can be sent to a worker process.
+            state: The compact state of the decision: arrays, tuples and numbers rather than the objects of the battle.
+
+        Returns:
+            The result of the function, or None if the decision wasn't done by the deadline (the bot then falls back
+            to a cheap choice). Only decisions run on a thread or process executor have a deadline: an inline decision
+            always runs to the end.
+        """
+        try:
+            return await run_decision(function, state, self.decision_deadline)
+        except TimeoutError:
+            DECISION_TIMEOUTS.labels(type(self).__name__).inc()
+            print(f'The decision of {self.battle_id} took more than {self.decision_deadline}s and was cancelled')
+            return None
 
-    def move_validity(self, value: int) -> bool:
+    def legal_choices(self, forced_action=ACTION.NONE) -> tuple[tuple[int, ...], tuple[int, ...]]:
         """
-        Checks if a move is valid based on PP and disabled status.
+        Get the legal moves and switches of the last request, restricted to the forced action if there is one.
 
         Args:
-            value (int): The index of the move to check.
+            forced_action (ACTION, optional): ACTION.MOVE or ACTION.SWITCH to allow only moves or only switches.
 
         Returns:
-            bool: True if the move is valid, False otherwise.
+            tuple[tuple[int, ...], tuple[int, ...]]: The indexes of the legal moves and of the legal switches.
+        """
+        moves = () if forced_action == ACTION.SWITCH else self.legal_actions.moves
+        switches = () if forced_action == ACTION.MOVE else self.legal_actions.switches
+        return moves, switches
+
+    # Speculative precomputation...
+
+    def speculative_states(self) -> list[tuple]:
         """
-        if value not in [0, 1, 2, 3]:
-            raise ValueError(f'The index of the move - {value} - is bad!')
+        Get the likely next states of the battle, whose decisions are worth precomputing while the opponent thinks.
 
-        if len(self.active_moves) == 1:
-            # If there is only one move, it must be possible
-            return True
+        Bots that support speculation override this method and precompute().
 
-        return self.active_moves[value].is_possible()
+        Returns:
+            list[tuple]: (key, state) pairs, where the key identifies the state as decision_key() would.
+        """
+        return []
 
-    async def make_switch(self, value: int):
+    async def precompute(self, state):
         """
-        Sends a switch command to the server.
+        Compute the data of the decision of a speculated state (e.g. the utilities of the greedy bot), e.g. with
+        run_decision().
 
-        Args:
-            value (int): The index of the Pokemon to switch to.
+        Returns:
+            The data of the decision, or None if it couldn't be computed.
         """
-        await self.sender.send_switch(self.battle_id, value + 1)
+        return None
 
-    def switch_validity(self, value: int) -> bool:
+    def start_speculation(self) -> None:
+        """
+        Precompute the decisions of the likely next states in the background, one state per loop iteration, so the
+        messages of the server are still handled at once.
+        """
+        self.stop_speculation()
+        self._speculations = {}
+        if not self.speculation_enabled:
+            return
+        states = self.speculative_states()
+        if states:
+            self._speculation_task = asyncio.get_running_loop().create_task(self._speculate(states))
+
+    def stop_speculation(self) -> None:
+        """
+        Cancel the precomputation that is still running. The decisions that are ready are kept.
         """
-        Checks if a switch is valid based on the chosen Pokemon's condition.
+        if self._speculation_task is not None:
+            self._speculation_task.cancel()
+            self._speculation_task = None
+
+    async def _speculate(self, states: list[tuple]) -> None:
+        for key, state in states:
+            await asyncio.sleep(0)  # Let the loop handle the frames that arrived meanwhile
+            if key not in self._speculations:
+                try:
+                    data = await self.precompute(state)
+                    if data is not None:
+                        self._speculations[key] = data
+                except Exception as exception:
+                    # A guess that can't be computed is simply not used
+                    print(f'Speculation of {key} failed: {exception!r}')
+
+    def take_speculation(self, key):
+        """
+        Get the precomputed data of a decision, if its state was speculated.
 
         Args:
-            value (int): The index of the Pokemon to switch to.
+            key: The key of the current state, as returned by the bot's decision_key().
 
         Returns:
-            bool: True if the switch is valid, False otherwise.
+            The precomputed data, or None if the current state wasn't speculated (then it is computed as usual).
+        """
+        data = self._speculations.get(key) if key is not None else None
+        record_cache_lookup(SPECULATION_CACHE, data is not None)
+        return data
+
+    async def make_move(self, value: int):
         """
-        if value not in [0, 1, 2, 3, 4, 5]:
-            raise ValueError(f'The index of the move - {value} - is bad!')
+        Sends a move command to the server.
 
-        chosen_pokemon = self.bot_team[value]
+        Args:
+            value (int): The index of the move to make.
+        """
+        await self.sender.send_move(self.battle_id, value + 1)
 
-        # Can't switch to a fainted pokemon
-        if chosen_pokemon.curr_health == 0:
-            return False
-        # Can't switch to the active pokemon
-        if chosen_pokemon.active:
-            return False
-        return True
+    async def make_switch(self, value: int):
+        """
+        Sends a switch command to the server.
+
+        Args:
+            value (int): The index of the Pokemon to switch to.
+        """
+        await self.sender.send_switch(self.battle_id, value + 1)
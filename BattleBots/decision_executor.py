@@ -0,0 +1,99 @@
+"""
+decision_executor.py - Decision Executor Module
+
+This module runs the CPU-heavy part of the decisions of the bots off the event loop, so that a long decision in one
+battle doesn't delay the frames of every other battle. The executor is shared by the bots of every battle:
+    - INLINE: no executor, the decision runs on the loop (the default).
+    - THREAD: a pool of threads, enough for work that releases the GIL (e.g. the NumPy forward pass of the learned bot).
+    - PROCESS: a pool of processes, for pure Python work on several cores. The decision function and its state are
+      pickled to the workers, so the function is a module-level function and the state is compact (arrays, tuples
+      and numbers, not the Pokemon objects of the battle).
+
+On a pool, a decision that isn't done by its deadline is cancelled and the bot falls back to a cheap choice. A worker
+that already started can't be interrupted: it finishes in the background and its result is dropped. An INLINE decision
+blocks the loop until it is done, so nothing can time it out: the deadline needs a THREAD or PROCESS executor.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+INLINE = 'inline'
+THREAD = 'thread'
+PROCESS = 'process'
+
+
+def create_executor(kind: str, workers: int = 0) -> Executor | None:
+    """
+    Create the executor of a kind of the configuration.
+
+    Args:
+        kind (str): INLINE, THREAD or PROCESS.
+        workers (int): The number of workers of the pool, 0 for the default of the pool (based on the CPU count).
+
+    Returns:
+        Executor | None: The pool, or None for INLINE.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    max_workers = workers or None
+    if kind == INLINE:
+        return None
+    if kind == THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='decision')
+    if kind == PROCESS:
+        # Workers are spawned rather than forked from a process running an event loop and its threads
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+    raise ValueError(f'Invalid decision executor {kind}, expected {INLINE}, {THREAD} or {PROCESS}')
+
+
+_executor = None
+
+
+def get_executor() -> Executor | None:
+    return _executor
+
+
+def set_executor(executor: Executor | None) -> Executor | None:
+    """
+    Replace the executor of the decisions. The previous executor isn't shut down.
+
+    Returns:
+        Executor | None: The previous executor.
+    """
+    global _executor
+    previous, _executor = _executor, executor
+    return previous
+
+
+def shutdown_executor() -> None:
+    """
+    Shut the executor down without waiting for its running decisions, and run the next decisions inline.
+    """
+    executor = set_executor(None)
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_decision(function, state, deadline: float = None):
+    """
+    Run a decision function on the executor, or on the loop if there is none.
+
+    Args:
+        function: A module-level function of the state.
+        state: The compact state of the decision.
+        deadline (float, optional): The seconds the decision may take. None waits for it. It is ignored without an
+                                    executor, as an inline decision can't be interrupted.
+
+    Returns:
+        The result of the function.
+
+    Raises:
+        TimeoutError: If the decision on the executor wasn't done by the deadline. It is cancelled if it didn't start
+                      yet.
+    """
+    executor = _executor
+    if executor is None:
+        return function(state)
+    future = asyncio.get_running_loop().run_in_executor(executor, function, state)
+    return await asyncio.wait_for(future, deadline)
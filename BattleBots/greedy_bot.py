@@ -1,6 +1,14 @@
 from BattleBots.battle_bot import BattleBot
-from Engine.utility_calculator import evaluate_attacking_move_utility, evaluate_enemy_move, evaluate_switch_utility, get_utilities
+from Engine.move import has_move_data
+from Engine.usage_stats import USAGE_STATS
+from Engine.utility_calculator import decision_state, likely_enemy_moves, score_moves
 from constant_variable import ACTION
+from Engine.matchup_matrix import MatchupMatrix
+
+
+def pokemon_signature(pokemon) -> tuple:
+    """The parts of a Pokemon that its utilities depend on"""
+    return pokemon.id, tuple(sorted(pokemon.boosts.items())), pokemon.status
 
 
 class GreedyBot(BattleBot):
@@ -8,11 +16,19 @@ class GreedyBot(BattleBot):
     A battle bot that makes decisions based on a greedy strategy.
 
     This bot evaluates the utility of available moves and switching options to make decisions during a battle.
-    It aims to maximize its utility by considering move effectiveness and predicted enemy moves.
+    It aims to maximize its utility by considering move effectiveness and predicted enemy moves. The moves are scored
+    on the decision executor, the switches are read from the matchup matrix of the battle.
+
+    Attributes:
+        enemy_pokemon (EnemyPokemon): The active enemy Pokemon.
+        matchups (MatchupMatrix): The scores of the bot's Pokemon against the known enemy Pokemon.
+        usage_stats (UsageStats): The revealed moves of every species, which predict the moves of the enemy.
     """
     def __init__(self, battle_id: str, sender):
         super().__init__(battle_id, sender)
         self.enemy_pokemon = None
+        self.matchups = MatchupMatrix()
+        self.usage_stats = USAGE_STATS
 
     async def update_enemy_team(self, pokemon_name: str, level: str, condition: str) -> None:
         """
@@ -30,7 +46,7 @@ class GreedyBot(BattleBot):
         await super().update_enemy_team(pokemon_name, level, condition)
 
         # Get a reference to the current enemy pokemon
-        curr_enemy_pokemon = next((pokemon for pokemon in self.enemy_team.team if pokemon.name == pokemon_name), None)
+        curr_enemy_pokemon = self.enemy_team.get_active()
 
         # If it wasn't found, it means there's a problem with the update method
         if curr_enemy_pokemon is None:
@@ -39,6 +55,57 @@ class GreedyBot(BattleBot):
         # Update the self.enemy_pokemon field
         self.enemy_pokemon = curr_enemy_pokemon
 
+    def decision_key(self, active_pokemon, enemy_pokemon):
+        """
+        Identify the inputs of score_moves(): the Pokemon that face each other (without their health, which the
+        utilities don't read), the known and likely moves of the enemy, the moves of the active Pokemon and the order
+        and lives of the bot team.
+
+        Returns:
+            tuple | None: The key of the state, or None if it's not complete.
+        """
+        if active_pokemon is None or enemy_pokemon is None or not self.active_moves:
+            return None
+        return (pokemon_signature(active_pokemon),
+                pokemon_signature(enemy_pokemon) + (tuple(move.name for move in enemy_pokemon.known_moves),
+                                                    tuple(likely_enemy_moves(enemy_pokemon, self.usage_stats))),
+                tuple(move.name for move in self.active_moves),
+                tuple((pokemon.id, pokemon.is_alive()) for pokemon in self.bot_team if pokemon is not active_pokemon))
+
+    def speculative_states(self) -> list[tuple]:
+        """
+        The likely states of the next request: the enemy stays (which is also the state of a forced switch, when the
+        active Pokemon faints), or the enemy switches to one of its known alive Pokemon. Only the states whose data is
+        already read are kept, so the idle time never waits for the data provider.
+        """
+        active_pokemon = self.curr_pokemon_ref
+        candidates = [self.enemy_pokemon]
+        candidates.extend(pokemon for pokemon in self.enemy_team
+                          if pokemon is not self.enemy_pokemon and pokemon.is_alive())
+
+        states = []
+        for enemy_pokemon in candidates:
+            key = self.decision_key(active_pokemon, enemy_pokemon)
+            if key is None:
+                continue
+            if not all(has_move_data(move_name) for move_name in likely_enemy_moves(enemy_pokemon, self.usage_stats)):
+                # Computed with the request instead, if it is its state
+                continue
+            states.append((key, decision_state(active_pokemon, enemy_pokemon, self.active_moves, self.usage_stats)))
+        return states
+
+    async def precompute(self, state):
+        return await self.run_decision(score_moves, state)
+
+    async def make_team_order(self):
+        """
+        Lead with the Pokemon that has the best matchups against the enemies of the team preview.
+        """
+        self.matchups.update(self.bot_team, self.enemy_team)
+        lead = self.matchups.best_lead(self.bot_team)
+        order = [lead] + [index for index in range(len(self.bot_team)) if index != lead]
+        await self.sender.send_message(self.battle_id, '/team ' + ''.join(str(index + 1) for index in order))
+
     async def make_action(self, sender, forced_action=ACTION.NONE):
         """
         Make a battle action based on a greedy strategy, considering moves and switching options.
@@ -51,70 +118,34 @@ class GreedyBot(BattleBot):
             ValueError: If all moves or switches are not available.
         """
 
-        # Get the crucial data
-        move_utilities, predicted_enemy_move, predicted_enemy_move_utility, switch_utilities = \
-            get_utilities(self.curr_pokemon_ref, self.enemy_pokemon, self.active_moves, self.bot_team)
-
-        # Set 2 variables to point on the best move and switch indexes, starting by 0
-        best_option_move_index = 0
-        best_option_switch_index = 0
-
-        if forced_action == ACTION.SWITCH:
-            # If the action must be an switch, use the best that possible
-            while True:
-                best_switch_index = switch_utilities[best_option_switch_index][0]
-
-                if self.switch_validity(best_switch_index):
-                    await super().make_switch(best_switch_index)
-                    break
-                else:
-                    # In case the i-th switch is not valid, use the i+1 switch
-                    best_option_switch_index += 1
-
-                if best_option_switch_index == 6:
-                    # If all switches are not possible and the program forced to use switch, it means there's a problem
-                    raise ValueError("All moves are not available")
-
-        elif forced_action == ACTION.MOVE:
-            # If the action must be an switch, use the best that possible
-            while True:
-                best_move_index = move_utilities[best_option_move_index][0]
-
-                if self.move_validity(best_move_index):
-                    await super().make_move(best_move_index)
-                    break
-                else:
-                    # In case the i-th move is not valid, use the i+1 move
-                    best_option_move_index += 1
-
-                if best_option_move_index == 4:
-                    # If all moves are not possible and the program forced to use move, it means there's a problem
-                    raise ValueError("All moves are not available")
+        active_pokemon, enemy_pokemon = self.curr_pokemon_ref, self.enemy_pokemon
+        # Score the moves, unless they were scored while waiting for this request
+        scores = self.take_speculation(self.decision_key(active_pokemon, enemy_pokemon))
+        if scores is None:
+            scores = await self.run_decision(score_moves, decision_state(active_pokemon, enemy_pokemon,
+                                                                         self.active_moves, self.usage_stats))
+        self.matchups.update(self.bot_team, self.enemy_team)
+        switch_utilities = self.matchups.switch_utilities(active_pokemon, self.bot_team, enemy_pokemon)
+
+        legal_moves, legal_switches = self.legal_choices(forced_action)
+        if scores is None:
+            # Past the deadline: the first legal move, or the best switch if no move is legal
+            move_utilities, predicted_enemy_move_utility = [(index, None, 0.0) for index in legal_moves], 0.0
+        else:
+            move_utilities, predicted_enemy_move = scores
+            predicted_enemy_move_utility = predicted_enemy_move[2]
+
+        # Take the best legal move and switch, of the forced action if there is one
+        best_move = next((option for option in move_utilities if option[0] in legal_moves), None)
+        best_switch = next((option for option in switch_utilities if option[0] in legal_switches), None)
+
+        if best_move is None and best_switch is None:
+            # If all moves and switches are not available, it means there's a problem
+            raise ValueError("All switches and moves are not available")
 
+        # Decide to make move or switch based on their given utility
+        if best_switch is None or (best_move is not None
+                                   and best_switch[2] <= best_move[2] - predicted_enemy_move_utility):
+            await super().make_move(best_move[0])
         else:
-            while True:
-                # Calculate the utility of th best move and each switch
-                best_move_utility = move_utilities[best_option_move_index][2] - predicted_enemy_move_utility
-                best_move_index = move_utilities[best_option_move_index][0]
-                best_switch_utility = switch_utilities[best_option_switch_index][2]
-                best_switch_index = switch_utilities[best_option_switch_index][0]
-
-                if best_switch_utility <= best_move_utility:
-                    # Decide to make move or switch based on their given utility
-                    if self.move_validity(best_move_index):
-                        await super().make_move(best_move_index)
-                        break
-                    else:
-                        best_option_move_index += 1
-                else:
-                    if self.switch_validity(best_switch_index):
-                        await super().make_switch(best_switch_index)
-                        break
-                    else:
-                        best_option_switch_index += 1
-
-                if best_option_move_index == 4 and best_option_switch_index == 6:
-                    # If all moves and switches are not available, it means there's a problem
-                    await sender.send_message(super().battle_id, 'The bot has been crushed')
-                    await sender.forfeit(super().battle_id)
-                    raise ValueError("All switches and moves are not available")
+            await super().make_switch(best_switch[0])
@@ -0,0 +1,247 @@
+"""
+learned_bot.py - Learned Bot Module
+
+This module holds a battle bot that scores its actions with a small learned model: a multilayer perceptron (a linear
+model when it has a single layer) stored in a ".npz" file, as trained on the datasets of the replay ingestion.
+
+Every turn, the state and each legal action of the bot are turned into features (Engine/features.py), stacked into one
+matrix, and scored in a single forward pass with NumPy. The model of a file is loaded once per process and shared by
+the bots of every battle. The forward pass runs on the decision executor: only the path of the model (or the model)
+and the feature matrix are sent to it.
+
+    python -m BattleBots.learned_bot fit <dataset directory> <model path>
+"""
+import argparse
+import glob
+import os
+from BattleBots.battle_bot import BattleBot
+from Engine.features import STATE_FEATURES, ACTION_FEATURES, state_features, move_features, switch_features
+from constant_variable import ACTION, LEARNED_MODEL_PATH
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only the learned bot needs it
+    np = None
+
+INPUT_SIZE = len(STATE_FEATURES) + len(ACTION_FEATURES)
+
+
+class MLPModel:
+    """
+    A multilayer perceptron that scores (state, action) feature rows, with ReLU between its layers.
+
+    Attributes:
+        weights (list[np.ndarray]): The weights of every layer, of shape (inputs, outputs). The last layer has one
+                                    output, the score.
+        biases (list[np.ndarray]): The biases of every layer, of shape (outputs,).
+        mean (np.ndarray): The mean of every input feature, subtracted before the first layer.
+        scale (np.ndarray): The scale of every input feature, which divides it before the first layer.
+    """
+
+    def __init__(self, weights: list, biases: list, mean=None, scale=None):
+        if np is None:
+            raise ImportError('The learned bot needs NumPy, install it with "pip install numpy"')
+        if not weights or len(weights) != len(biases):
+            raise ValueError('A model needs the weights and the biases of every layer')
+        self.weights = [np.asarray(weight, dtype=np.float32) for weight in weights]
+        self.biases = [np.asarray(bias, dtype=np.float32).reshape(-1) for bias in biases]
+        if self.weights[0].shape[0] != INPUT_SIZE or self.weights[-1].shape[1] != 1:
+            raise ValueError(f'The model takes {self.weights[0].shape[0]} features and gives '
+                             f'{self.weights[-1].shape[1]} outputs, {INPUT_SIZE} features and 1 output are expected')
+        self.mean = np.zeros(INPUT_SIZE, dtype=np.float32) if mean is None else np.asarray(mean, dtype=np.float32)
+        self.scale = np.ones(INPUT_SIZE, dtype=np.float32) if scale is None else np.asarray(scale, dtype=np.float32)
+
+    def forward(self, features) -> 'np.ndarray':
+        """
+        Score a batch of feature rows.
+
+        Args:
+            features (np.ndarray): A matrix of shape (rows, INPUT_SIZE).
+
+        Returns:
+            np.ndarray: The score of every row.
+        """
+        outputs = (np.asarray(features, dtype=np.float32) - self.mean) / self.scale
+        last = len(self.weights) - 1
+        for index, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            outputs = outputs @ weight + bias
+            if index != last:
+                np.maximum(outputs, 0, out=outputs)
+        return outputs[:, 0]
+
+    def save(self, path: str) -> None:
+        """
+        Save the model to a ".npz" file, with the arrays W0, b0, W1, b1, ..., mean and scale.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        arrays = {'mean': self.mean, 'scale': self.scale}
+        for index, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'W{index}'] = weight
+            arrays[f'b{index}'] = bias
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'MLPModel':
+        """
+        Load a model saved by save().
+
+        Raises:
+            FileNotFoundError: If there is no model at the path.
+        """
+        if np is None:
+            raise ImportError('The learned bot needs NumPy, install it with "pip install numpy"')
+        with np.load(path) as arrays:
+            layers = sum(1 for name in arrays.files if name.startswith('W'))
+            return cls([arrays[f'W{index}'] for index in range(layers)],
+                       [arrays[f'b{index}'] for index in range(layers)],
+                       arrays['mean'] if 'mean' in arrays.files else None,
+                       arrays['scale'] if 'scale' in arrays.files else None)
+
+
+_models = {}  # Path -> MLPModel, loaded once per process
+
+
+def get_model(path: str) -> MLPModel:
+    """
+    Get the model saved at the path, loading it the first time.
+    """
+    model = _models.get(path)
+    if model is None:
+        model = _models[path] = MLPModel.load(path)
+    return model
+
+
+def score_features(state: tuple) -> list[float]:
+    """
+    Score the feature rows of a decision, in the process of the decision executor.
+
+    Args:
+        state (tuple): The path of the model (loaded once per process) or the model, and the feature matrix.
+    """
+    model, features = state
+    if isinstance(model, str):
+        model = get_model(model)
+    return model.forward(features).tolist()
+
+
+class LearnedBot(BattleBot):
+    """
+    A battle bot that takes the legal action with the best score of a learned model.
+
+    Attributes:
+        model (MLPModel): The model that scores the actions.
+        model_source (str | MLPModel): What the decision executor is sent to get the model: its path if it was loaded
+                                       from the configuration, else the model.
+    """
+
+    def __init__(self, battle_id: str, sender, model: MLPModel = None):
+        super().__init__(battle_id, sender)
+        self.model = model if model is not None else get_model(LEARNED_MODEL_PATH)
+        self.model_source = model if model is not None else LEARNED_MODEL_PATH
+
+    def candidate_actions(self, forced_action=ACTION.NONE) -> list[tuple[ACTION, int]]:
+        """
+        Get the legal actions of the bot, as (ACTION.MOVE or ACTION.SWITCH, index) tuples.
+        """
+        moves, switches = self.legal_choices(forced_action)
+        actions = [(ACTION.MOVE, index) for index in moves]
+        actions.extend((ACTION.SWITCH, index) for index in switches)
+        return actions
+
+    def action_features(self, actions: list[tuple[ACTION, int]]):
+        """
+        Build the feature matrix of the actions, one row per action.
+
+        Returns:
+            np.ndarray | None: The features, or None if the state isn't known well enough to score it.
+        """
+        active_pokemon = self.curr_pokemon_ref
+        enemy_pokemon = self.enemy_team.get_active()
+        if active_pokemon is None or enemy_pokemon is None:
+            return None
+
+        state = state_features(active_pokemon, enemy_pokemon, self.bot_team, self.enemy_team)
+        features = np.empty((len(actions), INPUT_SIZE), dtype=np.float32)
+        features[:, :len(STATE_FEATURES)] = state
+        for row, (action, index) in enumerate(actions):
+            if action == ACTION.MOVE:
+                features[row, len(STATE_FEATURES):] = move_features(self.active_moves[index], active_pokemon,
+                                                                    enemy_pokemon)
+            else:
+                features[row, len(STATE_FEATURES):] = switch_features(self.bot_team[index], enemy_pokemon)
+        return features
+
+    async def make_action(self, sender, forced_action=ACTION.NONE):
+        """
+        Make the legal action with the best score of the model.
+
+        Args:
+            sender (Sender): The sender object for communicating with the Pokemon Showdown server.
+            forced_action (ACTION): A forced action to take, if any (e.g., ACTION.SWITCH, ACTION.MOVE).
+
+        Raises:
+            ValueError: If no action is legal.
+        """
+        actions = self.candidate_actions(forced_action)
+        if not actions:
+            raise ValueError("All switches and moves are not available")
+
+        features = self.action_features(actions)
+        # Without features, or past the deadline, the first legal action is taken
+        scores = None if features is None else await self.run_decision(score_features, (self.model_source, features))
+        action, index = actions[0] if scores is None else actions[max(range(len(actions)), key=scores.__getitem__)]
+        if action == ACTION.MOVE:
+            await super().make_move(index)
+        else:
+            await super().make_switch(index)
+
+
+def fit_linear_model(directory: str, l2: float = 1e-3) -> MLPModel:
+    """
+    Fit a linear model of the outcome of the battles on the ".npz" shards of a dataset, by ridge regression.
+
+    Args:
+        directory (str): The directory of the shards, as written by "python -m Engine.replays ingest".
+        l2 (float): The weight of the L2 regularization.
+
+    Returns:
+        MLPModel: A model of one layer.
+    """
+    if np is None:
+        raise ImportError('Fitting a model needs NumPy, install it with "pip install numpy"')
+    # Accumulate the normal equations shard by shard, so the dataset doesn't have to fit in memory
+    gram = np.zeros((INPUT_SIZE + 1, INPUT_SIZE + 1))
+    moments = np.zeros(INPUT_SIZE + 1)
+    rows = 0
+    for path in sorted(glob.glob(os.path.join(directory, '*.npz'))):
+        with np.load(path) as shard:
+            features = np.hstack([shard['state'], shard['action'], np.ones((len(shard['outcome']), 1))])
+            gram += features.T @ features
+            moments += features.T @ shard['outcome']
+            rows += len(features)
+    if rows == 0:
+        raise ValueError(f'No ".npz" shard in {directory}')
+
+    regularization = l2 * rows * np.eye(INPUT_SIZE + 1)
+    regularization[-1, -1] = 0  # The bias isn't regularized
+    solution = np.linalg.solve(gram + regularization, moments)
+    return MLPModel([solution[:-1].reshape(-1, 1)], [solution[-1:]])
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m BattleBots.learned_bot', description='Manage the learned models.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    fit_command = commands.add_parser('fit', help='Fit a linear model on a dataset of replays.')
+    fit_command.add_argument('directory')
+    fit_command.add_argument('model')
+    fit_command.add_argument('--l2', type=float, default=1e-3)
+    args = parser.parse_args()
+
+    fit_linear_model(args.directory, args.l2).save(args.model)
+    print(f'Saved the model to {args.model}')
+
+
+if __name__ == '__main__':
+    main()
@@ -31,26 +31,20 @@ class RandomBot(BattleBot):
         """
         Perform a battle action in response to a game event.
 
-        This method makes battle actions based on a forced action or a random choice between move and switch.
+        This method makes a random legal move or switch, of the forced action if there is one, or of a random choice
+        between move and switch. If the chosen kind has no legal option, the other kind is used.
+
+        Raises:
+            ValueError: If no action is legal.
         """
+        moves, switches = self.legal_choices(forced_action)
+        if not moves and not switches:
+            raise ValueError("All switches and moves are not available")
+
         if forced_action is ACTION.NONE:
             forced_action = await self.pick_random_action()
 
-        if forced_action == ACTION.MOVE:
-            # move
-            while True:
-                random_number = random.randint(0, 3)
-                if self.move_validity(random_number):
-                    # Exit the loop when a valid pick is found
-                    break
-            # await sender.send_message(self.battle_id, "I picked a move")
-            await super().make_move(random_number)
+        if (forced_action == ACTION.MOVE and moves) or not switches:
+            await super().make_move(random.choice(moves))
         else:
-            # switch
-            while True:
-                random_number = random.randint(0, 5)
-                if self.switch_validity(random_number):
-                    # Exit the loop when a valid pick is found
-                    break
-            # await sender.send_message(self.battle_id, "I picked a switch")
-            await super().make_switch(random_number)
+            await super().make_switch(random.choice(switches))
@@ -0,0 +1,60 @@
+"""
+api.py - Data API Module
+
+This module fetches the data of Pokemon and moves from the data API. Every answer is kept in memory, so a species or a
+move is fetched once per process, however many battles or objects need it.
+"""
+import requests
+from metrics import DATA_FETCHES, record_cache_lookup
+from Engine.snapshot import register_section
+
+API_CACHE = 'api'
+
+_responses = {}
+
+
+def fetch_json(url: str) -> dict:
+    """
+    Get the JSON answer of the given API url, from the cache when it was fetched before.
+
+    Args:
+        url (str): The API url, e.g. "https://pokeapi.co/api/v2/pokemon/carbink".
+
+    Returns:
+        dict: The decoded answer.
+
+    Raises:
+        ValueError: If the answer is not a valid JSON (e.g. the name is unknown to the API).
+    """
+    response = _responses.get(url)
+    record_cache_lookup(API_CACHE, response is not None)
+    if response is None:
+        DATA_FETCHES.labels(resource_of(url)).inc()
+        response = requests.get(url).json()
+        _responses[url] = response
+    return response
+
+
+def resource_of(url: str) -> str:
+    """
+    Get the resource type of an API url, e.g. "pokemon" or "move".
+    """
+    parts = url.rstrip('/').split('/')
+    return parts[-2] if 2 <= len(parts) else 'unknown'
+
+
+def get_cached_responses() -> dict[str, dict]:
+    """
+    Get the cache of the API answers, keyed by url.
+    """
+    return _responses
+
+
+def load_cached_responses(responses: dict[str, dict]):
+    """
+    Add answers to the cache, e.g. from a snapshot.
+    """
+    _responses.update(responses)
+
+
+register_section('api', get_cached_responses, load_cached_responses)
@@ -0,0 +1,237 @@
+"""
+battle_state.py - Battle State Module
+
+This module keeps the state of a battle that the requests of the server don't carry: the health, status, stat stages,
+items and abilities of the enemy Pokemon, the stat stages of the bot's Pokemon, the conditions of each side (hazards,
+screens) and the weather and terrains of the field.
+
+The state is changed by the minor actions of the protocol ("-damage", "-boost", "-sidestart", ...), each applied as a
+small change to the Pokemon objects of the teams and to compact per-side state, so the bots read the current values
+without parsing the battle log again.
+"""
+from Engine.names import to_id
+
+MIN_STAGE = -6
+MAX_STAGE = 6
+
+
+def stage_clamp(stage: int) -> int:
+    return max(MIN_STAGE, min(MAX_STAGE, stage))
+
+
+def condition_id(condition: str) -> str:
+    """
+    Get the id of an effect of the protocol, e.g. "move: Stealth Rock" -> "stealthrock".
+    """
+    return to_id(condition.split(': ', 1)[-1])
+
+
+class SideState:
+    """
+    The conditions of a side of the battle.
+
+    Attributes:
+        player_id (str): The id of the side, e.g. "p1".
+        conditions (dict[str, int]): Ids of the side conditions, mapped to their layers (e.g. {'spikes': 2}).
+    """
+    __slots__ = ('player_id', 'conditions')
+
+    def __init__(self, player_id: str):
+        self.player_id = player_id
+        self.conditions = {}
+
+    def start(self, condition: str) -> None:
+        condition = condition_id(condition)
+        self.conditions[condition] = self.conditions.get(condition, 0) + 1
+
+    def end(self, condition: str) -> None:
+        self.conditions.pop(condition_id(condition), None)
+
+    def layers(self, condition: str) -> int:
+        return self.conditions.get(to_id(condition), 0)
+
+
+class BattleState:
+    """
+    Applies the minor actions of a battle to its state.
+
+    Attributes:
+        resolve: A function that gets a Pokemon of the protocol (e.g. "p2a: Pikachu") and returns its team and its
+                 object (None if the Pokemon isn't known), or None if the side isn't known.
+        sides (dict[str, SideState]): The state of each side, by its id.
+        weather (str | None): The current weather, e.g. "RainDance".
+        fields (set[str]): Ids of the current field conditions, e.g. {'electricterrain', 'trickroom'}.
+    """
+
+    def __init__(self, resolve):
+        self.resolve = resolve
+        self.sides = {}
+        self.weather = None
+        self.fields = set()
+        self._handlers = {
+            '-damage': self._set_condition,
+            '-heal': self._set_condition,
+            '-sethp': self._set_condition,
+            'faint': self._faint,
+            'switch': self._switch_out,
+            'drag': self._switch_out,
+            '-boost': self._boost,
+            '-unboost': self._unboost,
+            '-setboost': self._set_boost,
+            '-clearboost': self._clear_boost,
+            '-clearallboost': self._clear_all_boosts,
+            '-clearnegativeboost': self._clear_negative_boost,
+            '-invertboost': self._invert_boost,
+            '-status': self._status,
+            '-curestatus': self._cure_status,
+            '-sidestart': self._side_start,
+            '-sideend': self._side_end,
+            '-weather': self._weather,
+            '-fieldstart': self._field_start,
+            '-fieldend': self._field_end,
+            '-item': self._item,
+            '-enditem': self._end_item,
+            '-ability': self._ability,
+        }
+
+    def apply(self, command: str, rest: list[str]) -> bool:
+        """
+        Apply an action of the protocol to the state.
+
+        Args:
+            command (str): The command of the action, e.g. "-boost".
+            rest (list[str]): The arguments of the action, e.g. ["p2a: Pikachu", "atk", "2"].
+
+        Returns:
+            bool: True if the action changes the state, False if it's ignored (unknown or malformed).
+        """
+        handler = self._handlers.get(command)
+        if handler is None:
+            return False
+        try:
+            handler(rest)
+        except (IndexError, ValueError):
+            return False
+        return True
+
+    def side(self, player_id: str) -> SideState:
+        """
+        Get the state of a side by its id ("p1"), or by a Pokemon or a side of the protocol ("p1a: Pikachu").
+        """
+        player_id = player_id[:2]
+        side = self.sides.get(player_id)
+        if side is None:
+            side = self.sides[player_id] = SideState(player_id)
+        return side
+
+    def _pokemon(self, ident: str):
+        found = self.resolve(ident)
+        return (None, None) if found is None else found
+
+    def _set_condition(self, rest):
+        team, pokemon = self._pokemon(rest[0])
+        if pokemon is not None and 1 < len(rest):
+            team.update_condition(pokemon.id, rest[1])
+
+    def _faint(self, rest):
+        team, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            team.update_condition(pokemon.id, '0 fnt')
+            pokemon.boosts = {}
+
+    def _switch_out(self, rest):
+        # The stat stages of a Pokemon are reset when it leaves the field
+        team, _ = self._pokemon(rest[0])
+        if team is not None:
+            active = team.get_active()
+            if active is not None:
+                active.boosts = {}
+
+    def _change_boost(self, rest, sign: int):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            stat = rest[1]
+            stage = stage_clamp(pokemon.boosts.get(stat, 0) + sign * int(rest[2]))
+            self._put_boost(pokemon, stat, stage)
+
+    def _boost(self, rest):
+        self._change_boost(rest, 1)
+
+    def _unboost(self, rest):
+        self._change_boost(rest, -1)
+
+    def _set_boost(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            self._put_boost(pokemon, rest[1], stage_clamp(int(rest[2])))
+
+    @staticmethod
+    def _put_boost(pokemon, stat: str, stage: int):
+        if stage:
+            pokemon.boosts[stat] = stage
+        else:
+            pokemon.boosts.pop(stat, None)
+
+    def _clear_boost(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            pokemon.boosts = {}
+
+    def _clear_all_boosts(self, rest):
+        for player_id in ('p1', 'p2'):
+            team, _ = self._pokemon(f'{player_id}a: ')
+            active = team.get_active() if team is not None else None
+            if active is not None:
+                active.boosts = {}
+
+    def _clear_negative_boost(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            pokemon.boosts = {stat: stage for stat, stage in pokemon.boosts.items() if 0 < stage}
+
+    def _invert_boost(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            pokemon.boosts = {stat: -stage for stat, stage in pokemon.boosts.items()}
+
+    def _status(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None and 1 < len(rest):
+            pokemon.status = rest[1]
+
+    def _cure_status(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            pokemon.status = None
+
+    def _side_start(self, rest):
+        if 1 < len(rest):
+            self.side(rest[0]).start(rest[1])
+
+    def _side_end(self, rest):
+        if 1 < len(rest):
+            self.side(rest[0]).end(rest[1])
+
+    def _weather(self, rest):
+        self.weather = None if rest[0] == 'none' else rest[0]
+
+    def _field_start(self, rest):
+        self.fields.add(condition_id(rest[0]))
+
+    def _field_end(self, rest):
+        self.fields.discard(condition_id(rest[0]))
+
+    def _item(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None and 1 < len(rest):
+            pokemon.item = to_id(rest[1])
+
+    def _end_item(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None:
+            pokemon.item = None
+
+    def _ability(self, rest):
+        _, pokemon = self._pokemon(rest[0])
+        if pokemon is not None and 1 < len(rest):
+            pokemon.ability = to_id(rest[1])
@@ -0,0 +1,270 @@
+"""
+data_provider.py - Data Provider Module
+
+This module is where the Engine gets the static data of the species and the moves from. A provider answers entries of
+the dex format by the name of a species or a move, and three interchangeable backends exist:
+    - HttpProvider: the remote data API (PokeAPI), through the cached fetch_json().
+    - BundleProvider: a local pre-built bundle file, read once.
+    - InMemoryProvider: entries given in memory, e.g. the fixtures of the tests.
+
+The dex format:
+    species: {"name": "Carbink", "types": ["rock", "fairy"], "base_stats": {"hp": 50, "atk": 50, ...},
+              "abilities": ["clear-body", "sturdy"], "learnset": ["moonblast", ...]}
+    move: {"name": "Close Combat", "type": "fighting", "power": 120, "accuracy": 1.0, "priority": 0,
+           "category": "physical"}
+
+A bundle is a JSON file (gzip compressed if its name ends with ".gz") of {"version": 1, "species": {id: species},
+"moves": {id: move}, "typechart": {attacking type: {defending type: multiplier}}}, keyed by Showdown ids. The type chart
+is optional. Engine.showdown_import builds a bundle from Showdown's own data files.
+"""
+import gzip
+import json
+import os
+from abc import ABC, abstractmethod
+from Engine.api import fetch_json
+from Engine.names import SPECIES_INDEX, MOVE_INDEX, species_key, move_key, to_id
+
+BUNDLE_VERSION = 1
+
+HTTP = 'http'
+BUNDLE = 'bundle'
+
+# Define the mapping of long keys to short keys
+long_to_short_key_mapping = {
+    'hp': 'hp',
+    'attack': 'atk',
+    'defense': 'def',
+    'special-attack': 'spa',
+    'special-defense': 'spd',
+    'speed': 'spe'
+}
+
+
+class DataProvider(ABC):
+    """
+    A source of the static data of the species and the moves.
+    """
+
+    @abstractmethod
+    def species(self, name: str) -> dict:
+        """
+        Get the dex entry of a species.
+
+        Args:
+            name (str): The name of the species, as the protocol writes it (or its id).
+
+        Raises:
+            ValueError: If the species is unknown.
+        """
+
+    @abstractmethod
+    def move(self, name: str) -> dict:
+        """
+        Get the dex entry of a move.
+
+        Args:
+            name (str): The name of the move, as the protocol writes it (or its id).
+
+        Raises:
+            ValueError: If the move is unknown.
+        """
+
+    @abstractmethod
+    def species_keys(self) -> list[str]:
+        """
+        Get the keys of every species in the data source, from which the name index is built.
+        """
+
+    @abstractmethod
+    def move_keys(self) -> list[str]:
+        """
+        Get the keys of every move in the data source, from which the name index is built.
+        """
+
+
+class HttpProvider(DataProvider):
+    """
+    Answers from the remote data API, translating its answers to the dex format.
+    """
+    BASE_URL = "https://pokeapi.co/api/v2/"
+    LIST_QUERY = "/?limit=100000"
+
+    def species(self, name: str) -> dict:
+        response = fetch_json(self.BASE_URL + "pokemon/" + species_key(name))
+        return {'name': name,
+                'types': [type_info["type"]["name"] for type_info in response.get("types", [])],
+                'base_stats': {long_to_short_key_mapping[stat_info["stat"]["name"]]: stat_info["base_stat"]
+                               for stat_info in response.get("stats", [])},
+                'abilities': [info["ability"]["name"] for info in response.get("abilities", [])],
+                'learnset': [info["move"]["name"] for info in response.get("moves", [])]}
+
+    def move(self, name: str) -> dict:
+        response = fetch_json(self.BASE_URL + "move/" + move_key(name))
+        power = response.get("power")
+        accuracy = response.get("accuracy")
+        return {'name': name,
+                'type': response.get("type", {}).get("name"),
+                'power': 0 if power is None else int(power),
+                'accuracy': 1.0 if accuracy is None else float(accuracy) / 100.0,
+                'priority': int(response.get("priority")),
+                'category': response.get("damage_class", {}).get("name")}
+
+    def species_keys(self) -> list[str]:
+        return [result["name"] for result in fetch_json(self.BASE_URL + "pokemon" + self.LIST_QUERY)["results"]]
+
+    def move_keys(self) -> list[str]:
+        return [result["name"] for result in fetch_json(self.BASE_URL + "move" + self.LIST_QUERY)["results"]]
+
+
+class InMemoryProvider(DataProvider):
+    """
+    Answers from entries kept in memory, by their ids.
+
+    Attributes:
+        species_entries (dict[str, dict]): The dex entries of the species.
+        move_entries (dict[str, dict]): The dex entries of the moves.
+    """
+
+    def __init__(self, species: dict[str, dict] = None, moves: dict[str, dict] = None):
+        self.species_entries = {to_id(name): entry for name, entry in (species or {}).items()}
+        self.move_entries = {to_id(name): entry for name, entry in (moves or {}).items()}
+
+    def species(self, name: str) -> dict:
+        entry = self.species_entries.get(to_id(name))
+        if entry is None:
+            raise ValueError(f'Unknown species {name}')
+        return entry
+
+    def move(self, name: str) -> dict:
+        entry = self.move_entries.get(to_id(name))
+        if entry is None:
+            raise ValueError(f'Unknown move {name}')
+        return entry
+
+    def species_keys(self) -> list[str]:
+        return list(self.species_entries)
+
+    def move_keys(self) -> list[str]:
+        return list(self.move_entries)
+
+
+class BundleProvider(InMemoryProvider):
+    """
+    Answers from a local bundle file, read once when the provider is created.
+
+    Attributes:
+        path (str): The path of the bundle.
+        typechart (dict[str, dict[str, float]]): The damage multipliers of the attacking types against the defending
+                                                 types, if the bundle has them.
+    """
+
+    def __init__(self, path: str):
+        bundle = read_bundle(path)
+        super().__init__(bundle['species'], bundle['moves'])
+        self.path = path
+        self.typechart = bundle.get('typechart', {})
+
+
+def read_bundle(path: str) -> dict:
+    """
+    Read a bundle file.
+
+    Raises:
+        FileNotFoundError: If there is no bundle at the path.
+        ValueError: If the file isn't a bundle of this version.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        bundle = json.load(file)
+    if not isinstance(bundle, dict) or bundle.get('version') != BUNDLE_VERSION:
+        raise ValueError(f'{path} is not a bundle of version {BUNDLE_VERSION}')
+    return bundle
+
+
+def write_bundle(path: str, species: dict[str, dict], moves: dict[str, dict],
+                 typechart: dict[str, dict[str, float]] = None) -> int:
+    """
+    Write a bundle file. The file is replaced atomically.
+
+    Args:
+        path (str): The path of the bundle, compressed if it ends with ".gz".
+        species (dict[str, dict]): The dex entries of the species, by their ids.
+        moves (dict[str, dict]): The dex entries of the moves, by their ids.
+        typechart (dict[str, dict[str, float]], optional): The damage multipliers of the types.
+
+    Returns:
+        int: The size of the file in bytes.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.tmp'
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(temp_path, 'wt', encoding='utf-8') as file:
+        bundle = {'version': BUNDLE_VERSION, 'species': species, 'moves': moves}
+        if typechart:
+            bundle['typechart'] = typechart
+        json.dump(bundle, file, separators=(',', ':'))
+    os.replace(temp_path, path)
+    return os.path.getsize(path)
+
+
+def create_provider(kind: str, bundle_path: str = None) -> DataProvider:
+    """
+    Create the provider of a kind of the configuration.
+
+    Args:
+        kind (str): HTTP or BUNDLE.
+        bundle_path (str, optional): The path of the bundle, for BUNDLE.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    if kind == HTTP:
+        return HttpProvider()
+    if kind == BUNDLE:
+        return BundleProvider(bundle_path)
+    raise ValueError(f'Invalid data provider {kind}, expected {HTTP} or {BUNDLE}')
+
+
+_provider = HttpProvider()
+_reset_functions = []
+
+
+def register_reset(reset) -> None:
+    """
+    Register a function that clears data resolved from the provider, called when the provider is replaced.
+    """
+    _reset_functions.append(reset)
+
+
+def index_names(provider: DataProvider = None) -> int:
+    """
+    Build the name indexes from the keys of a provider, so the ids of the protocol are resolved in one lookup.
+
+    Args:
+        provider (DataProvider, optional): The provider, the current one by default.
+
+    Returns:
+        int: The number of indexed ids.
+    """
+    provider = provider or _provider
+    return SPECIES_INDEX.build(provider.species_keys()) + MOVE_INDEX.build(provider.move_keys())
+
+
+def get_provider() -> DataProvider:
+    return _provider
+
+
+def set_provider(provider: DataProvider) -> DataProvider:
+    """
+    Replace the provider, and clear the data resolved from the previous one.
+
+    Returns:
+        DataProvider: The previous provider.
+    """
+    global _provider
+    previous, _provider = _provider, provider
+    for reset in _reset_functions:
+        reset()
+    return previous
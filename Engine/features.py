@@ -0,0 +1,97 @@
+"""
+features.py - Features Module
+
+This module turns the Engine objects of a battle into fixed-length lists of numbers: the features of a state (from
+the point of view of one side) and the features of each action that side can take. The replay ingestion writes them
+to datasets, and the learned bot scores its actions with them, so both read a battle the same way.
+"""
+from Engine.move import MoveCategory
+from Engine.type import string_to_type, TypeChart
+from Engine.utility_calculator import evaluate_attacking_move_utility
+
+STAGES = ('atk', 'def', 'spa', 'spd', 'spe')
+
+STATE_FEATURES = (
+    ('own_hp', 'enemy_hp', 'own_alive', 'enemy_alive')
+    + tuple(f'own_{stat}_stage' for stat in STAGES)
+    + tuple(f'enemy_{stat}_stage' for stat in STAGES)
+    + ('own_status', 'enemy_status', 'own_effectiveness', 'enemy_effectiveness', 'speed_share')
+)
+
+ACTION_FEATURES = ('is_move', 'is_switch', 'power', 'accuracy', 'stab', 'effectiveness', 'physical', 'special',
+                   'priority', 'utility', 'switch_hp', 'switch_resistance', 'switch_effectiveness')
+
+MOVE_ACTION = 0
+SWITCH_ACTION = 1
+
+UTILITY_SCALE = 100.0  # A typical utility of a strong move, to keep the features near [0, 1]
+
+
+def hp_fraction(pokemon) -> float:
+    max_health = int(pokemon.max_health or 0)
+    if max_health <= 0:
+        return 0.0
+    return int(pokemon.curr_health) / max_health
+
+
+def type_effectiveness(attacking_types: list[str], defending_types: list[str]) -> float:
+    """
+    The best multiplier of the attacking types against the defending types.
+    """
+    best = 0.0
+    for attacking_type in attacking_types:
+        multiplier = 1.0
+        for defending_type in defending_types:
+            multiplier *= TypeChart.get_type_effectiveness(string_to_type(attacking_type), string_to_type(defending_type))
+        best = max(best, multiplier)
+    return best
+
+
+def state_features(own_active, enemy_active, own_team, enemy_team) -> list[float]:
+    """
+    Get the features of a state, from the point of view of the side of own_active.
+
+    Args:
+        own_active (Pokemon): The active Pokemon of the side.
+        enemy_active (Pokemon): The active Pokemon of the other side.
+        own_team (Team): The team of the side.
+        enemy_team (Team): The known Pokemon of the other side.
+
+    Returns:
+        list[float]: The values of STATE_FEATURES.
+    """
+    own_speed = own_active.get_stat('spe')
+    enemy_speed = enemy_active.get_stat('spe')
+    return ([hp_fraction(own_active), hp_fraction(enemy_active), own_team.alive_count / 6, enemy_team.alive_count / 6]
+            + [own_active.boosts.get(stat, 0) / 6 for stat in STAGES]
+            + [enemy_active.boosts.get(stat, 0) / 6 for stat in STAGES]
+            + [float(own_active.status is not None), float(enemy_active.status is not None),
+               type_effectiveness(own_active.types, enemy_active.types),
+               type_effectiveness(enemy_active.types, own_active.types),
+               own_speed / (own_speed + enemy_speed) if own_speed + enemy_speed else 0.5])
+
+
+def move_features(move, attacking_pokemon, defending_pokemon) -> list[float]:
+    """
+    Get the features of using a move of the active Pokemon against the enemy one.
+
+    Returns:
+        list[float]: The values of ACTION_FEATURES.
+    """
+    utility = evaluate_attacking_move_utility(attacking_pokemon, [move], defending_pokemon)[0][2]
+    return [1.0, 0.0, move.power / 100, move.accu, float(move.type in attacking_pokemon.types),
+            type_effectiveness([move.type], defending_pokemon.types),
+            float(move.move_category == MoveCategory.PHYSICAL), float(move.move_category == MoveCategory.SPECIAL),
+            float(move.priority or 0), utility / UTILITY_SCALE, 0.0, 0.0, 0.0]
+
+
+def switch_features(pokemon, enemy_active) -> list[float]:
+    """
+    Get the features of switching to a Pokemon of the team against the enemy active Pokemon.
+
+    Returns:
+        list[float]: The values of ACTION_FEATURES.
+    """
+    return [0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, hp_fraction(pokemon),
+            1 / (1 + type_effectiveness(enemy_active.types, pokemon.types)),
+            type_effectiveness(pokemon.types, enemy_active.types)]
@@ -0,0 +1,86 @@
+"""
+footprint.py - Memory Footprint Module
+
+This module estimates the memory that every live battle holds on its own: the bot, its teams, state, request and
+tables, without what it shares with the other battles (the species and move records, the sender, a learned model). The
+shared records it references are counted instead of measured.
+"""
+import sys
+from enum import Enum
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import NamedTuple
+from Engine.move import MoveData, move_data_count
+from Engine.species import SpeciesData, species_count
+
+SHARED_ATTRIBUTES = frozenset({'sender', 'model', '_speculation_task'})  # Attributes of a bot shared or not owned
+_SKIPPED = (type, ModuleType, FunctionType, MethodType, BuiltinFunctionType, Enum)
+
+
+class BattleFootprint(NamedTuple):
+    """The memory a battle holds on its own"""
+    battle_id: str
+    bytes: int
+    objects: int
+    species: int  # The shared species records it references
+    moves: int  # The shared move records it references
+
+
+def _referents(obj) -> list:
+    if isinstance(obj, dict):
+        return [*obj.keys(), *obj.values()]
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return list(obj)
+    referents = list(vars(obj).values()) if hasattr(obj, '__dict__') else []
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if hasattr(obj, slot):
+                referents.append(getattr(obj, slot))
+    return referents
+
+
+def battle_footprint(battle) -> BattleFootprint:
+    """
+    Measure the objects a battle holds, following its attributes down to the shared records.
+
+    Args:
+        battle (BattleBot): The bot of the battle.
+
+    Returns:
+        BattleFootprint: The bytes and objects of the battle, and the shared records it references.
+    """
+    seen = {id(battle)}
+    species, moves = set(), set()
+    size = sys.getsizeof(battle) + sys.getsizeof(vars(battle))
+    objects = 1
+    pending = [value for name, value in vars(battle).items() if name not in SHARED_ATTRIBUTES]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, SpeciesData):
+            species.add(obj.id)
+        elif isinstance(obj, MoveData):
+            moves.add(id(obj))
+        elif not isinstance(obj, _SKIPPED):
+            size += sys.getsizeof(obj)
+            if hasattr(obj, '__dict__') and not isinstance(obj, type):
+                size += sys.getsizeof(vars(obj))
+            objects += 1
+            pending.extend(_referents(obj))
+    return BattleFootprint(battle.battle_id, size, objects, len(species), len(moves))
+
+
+def footprint_report(battles: list) -> str:
+    """
+    Create a text report of the memory held by every live battle, and of the shared records.
+    """
+    lines = []
+    total = 0
+    for footprint in sorted((battle_footprint(battle) for battle in battles), key=lambda f: f.bytes, reverse=True):
+        total += footprint.bytes
+        lines.append(f'{footprint.battle_id}: {footprint.bytes / 1024:.1f} KiB in {footprint.objects} objects, '
+                     f'{footprint.species} species and {footprint.moves} moves shared')
+    lines.append(f'Total: {total / 1024:.1f} KiB in {len(battles)} battles, sharing {species_count()} species and '
+                 f'{move_data_count()} move records')
+    return '\n'.join(lines)
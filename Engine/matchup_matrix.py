@@ -0,0 +1,129 @@
+"""
+matchup_matrix.py - Matchup Matrix Module
+
+This module keeps, for a battle, the offensive and defensive scores of every Pokemon of the bot against every known
+enemy Pokemon. A score is recomputed only when one of its two Pokemon changes (it faints, its stat stages or status
+change, or it reveals a move), so switch and lead decisions read the matrix instead of evaluating every pair again.
+"""
+from Engine.utility_calculator import evaluate_attacking_move_utility, evaluate_enemy_move, create_potential_moves
+
+
+def matchup_signature(pokemon) -> tuple:
+    """
+    The parts of a Pokemon that its scores depend on. The health only matters through fainting.
+    """
+    return (pokemon.is_alive(), tuple(sorted(pokemon.boosts.items())), pokemon.status,
+            tuple(sorted(pokemon.stats.items())),
+            tuple(move.name for move in getattr(pokemon, 'known_moves', ())))
+
+
+def offense_score(attacking_pokemon, defending_pokemon) -> float:
+    """
+    How hard a Pokemon hits another with its own types, at its better attacking stat.
+    """
+    utilities = evaluate_attacking_move_utility(attacking_pokemon, create_potential_moves(attacking_pokemon),
+                                                defending_pokemon)
+    return utilities[0][2] if utilities else 0.0
+
+
+def defense_score(bot_pokemon, enemy_pokemon) -> float:
+    """
+    How hard an enemy Pokemon hits a Pokemon of the bot with its best known or potential move.
+    """
+    utilities = evaluate_enemy_move(bot_pokemon, enemy_pokemon)
+    return utilities[0][2] if utilities else 0.0
+
+
+class MatchupMatrix:
+    """
+    The scores of the bot's Pokemon (rows) against the known enemy Pokemon (columns) of a battle, by their ids.
+
+    Attributes:
+        offense (dict[tuple[str, str], float]): How hard each Pokemon of the bot hits each enemy.
+        defense (dict[tuple[str, str], float]): How hard each enemy hits each Pokemon of the bot.
+    """
+
+    def __init__(self):
+        self.offense = {}
+        self.defense = {}
+        self._rows = {}  # Id of a Pokemon of the bot -> its signature
+        self._columns = {}  # Id of an enemy Pokemon -> its signature
+
+    def update(self, bot_team, enemy_team) -> int:
+        """
+        Bring the matrix up to date with the teams, recomputing only the rows and columns of changed Pokemon.
+
+        Args:
+            bot_team (Team): The team of the bot. Its objects may be new, only their signatures are compared.
+            enemy_team (Team): The known Pokemon of the enemy.
+
+        Returns:
+            int: The number of recomputed pairs.
+        """
+        changed_rows = self._changed(self._rows, bot_team)
+        changed_columns = self._changed(self._columns, enemy_team)
+        if not changed_rows and not changed_columns:
+            return 0
+
+        recomputed = 0
+        for bot_pokemon in bot_team:
+            row_changed = bot_pokemon.id in changed_rows
+            for enemy_pokemon in enemy_team:
+                if not row_changed and enemy_pokemon.id not in changed_columns:
+                    continue
+                key = (bot_pokemon.id, enemy_pokemon.id)
+                if bot_pokemon.is_alive() and enemy_pokemon.is_alive():
+                    self.offense[key] = offense_score(bot_pokemon, enemy_pokemon)
+                    self.defense[key] = defense_score(bot_pokemon, enemy_pokemon)
+                else:
+                    self.offense.pop(key, None)
+                    self.defense.pop(key, None)
+                recomputed += 1
+        return recomputed
+
+    @staticmethod
+    def _changed(signatures: dict[str, tuple], team) -> set[str]:
+        changed = set()
+        for pokemon in team:
+            signature = matchup_signature(pokemon)
+            if signatures.get(pokemon.id) != signature:
+                signatures[pokemon.id] = signature
+                changed.add(pokemon.id)
+        return changed
+
+    def get(self, bot_pokemon_id: str, enemy_pokemon_id: str) -> tuple[float, float] | None:
+        """
+        Get the (offense, defense) scores of a pair, or None if one of them has fainted or isn't known.
+        """
+        key = (bot_pokemon_id, enemy_pokemon_id)
+        if key not in self.offense:
+            return None
+        return self.offense[key], self.defense[key]
+
+    def switch_utilities(self, active_pokemon, bot_team, enemy_pokemon) -> list[(int, object, float)]:
+        """
+        The utility of switching to each alive Pokemon of the bot against the enemy on the field, as
+        evaluate_switch_utility() returns it: the less the enemy hurts the Pokemon, the better.
+
+        Returns:
+            list[(int, Pokemon, float)]: (index in the team, Pokemon, utility) tuples, sorted by descending utility.
+        """
+        switch_utilities = []
+        for index, bot_pokemon in enumerate(bot_team):
+            if bot_pokemon.id == active_pokemon.id:
+                continue
+            scores = self.get(bot_pokemon.id, enemy_pokemon.id)
+            if scores is not None:
+                switch_utilities.append((index, bot_pokemon, -1 * scores[1]))
+        return sorted(switch_utilities, key=lambda x: x[2], reverse=True)
+
+    def best_lead(self, bot_team) -> int:
+        """
+        Get the index of the Pokemon of the bot with the best scores against all the known enemies.
+        """
+        best_index, best_score = 0, None
+        for index, bot_pokemon in enumerate(bot_team):
+            score = sum(offense - self.defense[key] for key, offense in self.offense.items() if key[0] == bot_pokemon.id)
+            if best_score is None or best_score < score:
+                best_index, best_score = index, score
+        return best_index
@@ -1,6 +1,16 @@
-import json
+"""
+move.py - Move Module
+
+This module holds the moves of the battles. The static data of a move (type, power, accuracy, priority, category) is
+read once per process from the data provider into an immutable MoveData record, kept by the id of the move and shared
+by every Move object of that move, in every battle. A Move object only holds what changes in a battle: the PP and
+whether the move is disabled.
+"""
 from enum import Enum
-import requests
+from typing import NamedTuple
+from Engine.data_provider import HttpProvider, get_provider, register_reset
+from Engine.request import parse_request
+from Engine.names import move_key, to_id
 
 
 class MoveCategory(Enum):
@@ -9,51 +19,141 @@ class MoveCategory(Enum):
     STATUS = "status"
 
 
+def move_category(category_name: str) -> MoveCategory:
+    """
+    Get the category of a move from its name in the data API.
+
+    Raises:
+        ValueError: If the name isn't a category.
+    """
+    try:
+        return MoveCategory(category_name)
+    except ValueError:
+        raise ValueError(f'{category_name} is not a legal move category') from None
+
+
+class MoveData(NamedTuple):
+    """The static data of a move, shared by every Move object of the move"""
+    id: str
+    type: str
+    power: int
+    accuracy: float
+    priority: int
+    category: MoveCategory | None
+
+
+_move_data = {}  # Id of a move -> its MoveData, shared by every Move of the move
+
+
+def fetch_move_data(move_name: str) -> MoveData:
+    """
+    Read the static data of a move from the data provider.
+
+    Raises:
+        ValueError: If the move is unknown, or doesn't have a legal category.
+    """
+    entry = get_provider().move(move_name)
+    try:
+        category = move_category(entry.get('category'))
+    except ValueError:
+        raise ValueError(f'The move {move_name} does not have a legal category') from None
+    return MoveData(id=to_id(move_name),
+                    type=entry.get('type'),
+                    power=int(entry.get('power') or 0),
+                    accuracy=float(entry.get('accuracy', 1.0)),
+                    priority=int(entry.get('priority') or 0),
+                    category=category)
+
+
+def get_move_data(move_name: str) -> MoveData:
+    """
+    Get the shared static data of a move, reading it the first time.
+    """
+    key = to_id(move_name)
+    data = _move_data.get(key)
+    if data is None:
+        data = _move_data[key] = fetch_move_data(move_name)
+    return data
+
+
+def has_move_data(move_name: str) -> bool:
+    """
+    Whether the static data of a move was read already, so getting it doesn't go to the data provider.
+    """
+    return to_id(move_name) in _move_data
+
+
+def clear_move_data() -> None:
+    _move_data.clear()
+
+
+def move_data_count() -> int:
+    """The number of shared records"""
+    return len(_move_data)
+
+
+register_reset(clear_move_data)
+
+
 class Move:
+    """
+    A move in a slot of a Pokemon: its name, PP and disabled state, and its shared static data.
+
+    Attributes:
+        name (str): The name of the move, as the server sent it.
+        data (MoveData): The static data of the move.
+        pp (str | int): The PP left.
+        disabled (bool): True if the move can't be used now.
+    """
+    __slots__ = ('name', 'data', 'pp', 'disabled')
+
     def __init__(self, name: str, pp: str, is_disabled: bool, move_type=None, power=None, accuracy=None, priority=None,
                  category=None):
         self.name = name
         self.pp = pp
         self.disabled = is_disabled
-        self.url = "https://pokeapi.co/api/v2/move/" + self.name.lower().replace(" ", "-")
 
         if move_type is None and power is None and accuracy is None and priority is None and category is None:
-            self.fill_data_fields()
-        else:
-            self.type = move_type
-            self.power = power
-            self.accu = accuracy
-            self.priority = priority
-            self.move_category = category
-
-    def fill_data_fields(self):
-        response = requests.get(self.url).json()
-        self.type = response.get("type", {}).get("name")
-
-        power = response.get("power")
-        if power is None:
-            self.power = 0
-        else:
-            self.power = int(power)
-
-        accu = response.get("accuracy")
-        if accu is None:
-            self.accu = 100.0
-        else:
-            self.accu = float(accu) / 100.0
-
-        self.priority = int(response.get("priority"))
-        self.set_move_category(response.get("damage_class", {}).get("name"))
-
-    def set_move_category(self, category_name: str):  # TODO: add test
-        if category_name == "physical":
-            self.move_category = MoveCategory.PHYSICAL
-        elif category_name == "special":
-            self.move_category = MoveCategory.SPECIAL
-        elif category_name == "status":
-            self.move_category = MoveCategory.STATUS
+            self.data = get_move_data(name)
         else:
-            raise ValueError(f'The move {self.name} does not have a legal category')
+            # Data given explicitly (e.g. a potential move of an enemy) is the Move's own, and isn't read or kept
+            self.data = MoveData(to_id(name), move_type, power, accuracy, priority, category)
+
+    @classmethod
+    def from_data(cls, name: str, data: MoveData, pp, is_disabled: bool = False) -> 'Move':
+        """
+        Create a Move of a shared record, without looking it up.
+        """
+        move = cls.__new__(cls)
+        move.name = name
+        move.data = data
+        move.pp = pp
+        move.disabled = is_disabled
+        return move
+
+    @property
+    def url(self) -> str:
+        return HttpProvider.BASE_URL + "move/" + move_key(self.name)
+
+    @property
+    def type(self) -> str:
+        return self.data.type
+
+    @property
+    def power(self) -> int:
+        return self.data.power
+
+    @property
+    def accu(self) -> float:
+        return self.data.accuracy
+
+    @property
+    def priority(self) -> int:
+        return self.data.priority
+
+    @property
+    def move_category(self) -> MoveCategory | None:
+        return self.data.category
 
     def is_move_disabled(self):
         return self.disabled
@@ -70,14 +170,12 @@ class Move:
 
 
 def create_active_moves_list(json_data) -> list[Move]:
-    data = json.loads(json_data.replace("|request|", ""))
-
-    # Extract the "active" section from the JSON data
-    active_section = data.get("active", [])
+    # Load JSON data (or use an already decoded BattleRequest)
+    request = parse_request(json_data)
     active_moves_list = []
 
     # Iterate through the known_moves in the "active" section
-    for move_data in active_section[0].get("moves", [])[:4]:
+    for move_data in request.moves[:4]:
         move_name = move_data.get("move", '')
         move_pp = move_data.get("pp", 0)
         move_disabled = move_data.get("disabled", False)
@@ -0,0 +1,186 @@
+"""
+names.py - Name Resolution Module
+
+This module maps the names used by the Showdown protocol ("Toxtricity", "Indeedee-F", "U-turn", "King's Shield", ...)
+and their ids ("toxtricity", "indeedeef", "uturn", "kingsshield") to the keys of the data source in O(1).
+
+The indexes start with the names that the data source spells differently, and are built up front from the keys of the
+data provider (see Engine.data_provider.index_names), so an id is resolved even if its display name was never seen.
+A name that isn't in the index (e.g. before it is built) is derived from its display name and learned, and a display
+name teaches the index its id as well. An unknown id is used as it is but never learned, as where its key has hyphens
+can't be told from it ("closecombat" is "close-combat").
+"""
+import re
+import unicodedata
+from Engine.snapshot import register_section
+
+_NOT_ID_CHARS = re.compile(r'[^a-z0-9]+')
+_NOT_SLUG_CHARS = re.compile(r'[^a-z0-9-]+')
+_DASHES = re.compile(r'-{2,}')
+
+# Showdown ids of species whose data key has a form the protocol leaves out, or spells differently
+SPECIES_OVERRIDES = {
+    'aegislash': 'aegislash-shield',
+    'basculegion': 'basculegion-male',
+    'basculegionf': 'basculegion-female',
+    'basculin': 'basculin-red-striped',
+    'darmanitan': 'darmanitan-standard',
+    'deoxys': 'deoxys-normal',
+    'dudunsparce': 'dudunsparce-two-segment',
+    'eiscue': 'eiscue-ice',
+    'enamorus': 'enamorus-incarnate',
+    'giratina': 'giratina-altered',
+    'gourgeist': 'gourgeist-average',
+    'indeedee': 'indeedee-male',
+    'indeedeef': 'indeedee-female',
+    'keldeo': 'keldeo-ordinary',
+    'landorus': 'landorus-incarnate',
+    'lycanroc': 'lycanroc-midday',
+    'maushold': 'maushold-family-of-three',
+    'mausholdfour': 'maushold-family-of-four',
+    'meloetta': 'meloetta-aria',
+    'meowstic': 'meowstic-male',
+    'meowsticf': 'meowstic-female',
+    'mimikyu': 'mimikyu-disguised',
+    'minior': 'minior-red-meteor',
+    'morpeko': 'morpeko-full-belly',
+    'oinkologne': 'oinkologne-male',
+    'oinkolognef': 'oinkologne-female',
+    'ogerponcornerstone': 'ogerpon-cornerstone-mask',
+    'ogerponhearthflame': 'ogerpon-hearthflame-mask',
+    'ogerponwellspring': 'ogerpon-wellspring-mask',
+    'oricorio': 'oricorio-baile',
+    'palafin': 'palafin-zero',
+    'pumpkaboo': 'pumpkaboo-average',
+    'shaymin': 'shaymin-land',
+    'squawkabilly': 'squawkabilly-green-plumage',
+    'squawkabillyblue': 'squawkabilly-blue-plumage',
+    'squawkabillyyellow': 'squawkabilly-yellow-plumage',
+    'squawkabillywhite': 'squawkabilly-white-plumage',
+    'tatsugiri': 'tatsugiri-curly',
+    'taurospaldeaaqua': 'tauros-paldea-aqua-breed',
+    'taurospaldeablaze': 'tauros-paldea-blaze-breed',
+    'taurospaldeacombat': 'tauros-paldea-combat-breed',
+    'thundurus': 'thundurus-incarnate',
+    'tornadus': 'tornadus-incarnate',
+    'toxtricity': 'toxtricity-amped',
+    'urshifu': 'urshifu-single-strike',
+    'wishiwashi': 'wishiwashi-solo',
+    'wormadam': 'wormadam-plant',
+    'zygarde': 'zygarde-50',
+}
+
+# Showdown ids of moves whose data key can't be derived from their display name
+MOVE_OVERRIDES = {
+    'visegrip': 'vice-grip',
+}
+
+
+def to_ascii(name: str) -> str:
+    """
+    Transliterate the accented letters of a name, e.g. "Flabébé" -> "Flabebe".
+    """
+    return unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+
+
+def to_id(name: str) -> str:
+    """
+    Get the Showdown id of a name, e.g. "King's Shield" -> "kingsshield", "Flabébé" -> "flabebe".
+    """
+    return _NOT_ID_CHARS.sub('', to_ascii(name).lower())
+
+
+def to_slug(name: str) -> str:
+    """
+    Get the data key of a display name, e.g. "King's Shield" -> "kings-shield", "U-turn" -> "u-turn".
+    """
+    slug = to_ascii(name).lower().replace("'", '').replace('’', '').replace('.', '').replace(':', '').replace('%', '')
+    slug = _NOT_SLUG_CHARS.sub('-', slug)
+    return _DASHES.sub('-', slug).strip('-')
+
+
+class NameIndex:
+    """
+    Maps names and ids to data keys.
+
+    Attributes:
+        overrides (dict[str, str]): Data keys of the ids that can't be derived from the names.
+    """
+
+    def __init__(self, overrides: dict[str, str]):
+        self.overrides = overrides
+        self._keys = {}
+
+    def resolve(self, name: str) -> str:
+        """
+        Get the data key of a name or an id.
+
+        Args:
+            name (str): A display name ("Indeedee-F") or an id ("indeedeef").
+
+        Returns:
+            str: The key of the name in the data source ("indeedee-female").
+        """
+        key = self._keys.get(name)
+        if key is not None:
+            return key
+
+        name_id = to_id(name)
+        key = self.overrides.get(name_id)
+        if key is None:
+            if name == name_id:
+                # An id that neither the data source nor a display name taught us: not learned, to be resolved once
+                # they do
+                return name_id
+            key = to_slug(name)
+        if name != name_id:
+            self._keys[name_id] = key
+        self._keys[name] = key
+        return key
+
+    def build(self, keys) -> int:
+        """
+        Index the ids of the keys of the data source up front, e.g. "kingsshield" -> "kings-shield". The overrides
+        keep precedence over the keys whose id they share.
+
+        Args:
+            keys (Iterable[str]): The keys of the data source.
+
+        Returns:
+            int: The number of indexed ids.
+        """
+        count = 0
+        for key in keys:
+            key_id = to_id(key)
+            if key_id not in self.overrides:
+                self._keys[key_id] = key
+                count += 1
+        return count
+
+    def get_keys(self) -> dict[str, str]:
+        return self._keys
+
+    def load_keys(self, keys: dict[str, str]):
+        self._keys.update(keys)
+
+
+SPECIES_INDEX = NameIndex(SPECIES_OVERRIDES)
+MOVE_INDEX = NameIndex(MOVE_OVERRIDES)
+
+
+def species_key(name: str) -> str:
+    """
+    Get the data key of a species name from the protocol.
+    """
+    return SPECIES_INDEX.resolve(name)
+
+
+def move_key(name: str) -> str:
+    """
+    Get the data key of a move name (or id) from the protocol.
+    """
+    return MOVE_INDEX.resolve(name)
+
+
+register_section('names', lambda: {'species': SPECIES_INDEX.get_keys(), 'moves': MOVE_INDEX.get_keys()},
+                 lambda keys: (SPECIES_INDEX.load_keys(keys['species']), MOVE_INDEX.load_keys(keys['moves'])))
@@ -1,40 +1,53 @@
 from abc import ABC
-import json
-import requests
+from Engine.request import parse_request
 from Engine.move import create_move
+from Engine.names import species_key, to_id
+from Engine.data_provider import HttpProvider
+from Engine.species import get_species_data
+from Engine.stat_calculator import STAT_CALCULATOR, stage_multiplier
 
 MAX_MOVES = 4
+DEFAULT_LEVEL = '100'  # The level the protocol leaves out of the details
 
 
 class Pokemon(ABC):
     def __init__(self, name, level, condition):
-        self.name = make_name_in_format(name)
-        self.url = "https://pokeapi.co/api/v2/" + "pokemon/" + name.lower().replace(" ", "-")
-        self.types = self.set_types()
+        self.name = name
+        self.id = to_id(name)  # Showdown id of the species, used to compare and look up Pokemon
+        self.species = get_species_data(name)  # Shared by every Pokemon of the species
         self.level = level
-        if '/' in condition:
-            self.max_health = condition.split('/')[1]
-            self.curr_health = condition.split('/')[0]
+        self.max_health = 0
+        self.curr_health = 0
+        self.status = None
+        self.boosts = {}  # Stat stages that aren't 0, e.g. {'atk': 2, 'spe': -1}
+        self.set_condition(condition)
+
+    def set_condition(self, condition: str) -> None:
+        """
+        Set the health and status of the Pokemon from a condition of the protocol, e.g. "213/317", "45/100 par" or
+        "0 fnt".
+        """
+        health, _, status = condition.partition(' ')
+        if '/' in health:
+            self.curr_health, self.max_health = health.split('/')[:2]
+            self.status = status or None
         else:  # Pokemon has fainted
-            self.max_health = 0
             self.curr_health = 0
+            self.status = None
 
-    def get_field_from_api(self, singular: str, plural: str):
-        print("URL: ", self.url)
-        # print("JSN: ", requests.get(self.url).json())
-        try:
-            response = requests.get(self.url).json()
-            field_info_json = response.get(plural, [])
-            wished_list = [field_info[singular]["name"] for field_info in field_info_json]
-            return wished_list
-        except ValueError:
-            print("There is a problem with the name", self.name)
-
-    def set_types(self) -> list[str]:
-        ans = self.get_field_from_api("type", "types")
-        if ans is None:
-            raise ValueError("Pokemon must have type")
-        return ans
+    def get_stat(self, stat: str) -> float:
+        """
+        Get a stat of the Pokemon with its current stage, e.g. an attack of 200 at +1 is 300.
+        """
+        return self.stats[stat] * stage_multiplier(self.boosts.get(stat, 0))
+
+    @property
+    def url(self) -> str:
+        return HttpProvider.BASE_URL + "pokemon/" + species_key(self.name)
+
+    @property
+    def types(self) -> tuple[str, ...]:
+        return self.species.types
 
     def __str__(self) -> str:
         return f"Name: {self.name}\nLevel: {self.level}\nCondition: {self.curr_health}/{self.max_health}"
@@ -72,18 +85,30 @@ class BotPokemon(Pokemon):
         return self.terastall_type
 
 
+def parse_details(details: str) -> tuple[str, str]:
+    """
+    Get the species and the level of the details of a Pokemon in the protocol, e.g. "Carbink, L90" or
+    "Copperajah, L50, F". The level is left out of the details when it's 100, e.g. "Copperajah, M".
+
+    Returns:
+        tuple[str, str]: The species and the level.
+    """
+    species, *parts = details.split(',')
+    level = next((part[1:] for part in map(str.strip, parts) if part[:1] == 'L' and part[1:].isdigit()), DEFAULT_LEVEL)
+    return species.strip(), level
+
+
 def create_pokemon_objects_from_json(json_data) -> list[BotPokemon]:
-    """This function gets a json and create pokemons"""
+    """This function gets a json (or an already decoded BattleRequest) and create pokemons"""
     # TODO: Right now, this function create 6 pokemons every turn. It might be more eff to create only the changed.
     pokemon_objects = []
 
-    # Load JSON data
-    data = json.loads(json_data.replace("|request|", ""))
+    # Load JSON data, unless it was decoded already
+    request = parse_request(json_data)
 
-    if 'side' in data and 'pokemon' in data['side']:
-        for pokemon_info in data['side']['pokemon']:
-            name = pokemon_info.get('details', '').split(',')[0]
-            level = pokemon_info.get('details', '').split(',')[1][-2:]
+    if request.pokemon:
+        for pokemon_info in request.pokemon:
+            name, level = parse_details(pokemon_info.get('details', ''))
             condition = pokemon_info.get('condition', '')
             active = pokemon_info.get('active', False)
             stats = pokemon_info.get('stats', {})  # Extracted stats data
@@ -99,60 +124,35 @@ def create_pokemon_objects_from_json(json_data) -> list[BotPokemon]:
     return pokemon_objects
 
 
-def make_name_in_format(given_name: str) -> str:
-    """This function get a Pokemon name and adapt to the API name requirements. Mostly edge cases"""
-    if given_name[-1] == 'F':
-        given_name.replace('-F', '-female')
-    if given_name[-1] == 'M':
-        given_name.replace('-M', '-male')
-
-    if given_name in ['Toxtricity', 'toxtricity']:
-        given_name = "toxtricity-amped"
-
-    if given_name == 'Giratina':
-        given_name = "giratina-altered"
-
-    if given_name == 'eiscue':
-        given_name = "eiscue-ice"
-
-    # if given_name == 'urshifu':
-    #     given_name = "eiscue-ice"
-
-    return given_name.lower()
-
-
 class EnemyPokemon(Pokemon):
     def __init__(self, name, level, condition):
         super().__init__(name, level, condition)
         self.active = False  # By default
-        self.stats = self.set_stats()
-        self.abilities = self.set_potential_abilities()
-        self.potential_moves = self.set_potential_moves()
+        self.item = None  # Unknown until revealed
+        self.ability = None  # Unknown until revealed
+        # Level-scaled, as the stats of the bot's Pokemon in the requests
+        self.stats = STAT_CALCULATOR.stats(self.id, self.base_stats, level)
         self.known_moves = []
 
-    def set_stats(self):
-        response = requests.get(self.url).json()["stats"]
+    def get_stat(self, stat: str) -> float:
+        """
+        Get a stat of the Pokemon with its current stage, computed once per species, level and stages.
+        """
+        if not self.boosts:
+            return self.stats[stat]
+        return STAT_CALCULATOR.stats(self.id, self.base_stats, self.level, self.boosts)[stat]
 
-        # Initialize an empty dictionary
-        stat_dict = {}
+    @property
+    def base_stats(self):
+        return self.species.base_stats
 
-        # Iterate through the list of dictionaries
-        for stat_info in response:
-            # Extract the "name" and "base_stat" values
-            stat_name = stat_info["stat"]["name"]
-            base_stat = stat_info["base_stat"]
+    @property
+    def abilities(self) -> tuple[str, ...]:
+        return self.species.abilities
 
-            # Add the stat to the dictionary
-            stat_dict[long_to_short_key_mapping[stat_name]] = base_stat
-
-        # return the resulting dictionary
-        return stat_dict
-
-    def set_potential_moves(self):
-        return super().get_field_from_api("move", "known_moves")
-
-    def set_potential_abilities(self):
-        return super().get_field_from_api("ability", "abilities")
+    @property
+    def potential_moves(self) -> tuple[str, ...]:
+        return self.species.learnset
 
     def update_enemy_moves(self, move_name: str):
         """Get the name of an attack used. If the enemy didn't use it yet, att it to the least"""
@@ -163,13 +163,3 @@ class EnemyPokemon(Pokemon):
 
         self.known_moves.append(create_move(move_name))
 
-
-# Define the mapping of long keys to short keys
-long_to_short_key_mapping = {
-    'hp': 'hp',
-    'attack': 'atk',
-    'defense': 'def',
-    'special-attack': 'spa',
-    'special-defense': 'spd',
-    'speed': 'spe'
-}
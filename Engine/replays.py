@@ -0,0 +1,355 @@
+"""
+replays.py - Replay Ingestion Module
+
+This module turns directories of recorded Showdown battles into training datasets. Every battle is replayed line by
+line through the Engine objects (teams, BattleState), and every move or switch a player makes becomes a record of the
+features of the state, the features of the action and the outcome of the battle for that player.
+
+Replays are streamed: the directory is walked lazily, ".log" files are read line by line, and the files are handed to
+a process pool in chunks, with a bounded number of chunks in flight. Each worker writes its chunk as a shard of the
+dataset (".npz" with NumPy, columnar ".csv" otherwise) and returns only its counts, so memory stays flat however
+large the corpus is. The workers read the species and moves from the provider of the ingestion (the configured one
+from the command line), which is sent to them when they start.
+
+    python -m Engine.replays ingest <replays directory> <output directory> [--workers N] [--usage res/usage.sqlite3]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator, NamedTuple
+from Engine.battle_state import BattleState
+from Engine.data_provider import DataProvider, create_provider, get_provider, set_provider
+from Engine.features import STATE_FEATURES, ACTION_FEATURES, MOVE_ACTION, SWITCH_ACTION, state_features, \
+    move_features, switch_features
+from Engine.move import create_move
+from Engine.names import to_id
+from Engine.pokemon import EnemyPokemon, parse_details
+from Engine.team import Team
+from Engine.usage_stats import UsageStats, BattleLogObserver
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the shards are written as columnar CSV instead
+    np = None
+
+REPLAY_EXTENSIONS = ('.log', '.json')
+CHUNK_SIZE = 64  # Replays handled by a worker per task, written to one shard
+MAX_PENDING_CHUNKS = 4  # Chunks in flight per worker
+
+
+class TurnRecord(NamedTuple):
+    """A decision of a player in a recorded battle."""
+    battle_id: str
+    turn: int
+    player: str
+    state: list[float]  # The values of STATE_FEATURES, from the point of view of the player
+    action_kind: int  # MOVE_ACTION or SWITCH_ACTION
+    action: list[float]  # The values of ACTION_FEATURES
+    outcome: float  # 1 if the player won the battle, -1 if it lost, 0 for a tie
+
+
+def iter_replay_files(directory: str) -> Iterator[str]:
+    """
+    Walk a directory lazily and yield the paths of its replays, in sub-directories too.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_replay_files(entry.path)
+            elif entry.name.endswith(REPLAY_EXTENSIONS):
+                yield entry.path
+
+
+def iter_log_lines(path: str) -> Iterator[str]:
+    """
+    Yield the protocol lines of a replay: a ".log" file is read line by line, a ".json" replay (as downloaded from the
+    replay server) holds its log in its "log" field.
+    """
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as replay:
+            yield from json.load(replay).get('log', '').splitlines()
+    else:
+        with open(path, encoding='utf-8') as replay:
+            for line in replay:
+                yield line.rstrip('\n')
+
+
+class ReplayBattle:
+    """
+    Replays a recorded battle through the Engine objects, one protocol line at a time.
+
+    Attributes:
+        battle_id (str): The name of the replay.
+        teams (dict[str, Team]): The team of each side, by its id ("p1", "p2").
+        state (BattleState): The state of the battle.
+        records (list[TurnRecord]): The decisions made so far. Their outcome is set when the battle ends.
+    """
+
+    def __init__(self, battle_id: str):
+        self.battle_id = battle_id
+        self.teams = {'p1': Team(), 'p2': Team()}
+        self.aliases = {'p1': {}, 'p2': {}}
+        self.players = {}
+        self.state = BattleState(self.resolve)
+        self.turn = 0
+        self.records = []
+        self.finished = False
+
+    def resolve(self, ident: str):
+        side, _, name = ident.partition(': ')
+        side = side[:2]
+        team = self.teams.get(side)
+        if team is None:
+            return None
+        pokemon_id = to_id(name)
+        pokemon_id = self.aliases[side].get(pokemon_id, pokemon_id)
+        return team, team.get(pokemon_id) if pokemon_id else None
+
+    def feed(self, line: str) -> None:
+        """
+        Apply a protocol line to the battle, recording the decision it shows, if any.
+        """
+        parts = line.split('|')
+        if len(parts) < 2:
+            return
+        command, rest = parts[1], parts[2:]
+
+        if command == 'player' and 1 < len(rest):
+            self.players[rest[1]] = rest[0]
+        elif command == 'turn':
+            self.turn = int(rest[0])
+        elif command in ('switch', 'drag') and 2 < len(rest):
+            if command == 'switch' and 0 < self.turn:
+                self._record_switch(rest[0], rest[1].split(',')[0])
+            self.state.apply(command, rest)
+            self._switch_in(rest[0], rest[1], rest[2])
+        elif command == 'move' and 1 < len(rest):
+            self._record_move(rest[0], rest[1])
+        elif command == 'win':
+            self._finish(self.players.get(rest[0] if rest else None))
+        elif command == 'tie':
+            self._finish(None)
+        else:
+            self.state.apply(command, rest)
+
+    def _switch_in(self, ident: str, details: str, condition: str) -> None:
+        side = ident[:2]
+        team = self.teams[side]
+        species, level = parse_details(details)
+        self.aliases[side][to_id(ident.split(': ', 1)[-1])] = to_id(species)
+        if team.set_active(species) is not None:
+            team.update_condition(species, condition)
+        else:
+            pokemon = EnemyPokemon(species, level, condition)
+            pokemon.active = True
+            team.add(pokemon)
+
+    def _sides(self, ident: str):
+        side = ident[:2]
+        other = 'p2' if side == 'p1' else 'p1'
+        own_team, enemy_team = self.teams.get(side), self.teams.get(other)
+        if own_team is None or enemy_team is None:
+            return None
+        own_active, enemy_active = own_team.get_active(), enemy_team.get_active()
+        if own_active is None or enemy_active is None:
+            return None
+        return side, own_active, enemy_active, own_team, enemy_team
+
+    def _record(self, side: str, state: list[float], action_kind: int, action: list[float]) -> None:
+        self.records.append(TurnRecord(self.battle_id, self.turn, side, state, action_kind, action, 0.0))
+
+    def _record_move(self, ident: str, move_name: str) -> None:
+        sides = self._sides(ident)
+        if sides is None:
+            return
+        side, own_active, enemy_active, own_team, enemy_team = sides
+        move = create_move(move_name)
+        self._record(side, state_features(own_active, enemy_active, own_team, enemy_team), MOVE_ACTION,
+                     move_features(move, own_active, enemy_active))
+
+    def _record_switch(self, ident: str, species: str) -> None:
+        sides = self._sides(ident)
+        if sides is None:
+            return
+        side, own_active, enemy_active, own_team, enemy_team = sides
+        pokemon = own_team.get(species)
+        if pokemon is None or pokemon is own_active:
+            # A Pokemon seen for the first time: its features aren't known before it comes in
+            return
+        self._record(side, state_features(own_active, enemy_active, own_team, enemy_team), SWITCH_ACTION,
+                     switch_features(pokemon, enemy_active))
+
+    def _finish(self, winner: str | None) -> None:
+        self.finished = True
+        self.records = [record._replace(outcome=0.0 if winner is None else (1.0 if record.player == winner else -1.0))
+                        for record in self.records]
+
+
+def replay_battle(path: str, usage_stats: UsageStats = None) -> list[TurnRecord]:
+    """
+    Replay a recorded battle and get its decisions. A battle that didn't end gives no records.
+
+    Args:
+        path (str): The path of the replay.
+        usage_stats (UsageStats, optional): A store to count the revealed moves, items and abilities in.
+    """
+    battle = ReplayBattle(os.path.splitext(os.path.basename(path))[0])
+    observer = BattleLogObserver(usage_stats) if usage_stats is not None else None
+    for line in iter_log_lines(path):
+        battle.feed(line)
+        if observer is not None:
+            observer.feed(line)
+    return battle.records if battle.finished else []
+
+
+# ----------- Dataset shards ----------- #
+
+def write_shard(records: list[TurnRecord], path: str) -> str:
+    """
+    Write records as a shard of the dataset, with NumPy (".npz") when it's installed, as columnar CSV otherwise.
+
+    Args:
+        records (list[TurnRecord]): The records of the shard.
+        path (str): The path of the shard, without its extension.
+
+    Returns:
+        str: The path of the written shard.
+    """
+    if np is not None:
+        path += '.npz'
+        np.savez_compressed(path,
+                            state=np.asarray([record.state for record in records], dtype=np.float32).reshape(-1, len(STATE_FEATURES)),
+                            action=np.asarray([record.action for record in records], dtype=np.float32).reshape(-1, len(ACTION_FEATURES)),
+                            action_kind=np.asarray([record.action_kind for record in records], dtype=np.int8),
+                            outcome=np.asarray([record.outcome for record in records], dtype=np.float32),
+                            turn=np.asarray([record.turn for record in records], dtype=np.int16),
+                            battle_id=np.asarray([record.battle_id for record in records]))
+        return path
+
+    path += '.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as shard:
+        writer = csv.writer(shard)
+        writer.writerow(('battle_id', 'turn', 'player', 'action_kind', 'outcome')
+                        + tuple(f'state_{name}' for name in STATE_FEATURES)
+                        + tuple(f'action_{name}' for name in ACTION_FEATURES))
+        for record in records:
+            writer.writerow([record.battle_id, record.turn, record.player, record.action_kind, record.outcome]
+                            + record.state + record.action)
+    return path
+
+
+def ingest_chunk(paths: list[str], shard_path: str) -> tuple[str | None, int, int, UsageStats]:
+    """
+    Replay a chunk of replays and write their records to a shard. Runs in a worker process.
+
+    Returns:
+        tuple[str | None, int, int, UsageStats]: The path of the shard (None if there was no record), the number of
+        records, the number of replays that failed, and the usage statistics of the chunk.
+    """
+    usage_stats = UsageStats()
+    records = []
+    failed = 0
+    for path in paths:
+        try:
+            records.extend(replay_battle(path, usage_stats))
+        except Exception as exception:
+            failed += 1
+            print(f'Failed to ingest {path}: {exception!r}', file=sys.stderr)
+    written = write_shard(records, shard_path) if records else None
+    return written, len(records), failed, usage_stats
+
+
+def _init_worker(provider: DataProvider):
+    set_provider(provider)
+    # The utility evaluation prints every move it scores, which only slows the workers down
+    sys.stdout = open(os.devnull, 'w')
+
+
+def iter_chunks(paths: Iterator[str], size: int) -> Iterator[list[str]]:
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ingest(directory: str, output: str, workers: int = None, chunk_size: int = CHUNK_SIZE,
+           max_pending: int = None, usage_stats: UsageStats = None, provider: DataProvider = None) -> dict:
+    """
+    Ingest a directory of replays into shards of a dataset, on a process pool.
+
+    Args:
+        directory (str): The directory of the replays.
+        output (str): The directory of the shards.
+        workers (int, optional): The number of worker processes. The number of CPUs by default.
+        chunk_size (int): The replays per task and shard.
+        max_pending (int, optional): The most tasks in flight, which bounds the memory. MAX_PENDING_CHUNKS per worker
+                                     by default.
+        usage_stats (UsageStats, optional): A store to merge the usage statistics of the replays into.
+        provider (DataProvider, optional): The provider the workers read the data from. The current provider by
+                                           default.
+
+    Returns:
+        dict: The counts of the ingestion: shards, records, replays and failed replays.
+    """
+    os.makedirs(output, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or MAX_PENDING_CHUNKS * workers
+    totals = {'shards': 0, 'records': 0, 'replays': 0, 'failed': 0}
+
+    def collect(done):
+        for future in done:
+            shard, records, failed, chunk_usage = future.result()
+            totals['shards'] += shard is not None
+            totals['records'] += records
+            totals['failed'] += failed
+            if usage_stats is not None:
+                usage_stats.merge(chunk_usage)
+
+    # Workers don't share the provider of this process (they may be spawned), so it's sent to them
+    provider = provider if provider is not None else get_provider()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(provider,)) as executor:
+        pending = set()
+        for index, chunk in enumerate(iter_chunks(iter_replay_files(directory), chunk_size)):
+            if max_pending <= len(pending):
+                # Don't read ahead of the workers
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            totals['replays'] += len(chunk)
+            pending.add(executor.submit(ingest_chunk, chunk, os.path.join(output, f'shard-{index:06d}')))
+        collect(wait(pending).done)
+    return totals
+
+
+def main():
+    from constant_variable import DATA_PROVIDER, DATA_BUNDLE_PATH
+
+    parser = argparse.ArgumentParser(prog='python -m Engine.replays', description='Turn replays into datasets.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest_command = commands.add_parser('ingest', help='Ingest a directory of replays into dataset shards.')
+    ingest_command.add_argument('directory')
+    ingest_command.add_argument('output')
+    ingest_command.add_argument('--workers', type=int, default=None)
+    ingest_command.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    ingest_command.add_argument('--usage', default=None, help='Add the usage statistics of the replays to this store.')
+    args = parser.parse_args()
+
+    set_provider(create_provider(DATA_PROVIDER, DATA_BUNDLE_PATH))
+    start = time.perf_counter()
+    usage_stats = UsageStats() if args.usage else None
+    totals = ingest(args.directory, args.output, args.workers, args.chunk_size, usage_stats=usage_stats)
+    if usage_stats is not None:
+        usage_stats.save(args.usage)
+    print(f"Ingested {totals['replays']} replays ({totals['failed']} failed) into {totals['records']} records and "
+          f"{totals['shards']} shards in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+request.py - Battle Request Module
+
+This module decodes the "|request|" messages of a battle once, into a BattleRequest object that every consumer shares
+(the bot team, the active moves and the decision of the bot), and computes the legal actions of a request once, into
+a LegalActions object the bots choose from.
+
+The JSON is decoded with orjson when it's installed, and with the standard json module otherwise.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard decoder is used instead
+    orjson = None
+
+REQUEST_PREFIX = '|request|'
+
+
+def decode_json(text: str):
+    """
+    Decode a JSON text with the fastest decoder available.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+class BattleRequest:
+    """
+    A decoded request of the server, asking the bot for its next choice.
+
+    Attributes:
+        data (dict): The decoded JSON of the request.
+        rqid (int | None): The id of the request, increasing during a battle.
+        active (list[dict]): The options of the active Pokemon (moves, trapped, ...), empty if no move is expected.
+        side (dict): The state of the bot's side, with its Pokemon.
+        force_switch (list[bool] | None): Which active Pokemon must switch, if any.
+        wait (bool): True if the request doesn't expect a choice (e.g. the enemy has to switch).
+        team_preview (bool): True if the request expects the order of the team.
+    """
+    __slots__ = ('data', 'rqid', 'active', 'side', 'force_switch', 'wait', 'team_preview')
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.rqid = data.get('rqid')
+        self.active = data.get('active', [])
+        self.side = data.get('side', {})
+        self.force_switch = data.get('forceSwitch')
+        self.wait = bool(data.get('wait', False))
+        self.team_preview = bool(data.get('teamPreview', False))
+
+    @property
+    def pokemon(self) -> list[dict]:
+        return self.side.get('pokemon', [])
+
+    @property
+    def moves(self) -> list[dict]:
+        """
+        The moves of the first active Pokemon, empty if no move is expected.
+        """
+        return self.active[0].get('moves', []) if self.active else []
+
+    @property
+    def maybe_trapped(self) -> bool:
+        return bool(self.active) and bool(self.active[0].get('trapped') or self.active[0].get('maybeTrapped'))
+
+    def expects_decision(self) -> bool:
+        """
+        True if the request expects a move or a switch (and not the order of the team, or nothing).
+        """
+        return not self.wait and not self.team_preview and (bool(self.active) or self.force_switch is not None)
+
+
+class LegalActions:
+    """
+    The actions a request allows, by their indexes (from 0) in the moves of the active Pokemon and in the team.
+
+    Attributes:
+        moves (tuple[int, ...]): The moves that can be used.
+        switches (tuple[int, ...]): The Pokemon that can be switched in.
+    """
+    __slots__ = ('moves', 'switches')
+
+    def __init__(self, moves: tuple[int, ...] = (), switches: tuple[int, ...] = ()):
+        self.moves = moves
+        self.switches = switches
+
+    def __bool__(self) -> bool:
+        return bool(self.moves) or bool(self.switches)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LegalActions) and (self.moves, self.switches) == (other.moves, other.switches)
+
+    def __repr__(self) -> str:
+        return f'LegalActions(moves={self.moves}, switches={self.switches})'
+
+
+def legal_actions(request: BattleRequest) -> LegalActions:
+    """
+    Compute the legal actions of a request from its data: the PP and disabled moves of the active Pokemon, whether it
+    is trapped (or maybe trapped), a forced switch, and the fainted and active Pokemon of the team.
+
+    Args:
+        request (BattleRequest): The request.
+
+    Returns:
+        LegalActions: The legal actions, empty if the request doesn't expect a decision.
+    """
+    if not request.expects_decision():
+        return LegalActions()
+
+    moves = ()
+    forced_switch = request.force_switch is not None and any(request.force_switch)
+    if not forced_switch:
+        options = request.moves[:4]
+        if len(options) == 1:
+            # A single move (e.g. Struggle, or a move the Pokemon is locked into) can always be used
+            moves = (0,)
+        else:
+            moves = tuple(index for index, option in enumerate(options)
+                          if not option.get('disabled') and 0 < int(option.get('pp', 1)))
+
+    switches = ()
+    if forced_switch or not request.maybe_trapped:
+        switches = tuple(index for index, pokemon in enumerate(request.pokemon[:6])
+                         if not pokemon.get('active', False) and not pokemon.get('condition', '').endswith(' fnt'))
+    return LegalActions(moves, switches)
+
+
+def parse_request(payload) -> BattleRequest:
+    """
+    Decode a request of the server.
+
+    Args:
+        payload (str | BattleRequest): The JSON of the request, with or without its "|request|" prefix. A request
+                                       that is already decoded is returned as is.
+
+    Returns:
+        BattleRequest: The decoded request.
+
+    Raises:
+        ValueError: If the payload is not a valid JSON.
+    """
+    if isinstance(payload, BattleRequest):
+        return payload
+    if payload.startswith(REQUEST_PREFIX):
+        payload = payload[len(REQUEST_PREFIX):]
+    return BattleRequest(decode_json(payload))
+
+
+def is_new_request(request: BattleRequest, last_rqid: int | None, resyncing: bool = False) -> bool:
+    """
+    Check whether a request should be handled, or skipped as stale or duplicate.
+
+    Args:
+        request (BattleRequest): The request to check.
+        last_rqid (int | None): The id of the last handled request of the battle.
+        resyncing (bool): True if the battle was rejoined, and the server repeats its last request.
+
+    Returns:
+        bool: False if an older request (or the same one, unless resyncing) was handled already.
+    """
+    if request.rqid is None or last_rqid is None:
+        return True
+    if resyncing:
+        return last_rqid <= request.rqid
+    return last_rqid < request.rqid
@@ -0,0 +1,273 @@
+"""
+showdown_import.py - Showdown Data Import Module
+
+This module compiles local copies of Showdown's own data files (pokedex, moves, learnsets and typechart) into a bundle
+of the dex format (see Engine.data_provider), keyed by Showdown ids. With that bundle as the data provider, the names of
+the protocol are found directly by their ids: no name of another data source and no remote API is involved.
+
+The files are read from a directory, each as "<name>.json", "<name>.js" or "<name>.ts":
+    - The data files of the client (play.pokemonshowdown.com/data), e.g. pokedex.json and typechart.js.
+    - The data files of the server (data/*.ts), as long as they only hold data. The moves of the server have event
+      handlers (functions), which can't be read: use the moves.json of the client instead.
+
+The values are converted to the dex format: types are lowercase, accuracy is a fraction (1.0 for moves that can't
+miss), categories are lowercase, and abilities and learnsets are lists of Showdown ids.
+
+Usage:
+    python -m Engine.showdown_import <directory of the data files> [res/dex.json.gz]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import time
+from Engine.data_provider import write_bundle
+from Engine.names import to_id
+
+DATA_FILES = ('pokedex', 'moves', 'learnsets', 'typechart')
+EXTENSIONS = ('.json', '.js', '.ts')
+
+# Entries invented by the community or the developers, which can't appear in a battle of the real formats
+SKIPPED_NONSTANDARD = ('CAP', 'Custom')
+
+# The damageTaken codes of the type chart: neutral, weak, resistant and immune
+DAMAGE_TAKEN_MULTIPLIERS = {0: 1.0, 1: 2.0, 2: 0.5, 3: 0.0}
+
+_TOKEN = re.compile(r'''
+     (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+    |(?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    |(?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+    |(?P<name>[A-Za-z_$][\w$]*)
+    |(?P<punctuation>[{}\[\],:])
+''', re.VERBOSE | re.DOTALL)
+
+# The assignment of the exported object, e.g. "export const Pokedex: {[k: string]: SpeciesData} = " or
+# "exports.BattleTypeChart = "
+_EXPORT = re.compile(r'(?:\bexport\s+const\s+[\w$]+(?:\s*:[^=]*)?|\bexports\.[\w$]+|\bmodule\.exports)\s*=\s*')
+
+_LITERALS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+
+class _LiteralParser:
+    """
+    Parses the object literals of JavaScript and TypeScript data files: unquoted keys, single quoted strings, comments
+    and trailing commas are allowed. Anything that isn't data (functions, expressions) raises a ValueError.
+    """
+
+    def __init__(self, text: str, position: int = 0):
+        self.text = text
+        self.position = position
+
+    def error(self, message: str, position: int) -> ValueError:
+        line = self.text.count('\n', 0, position) + 1
+        return ValueError(f'line {line}: {message}')
+
+    def next_token(self) -> tuple[str, str, int]:
+        while True:
+            if self.position >= len(self.text):
+                raise self.error('unexpected end of file', self.position)
+            match = _TOKEN.match(self.text, self.position)
+            if match is None:
+                raise self.error(f'unexpected {self.text[self.position]!r}, only data can be read', self.position)
+            self.position = match.end()
+            if match.lastgroup != 'space':
+                return match.lastgroup, match.group(), match.start()
+
+    def peek_token(self) -> tuple[str, str, int]:
+        position = self.position
+        token = self.next_token()
+        self.position = position
+        return token
+
+    def parse_value(self):
+        kind, text, position = self.next_token()
+        if text == '{':
+            return self.parse_object()
+        if text == '[':
+            return self.parse_array()
+        if kind == 'string':
+            return ast.literal_eval(text)
+        if kind == 'number':
+            return float(text) if any(char in text for char in '.eE') else int(text)
+        if kind == 'name' and text in _LITERALS:
+            return _LITERALS[text]
+        raise self.error(f'unexpected {text!r}, only data can be read', position)
+
+    def parse_object(self) -> dict:
+        result = {}
+        while True:
+            kind, text, position = self.next_token()
+            if text == '}':
+                return result
+            if kind == 'string':
+                key = ast.literal_eval(text)
+            elif kind in ('name', 'number'):
+                key = text
+            else:
+                raise self.error(f'unexpected {text!r} instead of a key', position)
+            kind, text, position = self.next_token()
+            if text != ':':
+                raise self.error(f'unexpected {text!r} after the key {key!r}, only data can be read', position)
+            result[key] = self.parse_value()
+            kind, text, position = self.next_token()
+            if text == '}':
+                return result
+            if text != ',':
+                raise self.error(f'unexpected {text!r} in an object', position)
+
+    def parse_array(self) -> list:
+        result = []
+        while True:
+            if self.peek_token()[1] == ']':
+                self.next_token()
+                return result
+            result.append(self.parse_value())
+            kind, text, position = self.next_token()
+            if text == ']':
+                return result
+            if text != ',':
+                raise self.error(f'unexpected {text!r} in an array', position)
+
+
+def parse_js_export(text: str):
+    """
+    Parse the object exported by a JavaScript or TypeScript data file.
+
+    Raises:
+        ValueError: If the file doesn't export an object, or the object isn't only data.
+    """
+    match = _EXPORT.search(text)
+    if match is None:
+        raise ValueError('no exported object')
+    return _LiteralParser(text, match.end()).parse_value()
+
+
+def find_data_file(directory: str, name: str) -> str:
+    """
+    Find a data file in a directory, in the order of EXTENSIONS.
+
+    Raises:
+        FileNotFoundError: If there is no such file.
+    """
+    for extension in EXTENSIONS:
+        path = os.path.join(directory, name + extension)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"No {name} data file ({', '.join(name + extension for extension in EXTENSIONS)}) in "
+                            f"{directory}")
+
+
+def load_data_file(path: str) -> dict:
+    """
+    Load a data file of Showdown.
+
+    Raises:
+        ValueError: If the file can't be read as data.
+    """
+    with open(path, encoding='utf-8') as file:
+        text = file.read()
+    try:
+        return json.loads(text) if path.endswith('.json') else parse_js_export(text)
+    except ValueError as exception:
+        raise ValueError(f'{path}: {exception}') from None
+
+
+def is_skipped(entry: dict) -> bool:
+    return entry.get('isNonstandard') in SKIPPED_NONSTANDARD
+
+
+def compile_species(pokedex: dict[str, dict], learnsets: dict[str, dict]) -> dict[str, dict]:
+    """
+    Compile the species of the pokedex to dex entries, by their ids.
+
+    A form without a learnset of its own (e.g. a cosmetic or battle-only form) gets the learnset of the species it
+    changes from.
+    """
+    species = {}
+    for species_id, entry in pokedex.items():
+        if is_skipped(entry):
+            continue
+        learnset = learnsets.get(species_id, {}).get('learnset')
+        if learnset is None:
+            base_id = to_id(entry.get('changesFrom') or entry.get('baseSpecies') or '')
+            learnset = learnsets.get(base_id, {}).get('learnset', {})
+        species[species_id] = {'name': entry['name'],
+                               'types': [pokemon_type.lower() for pokemon_type in entry.get('types', [])],
+                               'base_stats': dict(entry.get('baseStats', {})),
+                               'abilities': [to_id(ability) for ability in entry.get('abilities', {}).values()],
+                               'learnset': sorted(learnset)}
+    return species
+
+
+def compile_moves(moves: dict[str, dict]) -> dict[str, dict]:
+    """
+    Compile the moves to dex entries, by their ids.
+    """
+    compiled = {}
+    for move_id, entry in moves.items():
+        if is_skipped(entry):
+            continue
+        accuracy = entry.get('accuracy', True)
+        compiled[move_id] = {'name': entry['name'],
+                             'type': entry.get('type', '').lower(),
+                             'power': int(entry.get('basePower', 0)),
+                             'accuracy': 1.0 if accuracy is True else accuracy / 100.0,
+                             'priority': int(entry.get('priority', 0)),
+                             'category': entry.get('category', '').lower()}
+    return compiled
+
+
+def compile_typechart(typechart: dict[str, dict]) -> dict[str, dict[str, float]]:
+    """
+    Compile the type chart, given by the damage each type takes, to the damage multipliers of the attacking types
+    against the defending types.
+    """
+    types = set(typechart)
+    compiled = {}
+    for defending_type, entry in typechart.items():
+        for attacking_type, code in entry.get('damageTaken', {}).items():
+            # The other keys are the immunities to weathers, statuses and effects, e.g. "sandstorm" or "brn"
+            if to_id(attacking_type) in types:
+                compiled.setdefault(to_id(attacking_type), {})[defending_type] = DAMAGE_TAKEN_MULTIPLIERS[code]
+    return compiled
+
+
+def import_showdown_data(directory: str, output: str) -> dict[str, int]:
+    """
+    Compile the data files of a directory into a bundle.
+
+    Args:
+        directory (str): The directory of the pokedex, moves, learnsets and typechart data files.
+        output (str): The path of the bundle.
+
+    Returns:
+        dict[str, int]: The number of species, moves and types, and the size of the bundle in bytes.
+
+    Raises:
+        FileNotFoundError: If a data file is missing.
+        ValueError: If a data file can't be read as data.
+    """
+    data = {name: load_data_file(find_data_file(directory, name)) for name in DATA_FILES}
+    species = compile_species(data['pokedex'], data['learnsets'])
+    moves = compile_moves(data['moves'])
+    typechart = compile_typechart(data['typechart'])
+    size = write_bundle(output, species, moves, typechart)
+    return {'species': len(species), 'moves': len(moves), 'types': len(typechart), 'bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m Engine.showdown_import',
+                                     description="Compile Showdown's data files into a dex bundle.")
+    parser.add_argument('directory', help='Directory of the pokedex, moves, learnsets and typechart data files.')
+    parser.add_argument('output', nargs='?', default='res/dex.json.gz')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = import_showdown_data(args.directory, args.output)
+    print(f"Imported {totals['species']} species, {totals['moves']} moves and {totals['types']} types into "
+          f"{args.output} ({totals['bytes']} bytes) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+snapshot.py - Warm Start Snapshot Module
+
+This module keeps the data the bot has resolved (API answers, name aliases, computed tables, ...) in a single file, so
+a new process starts with it instead of fetching everything again.
+
+The file is a header (magic bytes, format version and the size of the table of contents), a JSON table of contents of
+the offset and size of every section, and the sections themselves, each a JSON document. The file is memory mapped when
+it's read, and only the sections that are asked for are decoded, so the pages of the other sections are never brought
+from the disk. Being JSON, a snapshot holds only data: loading one never runs code.
+
+Every module that owns a cache registers a section with a dump function (returns a JSON serializable object) and a load
+function (merges that object back into the cache).
+
+Usage:
+    python -m Engine.snapshot build <path> [--pokemon NAME ...] [--moves NAME ...]
+    python -m Engine.snapshot info <path>
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+MAGIC = b'SDBSNAP\x00'
+SNAPSHOT_VERSION = 2
+_HEADER = struct.Struct('<8sIQ')  # Magic, version and the size of the table of contents
+
+_sections = {}
+
+
+def register_section(name: str, dump, load):
+    """
+    Register a cache to be kept in the snapshots.
+
+    Args:
+        name (str): A unique name of the section.
+        dump: A function that returns the content of the cache as a JSON serializable object.
+        load: A function that gets this object back and merges it into the cache.
+    """
+    if name in _sections:
+        raise ValueError(f'A snapshot section named {name} is already registered')
+    _sections[name] = (dump, load)
+
+
+def write_snapshot(path: str) -> int:
+    """
+    Write all the registered sections to a snapshot file. The file is replaced atomically.
+
+    Returns:
+        int: The size of the file in bytes.
+    """
+    payloads = {name: json.dumps(dump(), separators=(',', ':')).encode('utf-8')
+                for name, (dump, _) in _sections.items()}
+    contents = {}
+    offset = 0
+    for name, payload in payloads.items():
+        contents[name] = [offset, len(payload)]
+        offset += len(payload)
+    table = json.dumps(contents, separators=(',', ':')).encode('utf-8')
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(table)))
+        file.write(table)
+        for payload in payloads.values():
+            file.write(payload)
+    os.replace(temp_path, path)
+    return _HEADER.size + len(table) + offset
+
+
+def _read_table(mapped: mmap.mmap, path: str) -> tuple[dict[str, list[int]], int]:
+    """
+    Read the table of contents of a mapped snapshot.
+
+    Returns:
+        tuple[dict[str, list[int]], int]: The offset and size of every section, and the offset the sections start at.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this version.
+    """
+    if len(mapped) < _HEADER.size:
+        raise ValueError(f'{path} is not a snapshot')
+    magic, version, table_size = _HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a snapshot')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f'{path} is a snapshot of version {version}, version {SNAPSHOT_VERSION} is expected')
+    start = _HEADER.size + table_size
+    if len(mapped) < start:
+        raise ValueError(f'{path} is truncated')
+    contents = json.loads(mapped[_HEADER.size:start])
+    if any(len(mapped) < start + offset + size for offset, size in contents.values()):
+        raise ValueError(f'{path} is truncated')
+    return contents, start
+
+
+def read_snapshot(path: str, names=None) -> dict:
+    """
+    Read the sections of a snapshot file, without loading them.
+
+    Args:
+        path (str): The path of the snapshot.
+        names (optional): The names of the sections to read, all of them by default. The other sections aren't read.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this version.
+    """
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        contents, start = _read_table(mapped, path)
+        return {name: json.loads(mapped[start + offset:start + offset + size])
+                for name, (offset, size) in contents.items() if names is None or name in names}
+
+
+def read_snapshot_sizes(path: str) -> dict[str, int]:
+    """
+    Get the size in bytes of every section of a snapshot file, without reading the sections.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this version.
+    """
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        contents, _ = _read_table(mapped, path)
+        return {name: size for name, (_, size) in contents.items()}
+
+
+def load_snapshot(path: str) -> bool:
+    """
+    Load a snapshot file into the registered caches. A missing or invalid file leaves the caches as they are.
+
+    Returns:
+        bool: True if the snapshot was loaded.
+    """
+    if not os.path.exists(path):
+        return False
+
+    start = time.perf_counter()
+    try:
+        # Sections of modules that aren't loaded (or don't exist anymore) are skipped without being read
+        sections = read_snapshot(path, _sections)
+    except ValueError as exception:
+        print(f'Snapshot {path} was skipped: {exception}')
+        return False
+
+    for name, content in sections.items():
+        _sections[name][1](content)
+
+    print(f'Snapshot {path} was loaded in {(time.perf_counter() - start) * 1000:.1f}ms')
+    return True
+
+
+def main():
+    # Run with the module the caches registered to, and not with this copy of it that runs as __main__
+    from Engine import snapshot
+    from Engine.pokemon import EnemyPokemon
+    from Engine.move import create_move
+    from Engine.data_provider import create_provider, index_names, set_provider
+    from constant_variable import DATA_PROVIDER, DATA_BUNDLE_PATH
+
+    parser = argparse.ArgumentParser(prog='python -m Engine.snapshot', description='Build or inspect a snapshot.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Fetch the given data and write a snapshot.')
+    build.add_argument('path')
+    build.add_argument('--pokemon', nargs='*', default=[])
+    build.add_argument('--moves', nargs='*', default=[])
+    info = commands.add_parser('info', help='Show the sections of a snapshot.')
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        # Before the snapshot is loaded, as a new provider clears the data resolved from the previous one
+        set_provider(create_provider(DATA_PROVIDER, DATA_BUNDLE_PATH))
+        snapshot.load_snapshot(args.path)
+        index_names()
+        for name in args.pokemon:
+            EnemyPokemon(name, '100', '100/100')
+        for name in args.moves:
+            create_move(name)
+        print(f'Wrote {snapshot.write_snapshot(args.path)} bytes to {args.path}')
+    else:
+        for name, size in snapshot.read_snapshot_sizes(args.path).items():
+            print(f'{name}: {size} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+species.py - Species Module
+
+This module holds the static data of the species: types, base stats, abilities and learnset. Each species is read once
+per process from the data provider into an immutable SpeciesData record, shared by reference by every Pokemon of that
+species, on both sides of every battle. A Pokemon object only holds its battle state (health, status, stat stages,
+revealed moves).
+"""
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+from Engine.data_provider import get_provider, register_reset
+from Engine.names import to_id
+
+
+class SpeciesData(NamedTuple):
+    """The static data of a species, shared by every Pokemon of the species"""
+    id: str
+    types: tuple[str, ...]
+    base_stats: Mapping[str, int]  # By the short names of the stats, read-only
+    abilities: tuple[str, ...]
+    learnset: tuple[str, ...]
+
+
+_species = {}  # Id of a species -> its SpeciesData
+
+
+def fetch_species_data(name: str) -> SpeciesData:
+    """
+    Read the static data of a species from the data provider.
+
+    Raises:
+        ValueError: If the species isn't known to the provider.
+    """
+    try:
+        entry = get_provider().species(name)
+    except ValueError:
+        print("There is a problem with the name", name)
+        raise ValueError("Pokemon must have type") from None
+
+    return SpeciesData(id=to_id(name),
+                       types=tuple(entry.get('types', ())),
+                       base_stats=MappingProxyType(dict(entry.get('base_stats', {}))),
+                       abilities=tuple(entry.get('abilities', ())),
+                       learnset=tuple(entry.get('learnset', ())))
+
+
+def get_species_data(name: str) -> SpeciesData:
+    """
+    Get the shared static data of a species, reading it the first time.
+    """
+    key = to_id(name)
+    data = _species.get(key)
+    if data is None:
+        data = _species[key] = fetch_species_data(name)
+    return data
+
+
+def clear_species_data() -> None:
+    _species.clear()
+
+
+def species_count() -> int:
+    """The number of species records"""
+    return len(_species)
+
+
+register_reset(clear_species_data)
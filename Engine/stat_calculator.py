@@ -0,0 +1,103 @@
+"""
+stat_calculator.py - Stat Calculator Module
+
+This module computes the battle stats of Pokemon from their base stats and level, as the game does, so the stats of
+enemy Pokemon are on the same scale as the stats the server sends for the bot's Pokemon.
+
+The EVs, IVs and nature of an enemy Pokemon aren't known, so the spread of the random battle formats is assumed: 85 EVs
+and 31 IVs in every stat, with a neutral nature. The stats of every (species, level, stat stages) are computed once,
+in a table shared by every battle.
+"""
+from Engine.data_provider import register_reset
+from Engine.names import to_id
+
+RANDOM_BATTLE_EVS = 85
+RANDOM_BATTLE_IVS = 31
+NEUTRAL_NATURE = 1.0
+
+STATS = ('hp', 'atk', 'def', 'spa', 'spd', 'spe')
+BOOSTABLE_STATS = ('atk', 'def', 'spa', 'spd', 'spe')
+
+
+def calculate_stat(stat: str, base: int, level: int, ev: int = RANDOM_BATTLE_EVS, iv: int = RANDOM_BATTLE_IVS,
+                   nature: float = NEUTRAL_NATURE) -> int:
+    """
+    Calculate a stat of a Pokemon with the formula of the games since generation 3.
+
+    Args:
+        stat (str): The short name of the stat, e.g. 'hp' or 'atk'.
+        base (int): The base stat of the species.
+        level (int): The level of the Pokemon.
+        ev (int): The effort values in the stat.
+        iv (int): The individual values in the stat.
+        nature (float): The multiplier of the nature for the stat (0.9, 1 or 1.1). HP isn't affected.
+
+    Returns:
+        int: The stat.
+    """
+    scaled = (2 * base + iv + ev // 4) * level // 100
+    if stat == 'hp':
+        # A base HP of 1 (Shedinja) always gives 1 HP
+        return 1 if base == 1 else scaled + level + 10
+    return int((scaled + 5) * nature)
+
+
+def stage_multiplier(stage: int) -> float:
+    """
+    The multiplier of a stat stage, e.g. 1.5 at +1 and 0.5 at -2.
+    """
+    return (2 + stage) / 2 if 0 <= stage else 2 / (2 - stage)
+
+
+class StatCalculator:
+    """
+    Computes the stats of Pokemon, each (species, level, stat stages) once.
+
+    Attributes:
+        ev (int): The assumed effort values in every stat.
+        iv (int): The assumed individual values in every stat.
+    """
+
+    def __init__(self, ev: int = RANDOM_BATTLE_EVS, iv: int = RANDOM_BATTLE_IVS):
+        self.ev = ev
+        self.iv = iv
+        self._table = {}  # (species id, level, stat stages) -> stats
+
+    def stats(self, species: str, base_stats: dict[str, int], level, boosts: dict[str, int] = None) -> dict[str, int]:
+        """
+        Get the stats of a Pokemon, with its stat stages.
+
+        Args:
+            species (str): The name (or id) of the species.
+            base_stats (dict[str, int]): The base stats of the species, by their short names. Only read the first time
+                                         the species is computed at this level.
+            level (int | str): The level of the Pokemon.
+            boosts (dict[str, int], optional): The stat stages that aren't 0, e.g. {'atk': 2}.
+
+        Returns:
+            dict[str, int]: The stats, by their short names. The returned dictionary is shared: don't change it.
+        """
+        stages = tuple(sorted(boosts.items())) if boosts else ()
+        key = (to_id(species), int(level), stages)
+        stats = self._table.get(key)
+        if stats is None:
+            if stages:
+                stats = dict(self.stats(species, base_stats, level))
+                for stat, stage in stages:
+                    if stat in stats:
+                        stats[stat] = int(stats[stat] * stage_multiplier(stage))
+            else:
+                stats = {stat: calculate_stat(stat, base, int(level), self.ev, self.iv)
+                         for stat, base in base_stats.items()}
+            self._table[key] = stats
+        return stats
+
+    def clear(self) -> None:
+        self._table.clear()
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+STAT_CALCULATOR = StatCalculator()
+register_reset(STAT_CALCULATOR.clear)
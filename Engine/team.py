@@ -1,4 +1,5 @@
 from Engine.pokemon import Pokemon
+from Engine.names import to_id
 
 TEAM_SIZE = 6
 
@@ -7,24 +8,26 @@ class Team:
     """
     The Team class manages a player's team in a Pokemon battle.
 
+    The team keeps an index of its Pokemon ids to their slots, the slot of its active Pokemon and the number of its
+    alive Pokemon, so looking up a Pokemon, the active one or the lives count doesn't scan the team. The index is kept
+    up to date as long as the team is changed through its methods (add, set_active, update_condition).
+
     Attributes:
         team (list): A list containing the Pokemon on the team.
+        alive_count (int): The number of Pokemon on the team that haven't fainted.
     """
-    def __init__(self):
-        """
-        Initializes an empty team.
-        """
-        self.team = []
-
-    def __int__(self, other_team: list[Pokemon]):
+    def __init__(self, other_team: list[Pokemon] = None):
         """
-        Initializes a team with Pokemon from another team.
+        Initializes a team, empty or with Pokemon from another team.
         Args:
-            other_team (list[Pokemon]): A list of Pokemon to add to the team.
+            other_team (list[Pokemon], optional): A list of Pokemon to add to the team.
         """
         self.team = []
-        for pokemon in other_team:
-            self.add(pokemon)
+        self.alive_count = 0
+        self._slots = {}
+        self._active_slot = None
+        if other_team:
+            self.adds(other_team)
 
     def add(self, pokemon: Pokemon) -> None:
         """
@@ -43,11 +46,15 @@ class Team:
         # This avoids situations of BotPokemon and EnemyPokemon in the same team
         if not self.team or isinstance(self.team[0], type(pokemon)):
             # Check if the team contains a pokemon with the same name, and raise error if so
-            for pok in self.team:
-                if pok.name == pokemon.name:
-                    raise ValueError(
-                        f"Failed to add {pokemon.name}. Team can have one instance of a pokemon.")
+            if pokemon.id in self._slots:
+                raise ValueError(
+                    f"Failed to add {pokemon.name}. Team can have one instance of a pokemon.")
+            self._slots[pokemon.id] = len(self.team)
             self.team.append(pokemon)
+            if pokemon.is_alive():
+                self.alive_count += 1
+            if getattr(pokemon, 'active', False):
+                self.set_active(pokemon.id)
         else:
             raise ValueError(f"Failed to add {pokemon.name}. Team can only contain BotPokemons or EnemyPokemons.")
 
@@ -78,12 +85,84 @@ class Team:
         """
         return self.team[index]
 
+    def get_slot(self, pokemon_name: str) -> int | None:
+        """
+        Get the slot of a Pokemon on the team.
+        Args:
+            pokemon_name (str): The name (or id) of the Pokemon.
+        Returns:
+            int | None: The index of the Pokemon, or None if it isn't on the team.
+        """
+        return self._slots.get(to_id(pokemon_name))
+
+    def get(self, pokemon_name: str) -> Pokemon | None:
+        """
+        Get a Pokemon of the team by its name (or id).
+        Returns:
+            Pokemon | None: The Pokemon, or None if it isn't on the team.
+        """
+        slot = self.get_slot(pokemon_name)
+        return None if slot is None else self.team[slot]
+
+    def get_active(self) -> Pokemon | None:
+        """
+        Get the active Pokemon of the team, or None if none of its Pokemon is active.
+        """
+        return None if self._active_slot is None else self.team[self._active_slot]
+
+    def set_active(self, pokemon_name: str) -> Pokemon | None:
+        """
+        Make a Pokemon the active one of the team, and the previous active Pokemon not active.
+        Args:
+            pokemon_name (str): The name (or id) of the Pokemon. If it isn't on the team, no Pokemon is left active.
+        Returns:
+            Pokemon | None: The new active Pokemon, or None if it isn't on the team.
+        """
+        previous = self.get_active()
+        if previous is not None:
+            previous.active = False
+
+        self._active_slot = self.get_slot(pokemon_name)
+        active = self.get_active()
+        if active is not None:
+            active.active = True
+        return active
+
+    def update_condition(self, pokemon_name: str, condition: str) -> Pokemon | None:
+        """
+        Update the health of a Pokemon of the team, and the count of alive Pokemon.
+        Args:
+            pokemon_name (str): The name (or id) of the Pokemon.
+            condition (str): The condition in a format "current_health/max_health", or "0 fnt".
+        Returns:
+            Pokemon | None: The updated Pokemon, or None if it isn't on the team.
+        """
+        pokemon = self.get(pokemon_name)
+        if pokemon is not None:
+            was_alive = pokemon.is_alive()
+            pokemon.set_condition(condition)
+            self.alive_count += pokemon.is_alive() - was_alive
+        return pokemon
+
+    @property
+    def fainted_count(self) -> int:
+        return len(self.team) - self.alive_count
+
     def __contains__(self, pokemon_name: str) -> bool:
         """
-        Checks if a Pokemon with a specific name is on the team.
+        Checks if a Pokemon with a specific name (or id) is on the team.
         Args:
             pokemon_name (str): The name of the Pokemon to check for.
         Returns:
             bool: True if a Pokemon with the specified name is on the team, otherwise False.
         """
-        return any(pokemon.name == pokemon_name for pokemon in self.team)
+        return to_id(pokemon_name) in self._slots
+
+    def __getitem__(self, index: int) -> Pokemon:
+        return self.team[index]
+
+    def __iter__(self):
+        return iter(self.team)
+
+    def __len__(self) -> int:
+        return len(self.team)
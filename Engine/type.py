@@ -172,14 +172,23 @@ class TypeChart:
         Returns:
             float: The effectiveness of the attack (x0, x0.5, x1, or x2).
         """
-        if defending_type == Type.NORMAL:
-            return 1.0
-
-        if attacking_type in TypeChart.get_immunities(defending_type):
-            return 0.0
-        elif attacking_type in TypeChart.get_resistances(defending_type):
-            return 0.5
-        elif attacking_type in TypeChart.get_weaknesses(defending_type):
-            return 2.0
-        else:
-            return 1.0
+        return _TYPE_EFFECTIVENESS[attacking_type, defending_type]
+
+
+def _compute_type_effectiveness(attacking_type: Type, defending_type: Type) -> float:
+    if defending_type == Type.NORMAL:
+        return 1.0
+
+    if attacking_type in TypeChart.get_immunities(defending_type):
+        return 0.0
+    elif attacking_type in TypeChart.get_resistances(defending_type):
+        return 0.5
+    elif attacking_type in TypeChart.get_weaknesses(defending_type):
+        return 2.0
+    else:
+        return 1.0
+
+
+# The effectiveness of every (attacking type, defending type) pair, computed once
+_TYPE_EFFECTIVENESS = {(attacking_type, defending_type): _compute_type_effectiveness(attacking_type, defending_type)
+                       for attacking_type in Type for defending_type in Type}
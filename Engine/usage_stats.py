@@ -0,0 +1,259 @@
+"""
+usage_stats.py - Usage Statistics Module
+
+This module counts, for every species, how often its moves, items and abilities are revealed: once per Pokemon per
+battle, in every battle the bot plays and in recorded battle logs. The counts predict the moves of enemy Pokemon
+before they use them.
+
+The counts stay small however many turns are observed (a counter per species and revealed name), every species keeps
+its top names up to date as they're counted so reading them doesn't sort, and two stores (e.g. of worker processes)
+merge by adding their counts. The stores are kept in SQLite, where saving adds the new counts to the saved ones.
+"""
+import os
+import sqlite3
+from Engine.names import to_id
+
+TOP_K = 8  # Names kept in the top list of every species and kind
+
+SEEN = 'seen'  # The kind that counts the Pokemon of a species, the base of the frequencies
+MOVE = 'move'
+ITEM = 'item'
+ABILITY = 'ability'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    species TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (species, kind, name)
+) WITHOUT ROWID;
+"""
+
+
+class UsageStats:
+    """
+    Counts of the moves, items and abilities revealed by every species.
+
+    Attributes:
+        top_k (int): The most names kept in the top list of every species and kind.
+    """
+
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self._counts = {}  # (species id, kind) -> {name: count}
+        self._tops = {}  # (species id, kind) -> [(name, count)], by descending count
+        self._unsaved = {}  # (species id, kind, name) -> count, added since the last save
+
+    def observe(self, species: str, kind: str, name: str, count: int = 1) -> None:
+        """
+        Count a revealed name of a species.
+
+        Args:
+            species (str): The name (or id) of the species.
+            kind (str): MOVE, ITEM, ABILITY, or SEEN (then the name is the species itself).
+            name (str): The display name of the move, item or ability, e.g. "Close Combat".
+            count (int): How many times it was revealed.
+        """
+        key = (to_id(species), kind)
+        counts = self._counts.setdefault(key, {})
+        counts[name] = counts.get(name, 0) + count
+        self._update_top(key, name, counts[name])
+        unsaved_key = key + (name,)
+        self._unsaved[unsaved_key] = self._unsaved.get(unsaved_key, 0) + count
+
+    def observe_seen(self, species: str) -> None:
+        self.observe(species, SEEN, to_id(species))
+
+    def _update_top(self, key: tuple[str, str], name: str, count: int) -> None:
+        # Move the name to its place in the top list, in O(top_k)
+        top = self._tops.setdefault(key, [])
+        for index, (top_name, _) in enumerate(top):
+            if top_name == name:
+                del top[index]
+                break
+        else:
+            if len(top) == self.top_k and count <= top[-1][1]:
+                return
+        index = len(top)
+        while 0 < index and top[index - 1][1] < count:
+            index -= 1
+        top.insert(index, (name, count))
+        del top[self.top_k:]
+
+    def top(self, species: str, kind: str, k: int = None) -> list[tuple[str, int]]:
+        """
+        Get the most revealed names of a species.
+
+        Args:
+            species (str): The name (or id) of the species.
+            kind (str): MOVE, ITEM or ABILITY.
+            k (int, optional): How many names, up to top_k. All the top list by default.
+
+        Returns:
+            list[tuple[str, int]]: (name, count) tuples, by descending count.
+        """
+        top = self._tops.get((to_id(species), kind), [])
+        return top if k is None else top[:k]
+
+    def seen(self, species: str) -> int:
+        """
+        How many Pokemon of the species were observed.
+        """
+        species_id = to_id(species)
+        return self._counts.get((species_id, SEEN), {}).get(species_id, 0)
+
+    def frequency(self, species: str, kind: str, name: str) -> float:
+        """
+        The share of the observed Pokemon of the species that revealed the name.
+        """
+        seen = self.seen(species)
+        if seen == 0:
+            return 0.0
+        return self._counts.get((to_id(species), kind), {}).get(name, 0) / seen
+
+    def likely_moves(self, species: str, known: set[str], count: int, min_frequency: float) -> list[str]:
+        """
+        Get the most revealed moves of a species that aren't known yet.
+
+        Args:
+            species (str): The name (or id) of the species.
+            known (set[str]): The moves already known, which are skipped.
+            count (int): The most moves to return.
+            min_frequency (float): The least share of the species that must have revealed a move.
+
+        Returns:
+            list[str]: The names of the moves, the most likely first.
+        """
+        seen = self.seen(species)
+        if seen == 0 or count <= 0:
+            return []
+        moves = []
+        for name, name_count in self.top(species, MOVE):
+            if name_count / seen < min_frequency:
+                break
+            if name not in known:
+                moves.append(name)
+                if len(moves) == count:
+                    break
+        return moves
+
+    def merge(self, other: 'UsageStats') -> None:
+        """
+        Add the counts of another store (e.g. of a worker process) to this one.
+        """
+        for (species, kind), counts in other._counts.items():
+            for name, count in counts.items():
+                self.observe(species, kind, name, count)
+
+    def __len__(self) -> int:
+        return sum(len(counts) for counts in self._counts.values())
+
+    def save(self, path: str) -> int:
+        """
+        Add the counts observed since the last save to the store at the path. Several processes may save to the same
+        path, their counts are added.
+
+        Returns:
+            int: The number of saved counters.
+        """
+        if not self._unsaved:
+            return 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)
+        try:
+            connection.executescript(_SCHEMA)
+            with connection:
+                connection.executemany(
+                    'INSERT INTO usage (species, kind, name, count) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (species, kind, name) DO UPDATE SET count = count + excluded.count',
+                    [key + (count,) for key, count in self._unsaved.items()])
+        finally:
+            connection.close()
+        saved = len(self._unsaved)
+        self._unsaved = {}
+        return saved
+
+    def load(self, path: str) -> bool:
+        """
+        Add the counts saved at the path to this store. They aren't saved again.
+
+        Returns:
+            bool: True if a store was found at the path.
+        """
+        if not os.path.exists(path):
+            return False
+        connection = sqlite3.connect(path, timeout=30)
+        try:
+            connection.executescript(_SCHEMA)
+            rows = connection.execute('SELECT species, kind, name, count FROM usage').fetchall()
+        finally:
+            connection.close()
+        unsaved = dict(self._unsaved)
+        for species, kind, name, count in rows:
+            self.observe(species, kind, name, count)
+        self._unsaved = unsaved
+        return True
+
+
+class BattleLogObserver:
+    """
+    Counts the revealed moves, items and abilities of both sides of a recorded battle (e.g. a replay), once per Pokemon,
+    as its protocol lines are fed one at a time.
+
+    Attributes:
+        stats (UsageStats): The store to count in.
+    """
+
+    def __init__(self, stats: UsageStats):
+        self.stats = stats
+        self._species_of = {}  # "p1: Nickname" -> species name
+        self._revealed = set()
+
+    def feed(self, line: str) -> None:
+        """
+        Count what a protocol line reveals, e.g. "|move|p1a: Pikachu|Thunderbolt|p2a: Charizard".
+        """
+        parts = line.split('|')
+        if len(parts) < 4:
+            return
+        command, ident = parts[1], parts[2]
+        pokemon = ident[:2] + ident[3:] if ident[2:3] not in (':', '') else ident
+        if command in ('switch', 'drag', 'replace'):
+            species = parts[3].split(',')[0]
+            if pokemon not in self._species_of:
+                self.stats.observe_seen(species)
+            self._species_of[pokemon] = species
+            return
+        species = self._species_of.get(pokemon)
+        if species is None:
+            return
+        if command == 'move':
+            kind, name = MOVE, parts[3]
+        elif command == '-item':
+            kind, name = ITEM, parts[3]
+        elif command == '-ability':
+            kind, name = ABILITY, parts[3]
+        else:
+            return
+        if (pokemon, kind, name) not in self._revealed:
+            self._revealed.add((pokemon, kind, name))
+            self.stats.observe(species, kind, name)
+
+
+def observe_battle_log(stats: UsageStats, log: str) -> None:
+    """
+    Count the revealed moves, items and abilities of both sides of a recorded battle log, once per Pokemon.
+
+    Args:
+        stats (UsageStats): The store to count in.
+        log (str): The protocol lines of the battle, e.g. "|switch|p1a: Pikachu|Pikachu, L88|100/100".
+    """
+    observer = BattleLogObserver(stats)
+    for line in log.splitlines():
+        observer.feed(line)
+
+
+USAGE_STATS = UsageStats()
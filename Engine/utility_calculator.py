@@ -1,6 +1,33 @@
-from Engine.move import Move, MoveCategory
+from typing import NamedTuple
+from Engine.move import Move, MoveCategory, create_move
 from Engine.pokemon import Pokemon, BotPokemon, EnemyPokemon, MAX_MOVES
 from Engine.type import string_to_type, TypeChart
+from Engine.usage_stats import USAGE_STATS
+
+MIN_USAGE_FREQUENCY = 0.2  # The least share of a species that revealed a move, for it to be predicted
+
+
+class Combatant(NamedTuple):
+    """
+    The parts of a Pokemon that the utilities of the moves read, compact enough to be sent to a worker process.
+    """
+    name: str
+    types: tuple[str, ...]
+    stats: dict[str, float]  # The attacking and defending stats, at their current stages
+    status: str | None
+    alive: bool
+
+    def get_stat(self, stat: str) -> float:
+        return self.stats[stat]
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+def to_combatant(pokemon: Pokemon) -> Combatant:
+    return Combatant(pokemon.name, tuple(pokemon.types),
+                     {stat: pokemon.get_stat(stat) for stat in ('atk', 'def', 'spa', 'spd')}, pokemon.status,
+                     pokemon.is_alive())
 
 
 def evaluate_attacking_move_utility(attacking_pokemon: Pokemon, optional_moves: list[Move], defending_pokemon: Pokemon) -> list[(int, Move, float)]:
@@ -51,11 +78,13 @@ def evaluate_attacking_move_utility(attacking_pokemon: Pokemon, optional_moves:
         for enemy_pokemon_type in defending_pokemon.types:
             utility *= TypeChart.get_type_effectiveness(string_to_type(move.type), string_to_type(enemy_pokemon_type))
 
-        # Physical/Special calculation
+        # Physical/Special calculation, with the current stat stages
         if move.move_category == MoveCategory.PHYSICAL:
-            utility *= attacking_pokemon.stats['atk'] / defending_pokemon.stats['def']
+            utility *= attacking_pokemon.get_stat('atk') / defending_pokemon.get_stat('def')
+            if attacking_pokemon.status == 'brn':
+                utility *= 0.5
         elif move.move_category == MoveCategory.SPECIAL:
-            utility *= attacking_pokemon.stats['spa'] / defending_pokemon.stats['spd']
+            utility *= attacking_pokemon.get_stat('spa') / defending_pokemon.get_stat('spd')
 
         print("Calculated utility:", utility)
 
@@ -71,30 +100,39 @@ def evaluate_attacking_move_utility(attacking_pokemon: Pokemon, optional_moves:
     return move_utilities  # Return the sorted list of move index, name, and utility tuples
 
 
-def evaluate_enemy_move(active_pokemon: BotPokemon, enemy_pokemon: EnemyPokemon) -> list[(int, Move, float)]:
+def evaluate_enemy_move(active_pokemon: BotPokemon, enemy_pokemon: EnemyPokemon, usage_stats=USAGE_STATS) -> list[(int, Move, float)]:
     """
     Evaluate the potential moves that the enemy Pokemon might use against the active Pokemon.
 
-    This function calculates the utility of each move that the enemy Pokemon can use, including its known moves
-    and potential moves, and returns a sorted list of tuples containing move index, move object, and utility,
-    sorted in descending order of utility.
+    This function calculates the utility of each move that the enemy Pokemon can use, including its known moves,
+    the moves its species reveals most often and potential moves, and returns a sorted list of tuples containing move
+    index, move object, and utility, sorted in descending order of utility.
 
     Args:
         active_pokemon (BotPokemon): The active Pokemon controlled by the bot.
         enemy_pokemon (EnemyPokemon): The enemy Pokemon for which move utilities are evaluated.
+        usage_stats (UsageStats, optional): The revealed moves of every species. None to ignore them.
 
     Returns:
         list[(int, Move, float)]: A sorted list of tuples containing move index, move object, and utility,
         sorted in descending order of utility.
     """
+    return evaluate_attacking_move_utility(enemy_pokemon, get_enemy_moves(enemy_pokemon, usage_stats), active_pokemon)
+
+
+def get_enemy_moves(enemy_pokemon: EnemyPokemon, usage_stats=USAGE_STATS) -> list[Move]:
+    """
+    Get the moves an enemy Pokemon may use: its known moves, the moves its species reveals most often and, while it
+    hasn't used all its moves yet, potential moves of its own types.
+    """
     enemy_moves = enemy_pokemon.known_moves.copy()
+    enemy_moves.extend(create_move(move_name) for move_name in likely_enemy_moves(enemy_pokemon, usage_stats))
 
-    if len(enemy_pokemon.known_moves) < MAX_MOVES - 1:
+    if len(enemy_moves) < MAX_MOVES - 1:
         # If the given enemy hasn't used all its moves yet, assume it can make an average damage with its own type(s)
         enemy_moves.extend(create_potential_moves(enemy_pokemon))
 
-    sorted_enemy_move_utilities = evaluate_attacking_move_utility(enemy_pokemon, enemy_moves, active_pokemon)
-    return sorted_enemy_move_utilities
+    return enemy_moves
 
 
 def create_potential_moves(enemy_pokemon: EnemyPokemon) -> list[Move]:
@@ -114,13 +152,12 @@ def create_potential_moves(enemy_pokemon: EnemyPokemon) -> list[Move]:
     potential_moves = []
 
     for enemy_type in enemy_pokemon.types:
-        potential_move = Move("potential", "10", False, enemy_type, 60, 100, 0, None)
         # Use the enemy's better attacking stat:
         if enemy_pokemon.stats['atk'] < enemy_pokemon.stats['spa']:
-            potential_move.move_category = MoveCategory.SPECIAL
+            category = MoveCategory.SPECIAL
         else:
-            potential_move.move_category = MoveCategory.PHYSICAL
-        potential_moves.append(potential_move)
+            category = MoveCategory.PHYSICAL
+        potential_moves.append(Move("potential", "10", False, enemy_type, 60, 100, 0, category))
 
     return potential_moves
 
@@ -146,7 +183,7 @@ def evaluate_switch_utility(active_pokemon: Pokemon, bot_team: list[Pokemon], pr
     switch_utilities = []
 
     for index, bot_pokemon in enumerate(bot_team):
-        if active_pokemon.name == bot_pokemon.name:
+        if active_pokemon.id == bot_pokemon.id:
             # It can't be switched to itself
             continue
 
@@ -164,10 +201,12 @@ def evaluate_switch_utility(active_pokemon: Pokemon, bot_team: list[Pokemon], pr
     return sorted_switch_utilities
 
 
-def get_utilities(active_pokemon: BotPokemon, enemy_pokemon: EnemyPokemon, active_moves: list[Move], bot_team: list[Pokemon]):
+def get_utilities(active_pokemon: BotPokemon, enemy_pokemon: EnemyPokemon, active_moves: list[Move], bot_team: list[Pokemon],
+                  matchups=None):
     """
     Provides data based on those given functions for utility evaluation.
         - This function calculates various utilities based on the provided data for decision-making in battles.
+        - With an up-to-date MatchupMatrix, the switch utilities are read from it instead of being evaluated.
     """
     # Get the utility of each move the active Pokemon can use
     active_moves_utilities = evaluate_attacking_move_utility(active_pokemon, active_moves, enemy_pokemon)
@@ -182,7 +221,47 @@ def get_utilities(active_pokemon: BotPokemon, enemy_pokemon: EnemyPokemon, activ
     predicted_enemy_move_utility = predicted_enemy_move[2]
 
     # Get the utility of each switch based on the given stage
-    switch_utilities = evaluate_switch_utility(active_pokemon, bot_team, predicted_enemy_move, enemy_pokemon)
+    if matchups is not None:
+        switch_utilities = matchups.switch_utilities(active_pokemon, bot_team, enemy_pokemon)
+    else:
+        switch_utilities = evaluate_switch_utility(active_pokemon, bot_team, predicted_enemy_move, enemy_pokemon)
 
     # Return all of those
     return active_moves_utilities, predicted_enemy_move, predicted_enemy_move_utility, switch_utilities
+
+
+def likely_enemy_moves(enemy_pokemon: EnemyPokemon, usage_stats=USAGE_STATS) -> list[str]:
+    """
+    Get the names of the moves the species of an enemy Pokemon uses most, that it didn't use yet.
+    """
+    if usage_stats is None or MAX_MOVES <= len(enemy_pokemon.known_moves):
+        return []
+    known = {move.name for move in enemy_pokemon.known_moves}
+    return usage_stats.likely_moves(enemy_pokemon.id, known, MAX_MOVES - len(enemy_pokemon.known_moves),
+                                    MIN_USAGE_FREQUENCY)
+
+
+def decision_state(active_pokemon: BotPokemon, enemy_pokemon: EnemyPokemon, active_moves: list[Move],
+                   usage_stats=USAGE_STATS) -> tuple:
+    """
+    Get the compact state of score_moves(): the Pokemon that face each other, the moves of the active Pokemon and the
+    moves the enemy may use. The data of the moves is read here, on the caller's side.
+    """
+    return (to_combatant(active_pokemon), to_combatant(enemy_pokemon), tuple(active_moves),
+            tuple(get_enemy_moves(enemy_pokemon, usage_stats)))
+
+
+def score_moves(state: tuple) -> tuple[list[(int, Move, float)], (int, Move, float)]:
+    """
+    Score the moves of the active Pokemon and predict the move of the enemy, e.g. in a worker of the decision executor.
+
+    Args:
+        state (tuple): A state of decision_state().
+
+    Returns:
+        tuple: The (index, move, utility) tuples of the moves of the active Pokemon, sorted in descending order of
+        utility, and the (index, move, utility) tuple of the predicted move of the enemy.
+    """
+    active_pokemon, enemy_pokemon, active_moves, enemy_moves = state
+    move_utilities = evaluate_attacking_move_utility(active_pokemon, list(active_moves), enemy_pokemon)
+    return move_utilities, evaluate_attacking_move_utility(enemy_pokemon, list(enemy_moves), active_pokemon)[0]
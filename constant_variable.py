@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import NamedTuple
 import configparser
 
 # Load configuration settings from 'config.ini' file
@@ -20,6 +21,62 @@ except KeyError:
     SELECTED_BOT_MODE = 'accept'
     SELECTED_BOT_TYPE = 'greedy'
 
+# Optional settings
+RESULTS_PATH = config.get('results', 'PATH', fallback='res/results.sqlite3')
+METRICS_ENABLED = config.getboolean('metrics', 'ENABLED', fallback=False)
+METRICS_HOST = config.get('metrics', 'HOST', fallback='127.0.0.1')
+METRICS_PORT = config.getint('metrics', 'PORT', fallback=9108)
+PROFILING_ENABLED = config.getboolean('profiling', 'ENABLED', fallback=False)
+PROFILING_SAMPLE_RATE = config.getfloat('profiling', 'SAMPLE_RATE', fallback=0.01)
+PROFILING_TRACEMALLOC = config.getboolean('profiling', 'TRACEMALLOC', fallback=False)
+PROFILING_DIRECTORY = config.get('profiling', 'DIRECTORY', fallback='profiles')
+USAGE_STATS_PATH = config.get('usage', 'PATH', fallback='res/usage.sqlite3')
+SNAPSHOT_PATH = config.get('snapshot', 'PATH', fallback='res/warm_start.snapshot')
+SNAPSHOT_WRITE_ON_EXIT = config.getboolean('snapshot', 'WRITE_ON_EXIT', fallback=True)
+SPECULATION_ENABLED = config.getboolean('Setting', 'SPECULATE', fallback=True)
+LEARNED_MODEL_PATH = config.get('learned', 'MODEL_PATH', fallback='res/learned_bot.npz')
+DATA_PROVIDER = config.get('data', 'PROVIDER', fallback='http')
+DATA_BUNDLE_PATH = config.get('data', 'BUNDLE_PATH', fallback='res/dex.json.gz')
+DECISION_EXECUTOR = config.get('decision', 'EXECUTOR', fallback='inline')
+DECISION_WORKERS = config.getint('decision', 'WORKERS', fallback=0)
+DECISION_DEADLINE = config.getfloat('decision', 'DEADLINE', fallback=20.0)
+
+
+class Account(NamedTuple):
+    """Credentials of a Showdown user controlled by the bot, and the player it stands against."""
+    username: str
+    password: str
+    player: str
+
+
+# Prefix of the config sections that describe additional accounts, e.g. [account:second]
+ACCOUNT_SECTION_PREFIX = 'account:'
+
+
+def load_accounts(parser: configparser.ConfigParser) -> list[Account]:
+    """
+    Build the list of accounts the bot should drive.
+
+    The [bot] section is always the first account. Every section named "account:<label>" adds another one, and
+    falls back to the [bot] player when it doesn't specify its own.
+
+    Args:
+        parser (ConfigParser): The parsed configuration.
+
+    Returns:
+        list[Account]: All the configured accounts, in the order they appear in the config.
+    """
+    accounts = [Account(USERNAME, PASSWORD, PLAYER)]
+    for section in parser.sections():
+        if section.startswith(ACCOUNT_SECTION_PREFIX):
+            accounts.append(Account(parser[section]['USERNAME'],
+                                    parser[section]['PASSWORD'],
+                                    parser[section].get('PLAYER', PLAYER)))
+    return accounts
+
+
+ACCOUNTS = load_accounts(config)
+
 
 class BOT_MODE(Enum):
     STANDBY = 0  # Wait to a command
@@ -29,13 +86,11 @@ class BOT_MODE(Enum):
 
 
 # List of available formats to play
-FORMATS = [
-    "gen9randombattle"
-]
+FORMATS = [battle_format.strip() for battle_format in
+           config.get('Setting', 'FORMATS', fallback='gen9randombattle').split(',') if battle_format.strip()]
 
-BATTLES = []  # A list of all current fights
-MAX_BATTLES_COUNT = 1
-CUR_BATTLES_COUNT = 0
+# How many searches and battles a session keeps in flight
+MAX_BATTLES_COUNT = config.getint('Setting', 'MAX_BATTLES', fallback=1)
 
 URL_API = 'https://pokeapi.co/api/v2/'
 
@@ -0,0 +1,257 @@
+"""
+metrics.py - Instrumentation Module
+
+This module keeps the bot's counters, gauges and histograms and renders them in the Prometheus text format. The
+metrics are process-wide, so every part of the project can update them without knowing who reads them.
+"""
+import threading
+from abc import ABC, abstractmethod
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric(ABC):
+    """
+    Base class of a metric, optionally split by labels.
+
+    Attributes:
+        name (str): The name of the metric.
+        help (str): A description of the metric.
+        labelnames (tuple[str]): The names of the labels of the metric.
+    """
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, *values):
+        """
+        Get the child of the metric for the given label values.
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects the labels {self.labelnames}')
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._create_child())
+        return child
+
+    @abstractmethod
+    def _create_child(self):
+        """
+        Create the child that keeps the value of a single set of label values.
+        """
+
+    def _default_child(self):
+        if self.labelnames:
+            raise ValueError(f'{self.name} has labels, use labels() first')
+        return self.labels()
+
+    def samples(self):
+        """
+        Yield (suffix, labels, value) for every sample of the metric.
+        """
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            for suffix, extra_labels, value in child.samples():
+                yield suffix, {**labels, **extra_labels}, value
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield '', {}, self.value
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g. the number of frames received."""
+    type = 'counter'
+
+    def _create_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default_child().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Compute the value of the gauge when it's read, instead of keeping it up to date."""
+        self.function = function
+
+    def samples(self):
+        yield '', {}, self.function() if self.function is not None else self.value
+
+
+class Gauge(Metric):
+    """A value that goes up and down, e.g. the number of live battles."""
+    type = 'gauge'
+
+    def _create_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default_child().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default_child().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default_child().dec(amount)
+
+    def set_function(self, function):
+        self._default_child().set_function(function)
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield '_bucket', {'le': repr(float(bound))}, cumulative
+        yield '_bucket', {'le': '+Inf'}, self.count
+        yield '_sum', {}, self.sum
+        yield '_count', {}, self.count
+
+
+class Histogram(Metric):
+    """A distribution of observed values, e.g. the latency of decisions."""
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _create_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default_child().observe(value)
+
+
+class Registry:
+    """A collection of metrics that are rendered together."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f'A metric named {metric.name} is already registered')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Render all the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for suffix, labels, value in metric.samples():
+                name = metric.name + suffix
+                if labels:
+                    label_text = ','.join(f'{key}="{escape_label(value)}"' for key, value in labels.items())
+                    name = f'{name}{{{label_text}}}'
+                lines.append(f'{name} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value: float) -> str:
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+MAKE_ACTION_LATENCY = REGISTRY.register(Histogram(
+    'showdownbot_make_action_seconds', 'Time taken by the bots to make a battle action', ('bot_type',)))
+DECISION_TIMEOUTS = REGISTRY.register(Counter(
+    'showdownbot_decision_timeouts_total', 'Decisions cancelled at their deadline', ('bot_type',)))
+DATA_FETCHES = REGISTRY.register(Counter(
+    'showdownbot_data_fetches_total', 'Requests sent to the data API, by resource type', ('resource',)))
+CACHE_HITS = REGISTRY.register(Counter(
+    'showdownbot_cache_hits_total', 'Lookups answered by a cache', ('cache',)))
+CACHE_MISSES = REGISTRY.register(Counter(
+    'showdownbot_cache_misses_total', 'Lookups a cache could not answer', ('cache',)))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    'showdownbot_cache_hit_ratio', 'Share of the lookups answered by a cache', ('cache',)))
+FRAMES_RECEIVED = REGISTRY.register(Counter(
+    'showdownbot_frames_received_total', 'Websocket frames received from Showdown'))
+FRAMES_SENT = REGISTRY.register(Counter(
+    'showdownbot_frames_sent_total', 'Websocket frames sent to Showdown'))
+LIVE_BATTLES = REGISTRY.register(Gauge(
+    'showdownbot_live_battles', 'Battles that are currently played'))
+BATTLES_MEMORY = REGISTRY.register(Gauge(
+    'showdownbot_battles_memory_bytes', 'Memory held by the live battles, without the shared species and move records'))
+RECONNECTS = REGISTRY.register(Counter(
+    'showdownbot_reconnects_total', 'Times a session lost its connection and reconnected'))
+RECONNECT_DURATION = REGISTRY.register(Histogram(
+    'showdownbot_reconnect_seconds', 'Time from a lost connection to the login of the new one',
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)))
+INBOUND_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'showdownbot_inbound_queue_depth', 'Frames waiting to be handled, by kind of room', ('room_kind',)))
+INBOUND_DROPPED = REGISTRY.register(Counter(
+    'showdownbot_inbound_dropped_total', 'Frames of non battle rooms that were shed under overload'))
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """
+    Count a lookup of the given cache, and keep its hit ratio gauge reading the counters.
+    """
+    if hit:
+        CACHE_HITS.labels(cache).inc()
+    else:
+        CACHE_MISSES.labels(cache).inc()
+
+    ratio = CACHE_HIT_RATIO.labels(cache)
+    if ratio.function is None:
+        hits, misses = CACHE_HITS.labels(cache), CACHE_MISSES.labels(cache)
+        ratio.set_function(lambda: hits.value / (hits.value + misses.value) if hits.value + misses.value else 0.0)
@@ -0,0 +1,70 @@
+"""
+Dex entries of the species and moves the tests use, so they run offline through an InMemoryProvider.
+"""
+import unittest
+from Engine.data_provider import InMemoryProvider, set_provider
+
+CARBINK_LEARNSET = [
+    'tackle', 'body-slam', 'take-down', 'hyper-beam', 'rock-throw', 'toxic', 'psychic', 'double-team', 'harden',
+    'light-screen', 'reflect', 'flash', 'explosion', 'rest', 'rock-slide', 'sharpen', 'substitute', 'snore', 'flail',
+    'protect', 'spikes', 'sandstorm', 'endure', 'charm', 'swagger', 'sleep-talk', 'return', 'frustration', 'safeguard',
+    'hidden-power', 'rain-dance', 'sunny-day', 'psych-up', 'ancient-power', 'hail', 'facade', 'nature-power',
+    'magic-coat', 'skill-swap', 'secret-power', 'rock-tomb', 'sand-tomb', 'iron-defense', 'covet', 'calm-mind',
+    'rock-blast', 'gravity', 'gyro-ball', 'guard-swap', 'magnet-rise', 'rock-polish', 'power-gem', 'earth-power',
+    'giga-impact', 'flash-cannon', 'trick-room', 'iron-head', 'stone-edge', 'stealth-rock', 'guard-split',
+    'wonder-room', 'telekinesis', 'smack-down', 'heavy-slam', 'after-you', 'round', 'ally-switch', 'misty-terrain',
+    'moonblast', 'confide', 'dazzling-gleam', 'stomping-tantrum', 'body-press', 'meteor-beam', 'misty-explosion',
+    'terrain-pulse', 'tera-blast']
+
+SPECIES = {
+    'Carbink': {'name': 'Carbink', 'types': ['rock', 'fairy'],
+                'base_stats': {'hp': 50, 'atk': 50, 'def': 150, 'spa': 50, 'spd': 150, 'spe': 50},
+                'abilities': ['clear-body', 'sturdy'], 'learnset': CARBINK_LEARNSET},
+    'Copperajah': {'name': 'Copperajah', 'types': ['steel'],
+                   'base_stats': {'hp': 122, 'atk': 130, 'def': 69, 'spa': 80, 'spd': 69, 'spe': 30},
+                   'abilities': ['sheer-force', 'heavy-metal'], 'learnset': ['heavy-slam', 'play-rough']},
+    'Roaring Moon': {'name': 'Roaring Moon', 'types': ['dragon', 'dark'],
+                     'base_stats': {'hp': 105, 'atk': 139, 'def': 71, 'spa': 55, 'spd': 101, 'spe': 119},
+                     'abilities': ['protosynthesis'], 'learnset': ['dragon-dance', 'acrobatics', 'knock-off']},
+}
+
+MOVES = {
+    'Shadow Sneak': {'name': 'Shadow Sneak', 'type': 'ghost', 'power': 40, 'accuracy': 1.0, 'priority': 1,
+                     'category': 'physical'},
+    'Armor Cannon': {'name': 'Armor Cannon', 'type': 'fire', 'power': 120, 'accuracy': 1.0, 'priority': 0,
+                     'category': 'special'},
+    'Coil': {'name': 'Coil', 'type': 'poison', 'power': 0, 'accuracy': 1.0, 'priority': 0, 'category': 'status'},
+    'Glare': {'name': 'Glare', 'type': 'normal', 'power': 0, 'accuracy': 1.0, 'priority': 0, 'category': 'status'},
+    'Earthquake': {'name': 'Earthquake', 'type': 'ground', 'power': 100, 'accuracy': 1.0, 'priority': 0,
+                   'category': 'physical'},
+    'Stone Edge': {'name': 'Stone Edge', 'type': 'rock', 'power': 100, 'accuracy': 0.8, 'priority': 0,
+                   'category': 'physical'},
+    'Tackle': {'name': 'Tackle', 'type': 'normal', 'power': 40, 'accuracy': 1.0, 'priority': 0,
+               'category': 'physical'},
+    'Ember': {'name': 'Ember', 'type': 'fire', 'power': 40, 'accuracy': 1.0, 'priority': 0, 'category': 'special'},
+    'Thunderbolt': {'name': 'Thunderbolt', 'type': 'electric', 'power': 90, 'accuracy': 1.0, 'priority': 0,
+                    'category': 'special'},
+}
+
+
+def species_entry(name: str, *types: str, base_stat: int = 80) -> dict:
+    """A made-up species of the given types, with the same base stat everywhere"""
+    return {'name': name, 'types': list(types),
+            'base_stats': dict.fromkeys(('hp', 'atk', 'def', 'spa', 'spd', 'spe'), base_stat),
+            'abilities': [], 'learnset': []}
+
+
+def fixture_provider(species: dict[str, dict] = None, moves: dict[str, dict] = None) -> InMemoryProvider:
+    """The provider of the fixtures, with the given entries added (or replacing the fixtures of the same name)"""
+    return InMemoryProvider({**SPECIES, **(species or {})}, {**MOVES, **(moves or {})})
+
+
+def use_fixture_provider(test_case: unittest.TestCase, species: dict[str, dict] = None,
+                         moves: dict[str, dict] = None) -> InMemoryProvider:
+    """
+    Read the data from the fixtures during a test, e.g. in setUp. The previous provider is restored when the test
+    ends, which clears the data resolved from the fixtures.
+    """
+    provider = fixture_provider(species, moves)
+    test_case.addCleanup(set_provider, set_provider(provider))
+    return provider
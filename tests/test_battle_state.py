@@ -0,0 +1,94 @@
+import unittest
+from Engine.pokemon import EnemyPokemon
+from Engine.team import Team
+from Engine.battle_state import BattleState
+from tests.dex_fixtures import species_entry, use_fixture_provider
+
+
+class TestBattleState(unittest.TestCase):
+    NAMES = ['Pikachu', 'Charizard']
+
+    def setUp(self):
+        use_fixture_provider(self, {name: species_entry(name, 'normal', base_stat=100) for name in self.NAMES})
+        self.team = Team([EnemyPokemon(name, '80', '100/100') for name in self.NAMES])
+        self.team.set_active('Pikachu')
+        self.pikachu = self.team.get('Pikachu')
+        self.state = BattleState(self.resolve)
+
+    def resolve(self, ident):
+        side, _, name = ident.partition(': ')
+        if not side.startswith('p2'):
+            return None
+        return self.team, self.team.get(name) if name else None
+
+    def test_damage_heal_and_faint(self):
+        self.assertTrue(self.state.apply('-damage', ['p2a: Pikachu', '40/100 par']))
+        self.assertEqual(self.pikachu.curr_health, '40')
+        self.assertEqual(self.pikachu.status, 'par')
+        self.state.apply('-heal', ['p2a: Pikachu', '70/100 par', '[from] item: Leftovers'])
+        self.assertEqual(self.pikachu.curr_health, '70')
+        self.state.apply('faint', ['p2a: Pikachu'])
+        self.assertFalse(self.pikachu.is_alive())
+        self.assertEqual(self.team.alive_count, 1)
+
+    def test_boosts(self):
+        self.state.apply('-boost', ['p2a: Pikachu', 'atk', '2'])
+        self.state.apply('-unboost', ['p2a: Pikachu', 'spe', '1'])
+        self.assertEqual(self.pikachu.boosts, {'atk': 2, 'spe': -1})
+        self.assertEqual(self.pikachu.get_stat('atk'), 2 * self.pikachu.stats['atk'])
+        self.state.apply('-boost', ['p2a: Pikachu', 'atk', '6'])
+        self.assertEqual(self.pikachu.boosts['atk'], 6)
+        self.state.apply('-clearnegativeboost', ['p2a: Pikachu'])
+        self.assertEqual(self.pikachu.boosts, {'atk': 6})
+        self.state.apply('-setboost', ['p2a: Pikachu', 'atk', '0'])
+        self.assertEqual(self.pikachu.boosts, {})
+
+        # Leaving the field resets the stages
+        self.state.apply('-boost', ['p2a: Pikachu', 'def', '1'])
+        self.state.apply('switch', ['p2a: Charizard', 'Charizard, L80', '100/100'])
+        self.assertEqual(self.pikachu.boosts, {})
+
+    def test_clear_all_boosts(self):
+        self.state.apply('-unboost', ['p2a: Pikachu', 'def', '2'])
+        self.assertEqual(self.pikachu.get_stat('atk'), self.pikachu.stats['atk'])
+        self.assertTrue(self.state.apply('-clearallboost', []))
+        self.assertEqual(self.pikachu.boosts, {})
+
+    def test_status_item_and_ability(self):
+        self.state.apply('-status', ['p2a: Pikachu', 'brn'])
+        self.assertEqual(self.pikachu.status, 'brn')
+        self.state.apply('-curestatus', ['p2a: Pikachu', 'brn', '[msg]'])
+        self.assertIsNone(self.pikachu.status)
+        self.state.apply('-item', ['p2a: Pikachu', 'Choice Scarf', '[from] move: Trick'])
+        self.assertEqual(self.pikachu.item, 'choicescarf')
+        self.state.apply('-enditem', ['p2a: Pikachu', 'Choice Scarf'])
+        self.assertIsNone(self.pikachu.item)
+        self.state.apply('-ability', ['p2a: Pikachu', 'Lightning Rod'])
+        self.assertEqual(self.pikachu.ability, 'lightningrod')
+
+    def test_side_and_field(self):
+        self.state.apply('-sidestart', ['p1: bot', 'move: Stealth Rock'])
+        self.state.apply('-sidestart', ['p1: bot', 'Spikes'])
+        self.state.apply('-sidestart', ['p1: bot', 'Spikes'])
+        self.assertEqual(self.state.side('p1').conditions, {'stealthrock': 1, 'spikes': 2})
+        self.state.apply('-sideend', ['p1: bot', 'Spikes', '[from] move: Rapid Spin'])
+        self.assertEqual(self.state.side('p1').layers('Spikes'), 0)
+
+        self.state.apply('-weather', ['RainDance'])
+        self.assertEqual(self.state.weather, 'RainDance')
+        self.state.apply('-weather', ['none'])
+        self.assertIsNone(self.state.weather)
+        self.state.apply('-fieldstart', ['move: Electric Terrain'])
+        self.assertEqual(self.state.fields, {'electricterrain'})
+        self.state.apply('-fieldend', ['move: Electric Terrain'])
+        self.assertEqual(self.state.fields, set())
+
+    def test_ignores_unknown_and_malformed_actions(self):
+        self.assertFalse(self.state.apply('-crit', ['p2a: Pikachu']))
+        self.assertFalse(self.state.apply('-boost', ['p2a: Pikachu', 'atk']))
+        self.assertTrue(self.state.apply('-boost', ['p1a: Ghost', 'atk', '1']))
+        self.assertEqual(self.pikachu.boosts, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
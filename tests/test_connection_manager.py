@@ -0,0 +1,49 @@
+import configparser
+import unittest
+from constant_variable import Account, BOT_MODE, load_accounts, USERNAME
+from web_socket.connection_manager import ConnectionManager
+
+
+class TestConnectionManager(unittest.TestCase):
+    def test_load_accounts_reads_account_sections(self):
+        parser = configparser.ConfigParser()
+        parser.read_string("""
+            [account:second]
+            USERNAME = secondbot
+            PASSWORD = pass2
+            PLAYER = someone
+
+            [account:third]
+            USERNAME = thirdbot
+            PASSWORD = pass3
+        """)
+
+        accounts = load_accounts(parser)
+
+        # The [bot] account is always first
+        self.assertEqual(len(accounts), 3)
+        self.assertEqual(accounts[0].username, USERNAME)
+        self.assertEqual(accounts[1], Account('secondbot', 'pass2', 'someone'))
+
+        # An account without a player falls back to the [bot] player
+        self.assertEqual(accounts[2].username, 'thirdbot')
+        self.assertEqual(accounts[2].player, accounts[0].player)
+
+    def test_sessions_are_independent(self):
+        accounts = [Account('firstbot', '1', 'p'), Account('secondbot', '2', 'p')]
+        manager = ConnectionManager(accounts, 'ws://localhost', BOT_MODE.SEARCH)
+
+        self.assertEqual([session.username for session in manager.sessions], ['firstbot', 'secondbot'])
+
+        # Each session owns its own battles
+        manager.sessions[0].battles.append('battle-1')
+        self.assertEqual(manager.sessions[1].battles, [])
+        self.assertEqual(manager.get_battles(), ['battle-1'])
+
+    def test_no_accounts_throws(self):
+        with self.assertRaises(ValueError):
+            ConnectionManager([], 'ws://localhost', BOT_MODE.SEARCH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from Engine import api
+from Engine.data_provider import BUNDLE, HTTP, BundleProvider, HttpProvider, InMemoryProvider, create_provider, \
+    get_provider, index_names, read_bundle, set_provider, write_bundle
+from Engine.names import MOVE_INDEX, SPECIES_INDEX, move_key, species_key
+from Engine.move import Move, move_data_count
+from Engine.pokemon import EnemyPokemon
+from Engine.species import species_count
+from Engine.stat_calculator import STAT_CALCULATOR
+from tests.dex_fixtures import MOVES, SPECIES, fixture_provider
+
+
+class TestInMemoryProvider(unittest.TestCase):
+    def test_entries_by_id(self):
+        provider = fixture_provider()
+        self.assertEqual(provider.species('roaringmoon')['types'], ['dragon', 'dark'])
+        self.assertEqual(provider.species('Roaring Moon'), provider.species('roaring-moon'))
+        self.assertEqual(provider.move('shadowsneak')['priority'], 1)
+        with self.assertRaises(ValueError):
+            provider.species('Missingno')
+        with self.assertRaises(ValueError):
+            provider.move('Struggle Bug')
+
+
+class TestBundleProvider(unittest.TestCase):
+    def test_round_trip(self):
+        for name in ('dex.json', 'dex.json.gz'):
+            with self.subTest(name=name), tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'res', name)
+                self.assertGreater(write_bundle(path, SPECIES, MOVES), 0)
+                self.assertFalse(os.path.exists(f'{path}.tmp'))
+
+                provider = create_provider(BUNDLE, path)
+                self.assertIsInstance(provider, BundleProvider)
+                self.assertEqual(provider.species('carbink'), SPECIES['Carbink'])
+                self.assertEqual(provider.move('Stone Edge'), MOVES['Stone Edge'])
+
+    def test_invalid_bundle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dex.json')
+            with open(path, 'w') as file:
+                file.write('{"version": 0, "species": {}, "moves": {}}')
+            with self.assertRaises(ValueError):
+                read_bundle(path)
+            with self.assertRaises(FileNotFoundError):
+                BundleProvider(os.path.join(directory, 'missing.json'))
+
+
+class TestHttpProvider(unittest.TestCase):
+    SPECIES_URL = 'https://pokeapi.co/api/v2/pokemon/carbink'
+    MOVE_URL = 'https://pokeapi.co/api/v2/move/stone-edge'
+    SPECIES_LIST_URL = 'https://pokeapi.co/api/v2/pokemon/?limit=100000'
+    MOVE_LIST_URL = 'https://pokeapi.co/api/v2/move/?limit=100000'
+
+    def setUp(self):
+        api.load_cached_responses({
+            self.SPECIES_URL: {'types': [{'type': {'name': 'rock'}}, {'type': {'name': 'fairy'}}],
+                               'stats': [{'stat': {'name': 'hp'}, 'base_stat': 50},
+                                         {'stat': {'name': 'special-defense'}, 'base_stat': 150}],
+                               'abilities': [{'ability': {'name': 'sturdy'}}],
+                               'moves': [{'move': {'name': 'moonblast'}}]},
+            self.MOVE_URL: {'type': {'name': 'rock'}, 'power': 100, 'accuracy': 80, 'priority': 0,
+                            'damage_class': {'name': 'physical'}},
+            self.SPECIES_LIST_URL: {'results': [{'name': 'roaring-moon'}, {'name': 'toxtricity-amped'}]},
+            self.MOVE_LIST_URL: {'results': [{'name': 'kings-shield'}, {'name': 'stone-edge'}]},
+        })
+        self.indexed_keys = dict(SPECIES_INDEX.get_keys()), dict(MOVE_INDEX.get_keys())
+
+    def tearDown(self):
+        for url in (self.SPECIES_URL, self.MOVE_URL, self.SPECIES_LIST_URL, self.MOVE_LIST_URL):
+            api.get_cached_responses().pop(url, None)
+        for index, keys in zip((SPECIES_INDEX, MOVE_INDEX), self.indexed_keys):
+            index.get_keys().clear()
+            index.get_keys().update(keys)
+
+    def test_translation_to_dex_entries(self):
+        provider = create_provider(HTTP)
+        self.assertIsInstance(provider, HttpProvider)
+        self.assertEqual(provider.species('Carbink'),
+                         {'name': 'Carbink', 'types': ['rock', 'fairy'], 'base_stats': {'hp': 50, 'spd': 150},
+                          'abilities': ['sturdy'], 'learnset': ['moonblast']})
+        self.assertEqual(provider.move('Stone Edge'),
+                         {'name': 'Stone Edge', 'type': 'rock', 'power': 100, 'accuracy': 0.8, 'priority': 0,
+                          'category': 'physical'})
+
+    def test_index_names(self):
+        self.assertEqual(index_names(HttpProvider()), 4)
+        self.assertEqual(species_key('roaringmoon'), 'roaring-moon')
+        self.assertEqual(species_key('toxtricityamped'), 'toxtricity-amped')
+        self.assertEqual(move_key('kingsshield'), 'kings-shield')
+
+
+class TestSetProvider(unittest.TestCase):
+    def test_data_of_the_previous_provider_is_cleared(self):
+        previous = set_provider(fixture_provider())
+        try:
+            EnemyPokemon('Carbink', '90', '236/236')
+            Move('Shadow Sneak', '48', False)
+            self.assertEqual((species_count(), move_data_count(), len(STAT_CALCULATOR)), (1, 1, 1))
+
+            replacement = InMemoryProvider({'Carbink': dict(SPECIES['Carbink'], types=['rock'])})
+            set_provider(replacement)
+            self.assertIs(get_provider(), replacement)
+            self.assertEqual((species_count(), move_data_count(), len(STAT_CALCULATOR)), (0, 0, 0))
+            self.assertEqual(EnemyPokemon('Carbink', '90', '236/236').types, ('rock',))
+        finally:
+            set_provider(previous)
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            create_provider('ftp')
+
+
+if __name__ == '__main__':
+    unittest.main()
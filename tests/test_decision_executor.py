@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from BattleBots.decision_executor import INLINE, PROCESS, THREAD, create_executor, get_executor, run_decision, \
+    set_executor, shutdown_executor
+
+
+def thread_name(state):
+    return threading.current_thread().name, state
+
+
+def slow_sum(state):
+    time.sleep(0.5)
+    return sum(state)
+
+
+class TestCreateExecutor(unittest.TestCase):
+    def test_kinds(self):
+        self.assertIsNone(create_executor(INLINE))
+        executor = create_executor(THREAD, 2)
+        self.assertIsInstance(executor, ThreadPoolExecutor)
+        executor.shutdown()
+        executor = create_executor(PROCESS, 1)
+        self.assertIsInstance(executor, ProcessPoolExecutor)
+        executor.shutdown()
+        with self.assertRaises(ValueError):
+            create_executor('gpu')
+
+
+class TestRunDecision(unittest.IsolatedAsyncioTestCase):
+    def tearDown(self):
+        shutdown_executor()
+
+    async def test_inline(self):
+        self.assertIsNone(get_executor())
+        self.assertEqual(await run_decision(thread_name, 1), (threading.current_thread().name, 1))
+
+    async def test_thread_pool(self):
+        set_executor(create_executor(THREAD, 1))
+        name, state = await run_decision(thread_name, (1, 2))
+        self.assertTrue(name.startswith('decision'))
+        self.assertEqual(state, (1, 2))
+
+    async def test_process_pool(self):
+        set_executor(create_executor(PROCESS, 1))
+        self.assertEqual(await run_decision(sum, (1, 2, 3), deadline=30), 6)
+
+    async def test_deadline(self):
+        set_executor(create_executor(THREAD, 1))
+        start = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            await run_decision(slow_sum, (1, 2), deadline=0.05)
+        # The loop got back to work at the deadline, not when the worker finished
+        self.assertLess(time.perf_counter() - start, 0.4)
+
+    async def test_inline_decisions_have_no_deadline(self):
+        self.assertEqual(await run_decision(slow_sum, (1, 2), deadline=0.05), 3)
+
+    async def test_shutdown(self):
+        set_executor(create_executor(THREAD, 1))
+        shutdown_executor()
+        self.assertIsNone(get_executor())
+        self.assertEqual(await run_decision(sum, (1, 2)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
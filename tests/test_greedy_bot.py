@@ -1,7 +1,13 @@
+import asyncio
 import unittest
+from unittest.mock import AsyncMock, patch
 from Engine.pokemon import EnemyPokemon, BotPokemon, create_pokemon_objects_from_json
 from Engine.move import Move
+from Engine.usage_stats import UsageStats, MOVE
+from BattleBots import greedy_bot
+from BattleBots.decision_executor import PROCESS, create_executor, set_executor, shutdown_executor
 from BattleBots.greedy_bot import GreedyBot
+from tests.dex_fixtures import species_entry, use_fixture_provider
 
 
 class TestGreedyBot(unittest.TestCase):
@@ -9,5 +15,118 @@ class TestGreedyBot(unittest.TestCase):
         self.fail()
 
 
+SPECIES = {'Carbink': species_entry('Carbink', 'rock'), 'Copperajah': species_entry('Copperajah', 'steel'),
+           'Pikachu': species_entry('Pikachu', 'electric'), 'Charizard': species_entry('Charizard', 'fire')}
+
+REQUEST = ('{"active":[{"moves":[{"move":"Tackle","id":"tackle","pp":35,"maxpp":35,"disabled":false},'
+           '{"move":"Ember","id":"ember","pp":25,"maxpp":25,"disabled":false}]}],'
+           '"side":{"name":"bot","id":"p2","pokemon":['
+           '{"ident":"p2: Carbink","details":"Carbink, L90","condition":"236/236","active":true,'
+           '"stats":{"atk":95,"def":321,"spa":141,"spd":321,"spe":141}},'
+           '{"ident":"p2: Copperajah","details":"Copperajah, L75, F","condition":"296/296","active":false,'
+           '"stats":{"atk":261,"def":182,"spa":156,"spd":173,"spe":174}}]},"rqid":RQID}')
+
+
+class TestGreedyBotSpeculation(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.provider = use_fixture_provider(self, SPECIES)
+
+    async def play_turn(self, bot, rqid: int):
+        await bot.update_bot_team(REQUEST.replace('RQID', str(rqid)))
+        await bot.take_action(bot.sender)
+        # Let the speculation run in the idle time
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def test_enemy_switch_is_precomputed(self):
+        bot = GreedyBot('battle-gen9randombattle-1', AsyncMock())
+        bot.player_id = 'p2'
+        await bot.update_enemy_team('Charizard', '80', '100/100')
+        await bot.update_enemy_team('Pikachu', '80', '100/100')
+        await self.play_turn(bot, 1)
+
+        # The enemy stays, or switches to Charizard
+        self.assertEqual(len(bot._speculations), 2)
+
+        await bot.update_enemy_team('Charizard', '80', '100/100')
+        with patch.object(greedy_bot, 'score_moves', wraps=greedy_bot.score_moves) as score_moves:
+            await bot.update_bot_team(REQUEST.replace('RQID', '2'))
+            await bot.take_action(bot.sender)
+        score_moves.assert_not_called()
+        self.assertEqual(bot.sender.send_move.await_count, 2)
+
+    async def test_changed_state_is_computed(self):
+        bot = GreedyBot('battle-gen9randombattle-1', AsyncMock())
+        bot.player_id = 'p2'
+        await bot.update_enemy_team('Pikachu', '80', '100/100')
+        await self.play_turn(bot, 1)
+
+        # A boost wasn't speculated: the utilities are computed as usual
+        bot.enemy_pokemon.boosts = {'atk': 2}
+        with patch.object(greedy_bot, 'score_moves', wraps=greedy_bot.score_moves) as score_moves:
+            await bot.update_bot_team(REQUEST.replace('RQID', '2'))
+            await bot.take_action(bot.sender)
+        score_moves.assert_called_once()
+
+    async def test_usage_stats_are_in_the_key(self):
+        bot = GreedyBot('battle-gen9randombattle-1', AsyncMock())
+        bot.usage_stats = UsageStats()
+        await bot.update_enemy_team('Pikachu', '80', '100/100')
+        await bot.update_bot_team(REQUEST.replace('RQID', '1'))
+        key = bot.decision_key(bot.curr_pokemon_ref, bot.enemy_pokemon)
+
+        bot.usage_stats.observe_seen('Pikachu')
+        bot.usage_stats.observe('Pikachu', MOVE, 'Thunderbolt')
+        self.assertNotEqual(bot.decision_key(bot.curr_pokemon_ref, bot.enemy_pokemon), key)
+
+    async def test_unread_moves_are_not_speculated(self):
+        bot = GreedyBot('battle-gen9randombattle-1', AsyncMock())
+        bot.player_id = 'p2'
+        bot.usage_stats = UsageStats()
+        # Charizard is predicted a move whose data wasn't read yet
+        bot.usage_stats.observe_seen('Charizard')
+        bot.usage_stats.observe('Charizard', MOVE, 'Thunderbolt')
+        await bot.update_enemy_team('Charizard', '80', '100/100')
+        await bot.update_enemy_team('Pikachu', '80', '100/100')
+        with patch.object(self.provider, 'move', wraps=self.provider.move) as read_move:
+            await self.play_turn(bot, 1)
+
+        self.assertEqual(len(bot._speculations), 1)
+        self.assertNotIn('Thunderbolt', [call.args[0] for call in read_move.call_args_list])
+
+    async def test_illegal_moves_are_skipped(self):
+        bot = GreedyBot('battle-gen9randombattle-1', AsyncMock())
+        bot.player_id = 'p2'
+        bot.speculation_enabled = False
+        await bot.update_enemy_team('Pikachu', '80', '100/100')
+        # Copperajah has fainted, and Ember has no PP left
+        await bot.update_bot_team(REQUEST.replace('RQID', '1').replace('"pp":25', '"pp":0')
+                                  .replace('296/296', '0 fnt'))
+        await bot.take_action(bot.sender)
+        bot.sender.send_move.assert_awaited_once_with(bot.battle_id, 1)
+        bot.sender.send_switch.assert_not_awaited()
+
+    async def test_moves_are_scored_on_the_executor(self):
+        set_executor(create_executor(PROCESS, 1))
+        self.addCleanup(shutdown_executor)
+        bot = GreedyBot('battle-gen9randombattle-1', AsyncMock())
+        bot.player_id = 'p2'
+        bot.speculation_enabled = False
+        bot.decision_deadline = 30
+        await bot.update_enemy_team('Pikachu', '80', '100/100')
+        await bot.update_bot_team(REQUEST.replace('RQID', '1'))
+        await bot.take_action(bot.sender)
+        # Ember, at the better attacking stat of Carbink, and not the first move a timeout falls back to
+        bot.sender.send_move.assert_awaited_once_with(bot.battle_id, 2)
+
+    async def test_speculation_disabled(self):
+        bot = GreedyBot('battle-gen9randombattle-1', AsyncMock())
+        bot.player_id = 'p2'
+        bot.speculation_enabled = False
+        await bot.update_enemy_team('Pikachu', '80', '100/100')
+        await self.play_turn(bot, 1)
+        self.assertEqual(bot._speculations, {})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import io
+import unittest
+from contextlib import redirect_stderr
+from web_socket.inbound_router import InboundRouter, room_of
+
+
+class TestInboundRouter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.handled = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def handler(self, message: str):
+        await self.release.wait()
+        self.handled.append(message)
+
+    async def test_order_is_kept_within_a_battle(self):
+        router = InboundRouter(self.handler)
+        for turn in range(5):
+            await router.route(f'>battle-gen9randombattle-1\n|turn|{turn}')
+            await router.route(f'>battle-gen9randombattle-2\n|turn|{turn}')
+        await router.join()
+        await router.close()
+
+        first_battle = [message for message in self.handled if 'battle-gen9randombattle-1' in message]
+        self.assertEqual(first_battle, [f'>battle-gen9randombattle-1\n|turn|{turn}' for turn in range(5)])
+        self.assertEqual(len(self.handled), 10)
+
+    async def test_battle_frames_go_before_other_rooms(self):
+        router = InboundRouter(self.handler)
+        self.release.clear()
+        await router.route('>battle-gen9randombattle-1\n|turn|1')
+        await router.route('|pm| someone| joshcoco|hi')
+        await router.route('>battle-gen9randombattle-1\n|turn|2')
+        self.release.set()
+        await router.join()
+        await router.close()
+
+        self.assertEqual(self.handled[-1], '|pm| someone| joshcoco|hi')
+
+    async def test_other_rooms_are_shed_under_overload(self):
+        router = InboundRouter(self.handler, global_queue_size=2)
+        self.release.clear()
+        for index in range(5):
+            await router.route(f'|pm| someone| joshcoco|{index}')
+        # Critical frames are kept even when the queue is full
+        await asyncio.wait_for(asyncio.gather(router.route('|updatesearch|{}'), self._release_soon()), 1)
+        await router.join()
+        await router.close()
+
+        self.assertLessEqual(1, router.dropped)
+        self.assertIn('|updatesearch|{}', self.handled)
+
+    async def _release_soon(self):
+        await asyncio.sleep(0.01)
+        self.release.set()
+
+    async def test_closed_battle_room_is_removed(self):
+        router = InboundRouter(self.handler)
+        await router.route('>battle-gen9randombattle-1\n|win|joshcoco')
+        await router.route('>battle-gen9randombattle-1\n|deinit')
+        await router.join()
+        await asyncio.sleep(0)
+
+        self.assertNotIn('battle-gen9randombattle-1', router.queues)
+        await router.close()
+
+    async def test_handler_errors_do_not_stop_the_room(self):
+        async def failing_handler(message):
+            if 'bad' in message:
+                raise RuntimeError('bad frame')
+            self.handled.append(message)
+
+        router = InboundRouter(failing_handler)
+        await router.route('>battle-gen9randombattle-1\n|bad')
+        await router.route('>battle-gen9randombattle-1\n|turn|1')
+        await router.join()
+        await router.close()
+
+        self.assertEqual(self.handled, ['>battle-gen9randombattle-1\n|turn|1'])
+
+    async def test_handler_errors_go_to_the_error_handler(self):
+        errors = []
+
+        async def failing_handler(message):
+            raise RuntimeError(message)
+
+        async def error_handler(room, exception):
+            errors.append((room, str(exception)))
+
+        router = InboundRouter(failing_handler, error_handler)
+        with redirect_stderr(io.StringIO()) as output:
+            await router.route('>battle-gen9randombattle-1\n|bad')
+            await router.join()
+        self.assertIn('Traceback', output.getvalue())
+        self.assertFalse(router.failed.done())
+        await router.close()
+
+        self.assertEqual(errors, [('battle-gen9randombattle-1', '>battle-gen9randombattle-1\n|bad')])
+
+    async def test_fatal_errors_fail_the_router(self):
+        async def failing_handler(message):
+            raise RuntimeError('bad frame')
+
+        async def error_handler(room, exception):
+            raise exception
+
+        router = InboundRouter(failing_handler, error_handler)
+        with redirect_stderr(io.StringIO()):
+            await router.route('|challstr|4|abc')
+            with self.assertRaisesRegex(RuntimeError, 'bad frame'):
+                await asyncio.wait_for(router.failed, 1)
+        await router.close()
+
+    def test_room_of(self):
+        self.assertEqual(room_of('>battle-gen9randombattle-1\n|init|battle'), 'battle-gen9randombattle-1')
+        self.assertEqual(room_of('|challstr|4|abc'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
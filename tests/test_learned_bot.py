@@ -0,0 +1,116 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock
+from Engine.features import STATE_FEATURES, ACTION_FEATURES
+from BattleBots.decision_executor import THREAD, create_executor, set_executor, shutdown_executor
+from BattleBots.learned_bot import LearnedBot, MLPModel, INPUT_SIZE, np, fit_linear_model
+from constant_variable import ACTION
+from tests.dex_fixtures import species_entry, use_fixture_provider
+
+
+SPECIES = {'Carbink': species_entry('Carbink', 'rock'), 'Pikachu': species_entry('Pikachu', 'electric'),
+           'Copperajah': species_entry('Copperajah', 'steel')}
+
+REQUEST = ('{"active":[{"moves":[{"move":"Tackle","id":"tackle","pp":35,"maxpp":35,"disabled":false},'
+           '{"move":"Ember","id":"ember","pp":25,"maxpp":25,"disabled":false}]}],'
+           '"side":{"name":"bot","id":"p2","pokemon":['
+           '{"ident":"p2: Carbink","details":"Carbink, L90","condition":"236/236","active":true,'
+           '"stats":{"atk":95,"def":321,"spa":141,"spd":321,"spe":141}},'
+           '{"ident":"p2: Pikachu","details":"Pikachu, L92, F","condition":"200/200","active":false,'
+           '"stats":{"atk":150,"def":120,"spa":150,"spd":130,"spe":230}}]},"rqid":1}')
+
+
+def linear_model(**feature_weights) -> MLPModel:
+    """A linear model with the given weights of the action features"""
+    weights = np.zeros((INPUT_SIZE, 1))
+    for name, weight in feature_weights.items():
+        weights[len(STATE_FEATURES) + ACTION_FEATURES.index(name), 0] = weight
+    return MLPModel([weights], [np.zeros(1)])
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestMLPModel(unittest.TestCase):
+    def test_forward_scores_every_row(self):
+        model = MLPModel([np.ones((INPUT_SIZE, 3)), np.ones((3, 1))], [np.zeros(3), np.array([0.5])])
+        features = np.vstack([np.zeros(INPUT_SIZE), np.ones(INPUT_SIZE), -np.ones(INPUT_SIZE)])
+        # ReLU between the layers: negative hidden values don't count
+        np.testing.assert_allclose(model.forward(features), [0.5, 3 * INPUT_SIZE + 0.5, 0.5])
+
+    def test_save_and_load(self):
+        model = MLPModel([np.ones((INPUT_SIZE, 2)), np.ones((2, 1))], [np.zeros(2), np.ones(1)],
+                         mean=np.full(INPUT_SIZE, 0.5), scale=np.full(INPUT_SIZE, 2.0))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'res', 'model.npz')
+            model.save(path)
+            loaded = MLPModel.load(path)
+        features = np.ones((1, INPUT_SIZE))
+        np.testing.assert_allclose(loaded.forward(features), model.forward(features))
+
+    def test_wrong_input_size(self):
+        with self.assertRaises(ValueError):
+            MLPModel([np.ones((INPUT_SIZE + 1, 1))], [np.zeros(1)])
+
+    def test_fit_linear_model(self):
+        rng = np.random.default_rng(0)
+        state = rng.normal(size=(200, len(STATE_FEATURES)))
+        action = rng.normal(size=(200, len(ACTION_FEATURES)))
+        outcome = 2 * action[:, 0] - state[:, 1] + 0.5
+        with tempfile.TemporaryDirectory() as directory:
+            np.savez(os.path.join(directory, 'shard-000000.npz'), state=state[:100], action=action[:100],
+                     outcome=outcome[:100])
+            np.savez(os.path.join(directory, 'shard-000001.npz'), state=state[100:], action=action[100:],
+                     outcome=outcome[100:])
+            model = fit_linear_model(directory, l2=0)
+        np.testing.assert_allclose(model.forward(np.hstack([state, action])), outcome, atol=1e-3)
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestLearnedBot(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        use_fixture_provider(self, SPECIES)
+
+    async def create_bot(self, model: MLPModel) -> LearnedBot:
+        bot = LearnedBot('battle-gen9randombattle-1', AsyncMock(), model)
+        bot.player_id = 'p2'
+        bot.speculation_enabled = False
+        await bot.update_enemy_team('Copperajah', '80', '100/100')
+        await bot.update_bot_team(REQUEST)
+        return bot
+
+    async def test_candidate_actions(self):
+        bot = await self.create_bot(linear_model())
+        self.assertEqual(bot.candidate_actions(), [(ACTION.MOVE, 0), (ACTION.MOVE, 1), (ACTION.SWITCH, 1)])
+        self.assertEqual(bot.candidate_actions(ACTION.SWITCH), [(ACTION.SWITCH, 1)])
+        self.assertEqual(bot.candidate_actions(ACTION.MOVE), [(ACTION.MOVE, 0), (ACTION.MOVE, 1)])
+
+    async def test_best_move_is_made(self):
+        bot = await self.create_bot(linear_model(effectiveness=1.0, is_switch=-1.0))
+        await bot.take_action(bot.sender)
+        # Ember is super effective against the steel enemy
+        bot.sender.send_move.assert_awaited_once_with(bot.battle_id, 2)
+
+    async def test_best_switch_is_made(self):
+        bot = await self.create_bot(linear_model(is_switch=1.0))
+        await bot.take_action(bot.sender)
+        bot.sender.send_switch.assert_awaited_once_with(bot.battle_id, 2)
+
+    async def test_decision_on_a_thread_pool(self):
+        set_executor(create_executor(THREAD, 1))
+        try:
+            bot = await self.create_bot(linear_model(effectiveness=1.0, is_switch=-1.0))
+            await bot.take_action(bot.sender)
+            bot.sender.send_move.assert_awaited_once_with(bot.battle_id, 2)
+
+            # Past the deadline, the first legal action is taken instead
+            model = linear_model(is_switch=1.0)
+            forward = model.forward
+            model.forward = lambda features: time.sleep(0.3) or forward(features)
+            bot = await self.create_bot(model)
+            bot.decision_deadline = 0.05
+            await bot.take_action(bot.sender)
+            bot.sender.send_move.assert_awaited_once_with(bot.battle_id, 1)
+            bot.sender.send_switch.assert_not_awaited()
+        finally:
+            shutdown_executor()
@@ -0,0 +1,100 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from web_socket.login import LoginClient, LoginError
+
+
+class FakeActionHandler(BaseHTTPRequestHandler):
+    """A local action.php: accepts the password "secret", and answers upkeep requests of logged in cookies."""
+    requests_log = []
+    failures_left = 0
+
+    def do_POST(self):
+        data = {key: value[0] for key, value in parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode()).items()}
+        FakeActionHandler.requests_log.append(data)
+
+        if FakeActionHandler.failures_left:
+            FakeActionHandler.failures_left -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        headers = {}
+        if data['act'] == 'login' and data['pass'] == 'secret':
+            answer = {'actionsuccess': True, 'assertion': f'assertion-for-{data["challstr"]}'}
+            headers['Set-Cookie'] = 'sid=logged; Path=/'
+        elif data['act'] == 'upkeep' and 'sid=logged' in (self.headers['Cookie'] or ''):
+            answer = {'assertion': f'upkeep-for-{data["challstr"]}'}
+        else:
+            answer = {'actionsuccess': data['act'] == 'upkeep', 'assertion': ';;Wrong password'}
+
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write((']' + json.dumps(answer)).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLoginClient(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeActionHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/action.php'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeActionHandler.requests_log = []
+        FakeActionHandler.failures_left = 0
+        self.client = LoginClient(self.url, timeout=2, attempts=3, backoff_base=0.001)
+
+    def tearDown(self):
+        self.client.close()
+
+    async def test_login_then_upkeep_reuses_the_session(self):
+        assertion = await self.client.get_assertion('bot', 'secret', '4|abc')
+        self.assertEqual(assertion, 'assertion-for-4|abc')
+
+        # The second login is answered by the cookie, without sending the password
+        assertion = await self.client.get_assertion('bot', 'secret', '4|def')
+        self.assertEqual(assertion, 'upkeep-for-4|def')
+        self.assertEqual([data['act'] for data in FakeActionHandler.requests_log], ['login', 'upkeep'])
+
+    async def test_retries_server_errors(self):
+        FakeActionHandler.failures_left = 2
+
+        assertion = await self.client.get_assertion('bot', 'secret', '4|abc')
+
+        self.assertEqual(assertion, 'assertion-for-4|abc')
+        self.assertEqual(len(FakeActionHandler.requests_log), 3)
+
+    async def test_gives_up_after_all_attempts(self):
+        FakeActionHandler.failures_left = 5
+
+        with self.assertRaises(LoginError):
+            await self.client.get_assertion('bot', 'secret', '4|abc')
+        self.assertEqual(len(FakeActionHandler.requests_log), 3)
+
+    async def test_wrong_password_is_not_retried(self):
+        with self.assertRaises(LoginError):
+            await self.client.get_assertion('bot', 'wrong', '4|abc')
+        self.assertEqual(len(FakeActionHandler.requests_log), 1)
+
+    def test_backoff_delay_is_bounded(self):
+        client = LoginClient(backoff_base=1, backoff_max=5)
+        for attempt in range(10):
+            self.assertLessEqual(client.backoff_delay(attempt), min(5, 2 ** attempt))
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock
+from web_socket.matchmaking import LadderScheduler, format_of_battle
+
+
+class TestLadderScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sender = AsyncMock()
+        self.scheduler = LadderScheduler(self.sender, ['gen9randombattle', 'gen8randombattle'], 3, backoff_base=0.01)
+
+    def searched_formats(self) -> list[str]:
+        return [call.args[0] for call in self.sender.search_game_in_format.call_args_list]
+
+    async def test_fill_searches_every_format_once(self):
+        await self.scheduler.fill()
+
+        # Only one search per format is allowed, so the target of 3 can't be reached by searches alone
+        self.assertEqual(self.searched_formats(), ['gen9randombattle', 'gen8randombattle'])
+        self.assertEqual(self.scheduler.in_flight(), 2)
+
+    async def test_requeue_when_a_search_becomes_a_battle(self):
+        await self.scheduler.fill()
+        await self.scheduler.on_battle_started('battle-gen9randombattle-1')
+
+        self.assertEqual(self.searched_formats(), ['gen9randombattle', 'gen8randombattle', 'gen9randombattle'])
+        self.assertEqual(self.scheduler.in_flight(), 3)
+
+    async def test_requeue_when_a_battle_ends(self):
+        await self.scheduler.on_update_search(json.dumps({
+            'searching': [],
+            'games': {'battle-gen9randombattle-1': '', 'battle-gen9randombattle-2': '', 'battle-gen8randombattle-3': ''}
+        }))
+        self.assertEqual(self.searched_formats(), [])
+
+        await self.scheduler.on_battle_ended('battle-gen9randombattle-1')
+
+        self.assertEqual(len(self.searched_formats()), 1)
+        self.assertEqual(self.scheduler.in_flight(), 3)
+
+    async def test_update_search_with_no_games(self):
+        await self.scheduler.on_update_search('{"searching":["gen9randombattle"],"games":null}')
+
+        self.assertEqual(self.searched_formats(), ['gen8randombattle'])
+
+    async def test_backoff_after_a_refused_search(self):
+        await self.scheduler.fill()
+        self.scheduler.on_search_refused('You are already searching')
+
+        # While backing off nothing is sent
+        await self.scheduler.fill()
+        self.assertEqual(len(self.searched_formats()), 2)
+        self.assertTrue(self.scheduler.is_backing_off())
+
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(self.searched_formats()), 4)
+
+    def test_format_of_battle(self):
+        self.assertEqual(format_of_battle('battle-gen9randombattle-1234'), 'gen9randombattle')
+        self.assertEqual(format_of_battle('lobby'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from Engine.pokemon import EnemyPokemon, create_pokemon_objects_from_json
+from Engine.team import Team
+from Engine.matchup_matrix import MatchupMatrix
+from Engine.utility_calculator import evaluate_attacking_move_utility, create_potential_moves
+from tests.dex_fixtures import species_entry, use_fixture_provider
+
+
+SPECIES = {'Carbink': species_entry('Carbink', 'rock'), 'Copperajah': species_entry('Copperajah', 'steel'),
+           'Blastoise': species_entry('Blastoise', 'water'), 'Charizard': species_entry('Charizard', 'fire'),
+           'Pikachu': species_entry('Pikachu', 'electric')}
+
+REQUEST = ('{"side":{"name":"bot","id":"p2","pokemon":['
+           '{"ident":"p2: Carbink","details":"Carbink, L90","condition":"236/236","active":true,'
+           '"stats":{"atk":95,"def":321,"spa":141,"spd":321,"spe":141}},'
+           '{"ident":"p2: Copperajah","details":"Copperajah, L75, F","condition":"296/296","active":false,'
+           '"stats":{"atk":261,"def":182,"spa":156,"spd":173,"spe":174}},'
+           '{"ident":"p2: Blastoise","details":"Blastoise, L80","condition":"CONDITION","active":false,'
+           '"stats":{"atk":150,"def":200,"spa":180,"spd":210,"spe":150}}]}}')
+
+
+class TestMatchupMatrix(unittest.TestCase):
+    def setUp(self):
+        use_fixture_provider(self, SPECIES)
+        self.bot_team = self.create_bot_team('300/300')
+        self.enemy_team = Team([EnemyPokemon('Charizard', '80', '100/100')])
+        self.matrix = MatchupMatrix()
+
+    @staticmethod
+    def create_bot_team(blastoise_condition: str) -> Team:
+        return Team(create_pokemon_objects_from_json(REQUEST.replace('CONDITION', blastoise_condition)))
+
+    def test_only_changed_pairs_are_recomputed(self):
+        self.assertEqual(self.matrix.update(self.bot_team, self.enemy_team), 3)
+        # New objects of the same Pokemon (a new request) change nothing
+        self.assertEqual(self.matrix.update(self.create_bot_team('250/300'), self.enemy_team), 0)
+
+        # A new enemy adds a column
+        self.enemy_team.add(EnemyPokemon('Pikachu', '80', '100/100'))
+        self.assertEqual(self.matrix.update(self.bot_team, self.enemy_team), 3)
+
+        # A boost changes a row
+        self.bot_team.get('Copperajah').boosts = {'atk': 1}
+        self.assertEqual(self.matrix.update(self.bot_team, self.enemy_team), 2)
+
+    def test_scores(self):
+        self.matrix.update(self.bot_team, self.enemy_team)
+        charizard = self.enemy_team.get('Charizard')
+        blastoise = self.bot_team.get('Blastoise')
+        offense, defense = self.matrix.get('blastoise', 'charizard')
+        self.assertGreater(offense, defense)
+        self.assertEqual(offense, evaluate_attacking_move_utility(blastoise, create_potential_moves(blastoise),
+                                                                  charizard)[0][2])
+
+    def test_switch_utilities_and_fainted_pokemon(self):
+        self.matrix.update(self.bot_team, self.enemy_team)
+        carbink, charizard = self.bot_team.get('Carbink'), self.enemy_team.get('Charizard')
+        switches = self.matrix.switch_utilities(carbink, self.bot_team, charizard)
+        self.assertEqual([pokemon.name for _, pokemon, _ in switches], ['Blastoise', 'Copperajah'])
+        self.assertEqual(switches[0][0], 2)
+
+        # A fainted Pokemon leaves the matrix
+        fainted_team = self.create_bot_team('0 fnt')
+        self.matrix.update(fainted_team, self.enemy_team)
+        self.assertIsNone(self.matrix.get('blastoise', 'charizard'))
+        switches = self.matrix.switch_utilities(carbink, fainted_team, charizard)
+        self.assertEqual([pokemon.name for _, pokemon, _ in switches], ['Copperajah'])
+
+    def test_best_lead(self):
+        self.matrix.update(self.bot_team, self.enemy_team)
+        self.assertEqual(self.matrix.best_lead(self.bot_team), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+from metrics import Registry, Counter, Gauge, Histogram
+from web_socket.metrics_server import start_metrics_server
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_with_labels(self):
+        counter = self.registry.register(Counter('fetches_total', 'Fetches', ('resource',)))
+        counter.labels('pokemon').inc()
+        counter.labels('pokemon').inc()
+        counter.labels('move').inc(3)
+
+        text = self.registry.render()
+
+        self.assertIn('# TYPE fetches_total counter', text)
+        self.assertIn('fetches_total{resource="pokemon"} 2.0', text)
+        self.assertIn('fetches_total{resource="move"} 3.0', text)
+
+    def test_labels_are_required(self):
+        counter = self.registry.register(Counter('fetches_total', 'Fetches', ('resource',)))
+        with self.assertRaises(ValueError):
+            counter.inc()
+
+    def test_gauge_function(self):
+        battles = ['battle-1', 'battle-2']
+        gauge = self.registry.register(Gauge('live_battles', 'Live battles'))
+        gauge.set_function(lambda: len(battles))
+
+        self.assertIn('live_battles 2.0', self.registry.render())
+        battles.pop()
+        self.assertIn('live_battles 1.0', self.registry.render())
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.register(Histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0)))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        text = self.registry.render()
+
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 3', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_count 4', text)
+
+    def test_duplicate_names_throw(self):
+        self.registry.register(Counter('fetches_total', 'Fetches'))
+        with self.assertRaises(ValueError):
+            self.registry.register(Counter('fetches_total', 'Fetches'))
+
+
+class TestMetricsServer(unittest.IsolatedAsyncioTestCase):
+    async def test_serves_metrics(self):
+        registry = Registry()
+        registry.register(Counter('frames_total', 'Frames')).inc()
+        server = await start_metrics_server('127.0.0.1', 0, registry)
+        port = server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        response = (await reader.read()).decode()
+        writer.close()
+        server.close()
+
+        self.assertTrue(response.startswith('HTTP/1.1 200 OK'))
+        self.assertIn('frames_total 1.0', response)
+
+
+if __name__ == '__main__':
+    unittest.main()
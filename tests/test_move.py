@@ -1,8 +1,14 @@
 import unittest
-from Engine.move import Move, create_active_moves_list
+from unittest.mock import patch
+from Engine.move import Move, MoveCategory, MoveData, create_active_moves_list, create_move, clear_move_data, \
+    move_data_count
+from tests.dex_fixtures import use_fixture_provider
 
 
 class TestMove(unittest.TestCase):
+    def setUp(self):
+        use_fixture_provider(self)
+
     def test_move_creation(self):
         move = Move("Shadow Sneak", "48", False)
 
@@ -31,7 +37,7 @@ class TestMove(unittest.TestCase):
         self.assertEqual(type(move.priority), int)
 
     def test_create_active_moves_list(self):
-        json_data = """|request|{"active":[{"known_moves":[{"move":"Coil","id":"coil","pp":32,"maxpp":32,"target":"self","disabled":false},{"move":"Glare","id":"glare","pp":48,"maxpp":48,"target":"normal","disabled":false},{"move":"Earthquake","id":"earthquake","pp":16,"maxpp":16,"target":"allAdjacent","disabled":false},{"move":"Stone Edge","id":"stoneedge","pp":8,"maxpp":8,"target":"normal","disabled":false}],"canTerastallize":"Steel"}],"side":{"name":"joshcoco","id":"p2","pokemon":[{"ident":"p2: Sandaconda","details":"Sandaconda, L84, M","condition":"258/258","active":true,"stats":{"atk":228,"def":258,"spa":157,"spd":166,"spe":167},"known_moves":["coil","glare","earthquake","stoneedge"],"baseAbility":"shedskin","item":"leftovers","pokeball":"pokeball","ability":"shedskin","commanding":false,"reviving":false,"teraType":"Steel","terastallized":""},{"ident":"p2: Pyroar","details":"Pyroar, L88, F","condition":"295/295","active":false,"stats":{"atk":124,"def":177,"spa":242,"spd":166,"spe":237},"known_moves":["workup","fireblast","hypervoice","willowisp"],"baseAbility":"unnerve","item":"heavydutyboots","pokeball":"pokeball","ability":"unnerve","commanding":false,"reviving":false,"teraType":"Fire","terastallized":""},{"ident":"p2: Gumshoos","details":"Gumshoos, L95, M","condition":"321/321","active":false,"stats":{"atk":263,"def":168,"spa":158,"spd":168,"spe":139},"known_moves":["psychicfangs","bodyslam","crunch","earthquake"],"baseAbility":"stakeout","item":"choiceband","pokeball":"pokeball","ability":"stakeout","commanding":false,"reviving":false,"teraType":"Ground","terastallized":""},{"ident":"p2: Crabominable","details":"Crabominable, L90, F","condition":"321/321","active":false,"stats":{"atk":289,"def":190,"spa":163,"spd":172,"spe":129},"known_moves":["earthquake","gunkshot","drainpunch","icehammer"],"baseAbility":"ironfist","item":"choiceband","pokeball":"pokeball","ability":"ironfist","commanding":false,"reviving":false,"teraType":"Ground","terastallized":""},{"ident":"p2: Ceruledge","details":"Ceruledge, L78, F","condition":"245/245","active":false,"stats":{"atk":240,"def":170,"spa":139,"spd":201,"spe":178},"known_moves":["swordsdance","bitterblade","closecombat","shadowsneak"],"baseAbility":"weakarmor","item":"heavydutyboots","pokeball":"pokeball","ability":"weakarmor","commanding":false,"reviving":false,"teraType":"Fire","terastallized":""},{"ident":"p2: Cresselia","details":"Cresselia, L79, F","condition":"319/319","active":false,"stats":{"atk":115,"def":219,"spa":164,"spd":235,"spe":180},"known_moves":["psyshock","moonblast","calmmind","moonlight"],"baseAbility":"levitate","item":"leftovers","pokeball":"pokeball","ability":"levitate","commanding":false,"reviving":false,"teraType":"Poison","terastallized":""}]},"rqid":3}"""
+        json_data = """|request|{"active":[{"moves":[{"move":"Coil","id":"coil","pp":32,"maxpp":32,"target":"self","disabled":false},{"move":"Glare","id":"glare","pp":48,"maxpp":48,"target":"normal","disabled":false},{"move":"Earthquake","id":"earthquake","pp":16,"maxpp":16,"target":"allAdjacent","disabled":false},{"move":"Stone Edge","id":"stoneedge","pp":8,"maxpp":8,"target":"normal","disabled":false}],"canTerastallize":"Steel"}],"side":{"name":"joshcoco","id":"p2","pokemon":[{"ident":"p2: Sandaconda","details":"Sandaconda, L84, M","condition":"258/258","active":true,"stats":{"atk":228,"def":258,"spa":157,"spd":166,"spe":167},"known_moves":["coil","glare","earthquake","stoneedge"],"baseAbility":"shedskin","item":"leftovers","pokeball":"pokeball","ability":"shedskin","commanding":false,"reviving":false,"teraType":"Steel","terastallized":""},{"ident":"p2: Pyroar","details":"Pyroar, L88, F","condition":"295/295","active":false,"stats":{"atk":124,"def":177,"spa":242,"spd":166,"spe":237},"known_moves":["workup","fireblast","hypervoice","willowisp"],"baseAbility":"unnerve","item":"heavydutyboots","pokeball":"pokeball","ability":"unnerve","commanding":false,"reviving":false,"teraType":"Fire","terastallized":""},{"ident":"p2: Gumshoos","details":"Gumshoos, L95, M","condition":"321/321","active":false,"stats":{"atk":263,"def":168,"spa":158,"spd":168,"spe":139},"known_moves":["psychicfangs","bodyslam","crunch","earthquake"],"baseAbility":"stakeout","item":"choiceband","pokeball":"pokeball","ability":"stakeout","commanding":false,"reviving":false,"teraType":"Ground","terastallized":""},{"ident":"p2: Crabominable","details":"Crabominable, L90, F","condition":"321/321","active":false,"stats":{"atk":289,"def":190,"spa":163,"spd":172,"spe":129},"known_moves":["earthquake","gunkshot","drainpunch","icehammer"],"baseAbility":"ironfist","item":"choiceband","pokeball":"pokeball","ability":"ironfist","commanding":false,"reviving":false,"teraType":"Ground","terastallized":""},{"ident":"p2: Ceruledge","details":"Ceruledge, L78, F","condition":"245/245","active":false,"stats":{"atk":240,"def":170,"spa":139,"spd":201,"spe":178},"known_moves":["swordsdance","bitterblade","closecombat","shadowsneak"],"baseAbility":"weakarmor","item":"heavydutyboots","pokeball":"pokeball","ability":"weakarmor","commanding":false,"reviving":false,"teraType":"Fire","terastallized":""},{"ident":"p2: Cresselia","details":"Cresselia, L79, F","condition":"319/319","active":false,"stats":{"atk":115,"def":219,"spa":164,"spd":235,"spe":180},"known_moves":["psyshock","moonblast","calmmind","moonlight"],"baseAbility":"levitate","item":"leftovers","pokeball":"pokeball","ability":"levitate","commanding":false,"reviving":false,"teraType":"Poison","terastallized":""}]},"rqid":3}"""
 
         move_list = create_active_moves_list(json_data)
 
@@ -56,5 +62,42 @@ class TestMove(unittest.TestCase):
         self.assertEqual(move4.is_possible(), False)
 
 
+class TestMoveData(unittest.TestCase):
+    def setUp(self):
+        self.provider = use_fixture_provider(self, moves={'Close Combat': {
+            'name': 'Close Combat', 'type': 'fighting', 'power': 120, 'accuracy': 1.0, 'priority': 0,
+            'category': 'physical'}})
+
+    def test_moves_share_their_data(self):
+        with patch.object(self.provider, 'move', wraps=self.provider.move) as read_move:
+            first = Move('Close Combat', 8, False)
+            second = create_move('closecombat')
+        read_move.assert_called_once()
+
+        self.assertIs(first.data, second.data)
+        self.assertEqual(first.data, MoveData('closecombat', 'fighting', 120, 1.0, 0, MoveCategory.PHYSICAL))
+        self.assertEqual((second.name, second.type, second.power, second.accu, second.move_category),
+                         ('closecombat', 'fighting', 120, 1.0, MoveCategory.PHYSICAL))
+        # The slots keep their own state
+        first.disable_move()
+        self.assertFalse(second.is_move_disabled())
+        self.assertEqual(move_data_count(), 1)
+
+    def test_explicit_data_is_not_kept(self):
+        with patch.object(self.provider, 'move', wraps=self.provider.move) as read_move:
+            move = Move('potential', '10', False, 'fire', 60, 100, 0, MoveCategory.SPECIAL)
+        read_move.assert_not_called()
+
+        self.assertEqual(move.data, MoveData('potential', 'fire', 60, 100, 0, MoveCategory.SPECIAL))
+        self.assertEqual(move_data_count(), 0)
+        self.assertIs(Move.from_data('potential', move.data, '5').data, move.data)
+        self.assertFalse(hasattr(move, '__dict__'))
+
+    def test_illegal_category(self):
+        self.provider.move_entries['closecombat']['category'] = 'unknown'
+        with self.assertRaises(ValueError):
+            Move('Close Combat', 8, False)
+
+
 if __name__ == '__main__':
     unittest.main()
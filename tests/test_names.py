@@ -0,0 +1,79 @@
+import unittest
+from Engine.names import NameIndex, SPECIES_OVERRIDES, MOVE_OVERRIDES, to_id, to_slug
+from types import SimpleNamespace
+from BattleBots.battle_bot import BattleBot
+
+
+class TestNames(unittest.TestCase):
+    def setUp(self):
+        self.species = NameIndex(SPECIES_OVERRIDES)
+        self.moves = NameIndex(MOVE_OVERRIDES)
+
+    def test_to_id(self):
+        self.assertEqual(to_id("King's Shield"), 'kingsshield')
+        self.assertEqual(to_id('Indeedee-F'), 'indeedeef')
+        self.assertEqual(to_id('Type: Null'), 'typenull')
+        self.assertEqual(to_id('Flabébé'), 'flabebe')
+
+    def test_to_slug(self):
+        self.assertEqual(to_slug("King's Shield"), 'kings-shield')
+        self.assertEqual(to_slug('U-turn'), 'u-turn')
+        self.assertEqual(to_slug('Mr. Mime'), 'mr-mime')
+        self.assertEqual(to_slug('Type: Null'), 'type-null')
+        self.assertEqual(to_slug('Flabébé'), 'flabebe')
+
+    def test_resolve_species_overrides(self):
+        self.assertEqual(self.species.resolve('Toxtricity'), 'toxtricity-amped')
+        self.assertEqual(self.species.resolve('Indeedee-F'), 'indeedee-female')
+        self.assertEqual(self.species.resolve('indeedeef'), 'indeedee-female')
+        self.assertEqual(self.species.resolve('Giratina'), 'giratina-altered')
+        self.assertEqual(self.species.resolve('Tauros-Paldea-Combat'), 'tauros-paldea-combat-breed')
+
+    def test_resolve_learns_ids_from_display_names(self):
+        self.assertEqual(self.moves.resolve('closecombat'), 'closecombat')
+        self.assertEqual(self.moves.resolve('Close Combat'), 'close-combat')
+        self.assertEqual(self.moves.resolve('closecombat'), 'close-combat')
+        self.assertEqual(self.moves.resolve('Vise Grip'), 'vice-grip')
+
+    def test_unknown_ids_are_not_learned(self):
+        self.assertEqual(self.moves.resolve('closecombat'), 'closecombat')
+        self.assertNotIn('closecombat', self.moves.get_keys())
+        self.moves.build(['close-combat'])
+        self.assertEqual(self.moves.resolve('closecombat'), 'close-combat')
+
+    def test_build(self):
+        self.assertEqual(self.species.build(['roaring-moon', 'toxtricity-amped', 'flabebe']), 3)
+        self.assertEqual(self.moves.build(['kings-shield', 'vise-grip']), 1)
+        # Ids that were never seen as display names
+        self.assertEqual(self.moves.resolve('kingsshield'), 'kings-shield')
+        self.assertEqual(self.species.resolve('roaringmoon'), 'roaring-moon')
+        self.assertEqual(self.species.resolve('Flabébé'), 'flabebe')
+        # The overrides keep precedence
+        self.assertEqual(self.species.resolve('toxtricity'), 'toxtricity-amped')
+        self.assertEqual(self.moves.resolve('visegrip'), 'vice-grip')
+
+    def test_load_keys(self):
+        self.moves.resolve('Volt Switch')
+        other = NameIndex(MOVE_OVERRIDES)
+        other.load_keys(self.moves.get_keys())
+        self.assertEqual(other.resolve('voltswitch'), 'volt-switch')
+
+    def test_find_enemy_pokemon_by_name(self):
+        # Stand-ins for EnemyPokemon, whose creation fetches its data
+        team = [SimpleNamespace(name=name, id=to_id(name), is_alive=lambda: True) for name in ('Indeedee-F', 'Indeedee')]
+        self.assertIs(BattleBot.find_enemy_pokemon_by_name(team, 'Indeedee'), team[1])
+        self.assertIs(BattleBot.find_enemy_pokemon_by_name(team, 'Indeedee-F'), team[0])
+        self.assertIs(BattleBot.find_enemy_pokemon_by_name(team, 'Bob', {'bob': 'indeedeef'}), team[0])
+        with self.assertRaises(ValueError):
+            BattleBot.find_enemy_pokemon_by_name(team, 'Pikachu')
+
+    def test_find_enemy_pokemon_by_prefix_id(self):
+        team = [SimpleNamespace(name=name, id=to_id(name), is_alive=lambda: True) for name in ('Mewtwo', 'Mew')]
+        self.assertIs(BattleBot.find_enemy_pokemon_by_name(team, 'Mew'), team[1])
+        # "mew" is a prefix of "mewtwo", but isn't Mewtwo
+        with self.assertRaises(ValueError):
+            BattleBot.find_enemy_pokemon_by_name(team[:1], 'Mew')
+
+
+if __name__ == '__main__':
+    unittest.main()
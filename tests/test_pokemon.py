@@ -1,8 +1,13 @@
 import unittest
-from Engine.pokemon import create_pokemon_objects_from_json, EnemyPokemon
+from Engine.pokemon import create_pokemon_objects_from_json, EnemyPokemon, parse_details
+from tests.dex_fixtures import CARBINK_LEARNSET, use_fixture_provider
+from web_socket.communication_manager import extract_argument_for_update_enemy_method
 
 
 class TestPokemonCreation(unittest.TestCase):
+    def setUp(self):
+        use_fixture_provider(self)
+
     def test_bot_pokemon_creation(self):
         json_data = """{
             "side": {
@@ -61,10 +66,10 @@ class TestPokemonCreation(unittest.TestCase):
         self.assertEqual(pokemon_objects[0].ability, "sturdy")
         self.assertEqual(pokemon_objects[0].item, "lightclay")
         self.assertEqual(pokemon_objects[0].terastall_type, "Water")
-        self.assertEqual(pokemon_objects[0].types, ['rock', 'fairy'])
+        self.assertEqual(pokemon_objects[0].types, ('rock', 'fairy'))
 
         # Check types on pokemon with one type (Copperajah):
-        self.assertEqual(pokemon_objects[1].types, ['steel'])
+        self.assertEqual(pokemon_objects[1].types, ('steel',))
 
     def test_enemy_pokemon_creation_abs_fields(self):
         enemy_pokemon = EnemyPokemon("Carbink", "90", "236/236")
@@ -77,33 +82,45 @@ class TestPokemonCreation(unittest.TestCase):
     def test_enemy_pokemon_creation_moves_abilities(self):
         enemy_pokemon = EnemyPokemon("Carbink", "90", "236/236")
 
-        self.assertEqual(enemy_pokemon.known_moves,
-                         ['tackle', 'body-slam', 'take-down', 'hyper-beam', 'rock-throw', 'toxic', 'psychic',
-                          'double-team', 'harden', 'light-screen', 'reflect', 'flash', 'explosion', 'rest',
-                          'rock-slide', 'sharpen', 'substitute', 'snore', 'flail', 'protect', 'spikes', 'sandstorm',
-                          'endure', 'charm', 'swagger', 'sleep-talk', 'return', 'frustration', 'safeguard',
-                          'hidden-power', 'rain-dance', 'sunny-day', 'psych-up', 'ancient-power', 'hail', 'facade',
-                          'nature-power', 'magic-coat', 'skill-swap', 'secret-power', 'rock-tomb', 'sand-tomb',
-                          'iron-defense', 'covet', 'calm-mind', 'rock-blast', 'gravity', 'gyro-ball', 'guard-swap',
-                          'magnet-rise', 'rock-polish', 'power-gem', 'earth-power', 'giga-impact', 'flash-cannon',
-                          'trick-room', 'iron-head', 'stone-edge', 'stealth-rock', 'guard-split', 'wonder-room',
-                          'telekinesis', 'smack-down', 'heavy-slam', 'after-you', 'round', 'ally-switch',
-                          'misty-terrain', 'moonblast', 'confide', 'dazzling-gleam', 'stomping-tantrum', 'body-press',
-                          'meteor-beam', 'misty-explosion', 'terrain-pulse', 'tera-blast'])
-        self.assertEqual(enemy_pokemon.abilities, ['clear-body', 'sturdy'])
+        # The learnset is what the enemy may use, no move of it is revealed yet
+        self.assertEqual(enemy_pokemon.potential_moves, tuple(CARBINK_LEARNSET))
+        self.assertEqual(enemy_pokemon.known_moves, [])
+        self.assertEqual(enemy_pokemon.abilities, ('clear-body', 'sturdy'))
 
     def test_enemy_pokemon_creation_stats(self):
         enemy_pokemon = EnemyPokemon("Carbink", "90", "236/236")
 
         expected_dict = {'hp': 50, 'atk': 50, 'def': 150, 'spa': 50, 'spd': 150, 'spe': 50}
+        self.assertEqual(expected_dict, enemy_pokemon.base_stats)
+        # Level-scaled as in the requests of the bot's Carbink: 85 EVs, 31 IVs and a neutral nature
+        expected_dict = {'hp': 236, 'atk': 141, 'def': 321, 'spa': 141, 'spd': 321, 'spe': 141}
         self.assertEqual(expected_dict, enemy_pokemon.stats)
 
+    def test_parse_details(self):
+        self.assertEqual(parse_details('Carbink, L90'), ('Carbink', '90'))
+        self.assertEqual(parse_details('Copperajah, L50, F'), ('Copperajah', '50'))
+        # The level is left out when it's 100
+        self.assertEqual(parse_details('Copperajah, M'), ('Copperajah', '100'))
+        self.assertEqual(parse_details('Roaring Moon'), ('Roaring Moon', '100'))
+
+    def test_level_100_enemy(self):
+        arguments = extract_argument_for_update_enemy_method(['p2a: Copperajah', 'Copperajah, M', '100/100'])
+        self.assertEqual(arguments, ('Copperajah', '100', '100/100'))
+        enemy_pokemon = EnemyPokemon(*arguments)
+        self.assertEqual(enemy_pokemon.level, '100')
+        # 122 base HP at level 100, with 85 EVs and 31 IVs
+        self.assertEqual(enemy_pokemon.stats['hp'], 406)
+
+        enemy_pokemon = EnemyPokemon(*extract_argument_for_update_enemy_method(['p2a: Copperajah', 'Copperajah, L50, F',
+                                                                               '100/100']))
+        self.assertEqual(enemy_pokemon.level, '50')
+
     def test_pokemon_with_challenged_names(self):
         pokemon = EnemyPokemon("roaring moon", "90", "100/100")
-        self.assertEqual(pokemon.types, ['dragon', 'dark'])
+        self.assertEqual(pokemon.types, ('dragon', 'dark'))
 
         pokemon = EnemyPokemon("roaring moon", "90", "100/100")
-        self.assertEqual(pokemon.types, ['dragon', 'dark'])
+        self.assertEqual(pokemon.types, ('dragon', 'dark'))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from web_socket.profiling import BattleProfiler
+
+
+def busy_work():
+    return sum(index * index for index in range(10000))
+
+
+class TestBattleProfiler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_disabled_profiler_samples_nothing(self):
+        profiler = BattleProfiler(enabled=False, directory=self.directory.name)
+        self.assertFalse(profiler.start_battle('battle-1', 'greedy'))
+
+        with profiler.profile('battle-1'):
+            busy_work()
+        profiler.finish_battle('battle-1')
+
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_sample_rate(self):
+        self.assertFalse(BattleProfiler(True, 0.0, directory=self.directory.name).start_battle('battle-1', 'greedy'))
+        self.assertTrue(BattleProfiler(True, 1.0, directory=self.directory.name).start_battle('battle-1', 'greedy'))
+
+    def test_reports_are_written_when_the_battle_ends(self):
+        profiler = BattleProfiler(True, 1.0, trace_memory=True, directory=self.directory.name)
+        profiler.start_battle('battle-gen9randombattle-1', 'greedy')
+
+        with profiler.profile('battle-gen9randombattle-1'):
+            busy_work()
+        profiler.finish_battle('battle-gen9randombattle-1')
+
+        self.assertEqual(sorted(os.listdir(self.directory.name)),
+                         ['greedy_battle-gen9randombattle-1.prof', 'greedy_battle-gen9randombattle-1.txt'])
+        with open(os.path.join(self.directory.name, 'greedy_battle-gen9randombattle-1.txt')) as report:
+            text = report.read()
+        self.assertIn('busy_work', text)
+        self.assertIn('Allocations since the start of the battle', text)
+
+    def test_profiles_do_not_nest(self):
+        profiler = BattleProfiler(True, 1.0, directory=self.directory.name)
+        profiler.start_battle('battle-1', 'greedy')
+        profiler.start_battle('battle-2', 'greedy')
+
+        with profiler.profile('battle-1'):
+            with profiler.profile('battle-2'):
+                busy_work()
+
+        # The inner battle wasn't profiled, so the outer one got all the calls
+        self.assertEqual(profiler.profiles['battle-2'].profiler.getstats(), [])
+        self.assertNotEqual(profiler.profiles['battle-1'].profiler.getstats(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,9 @@
 import unittest
+from unittest.mock import AsyncMock, patch
+from BattleBots import random_bot
+from BattleBots.random_bot import RandomBot
+from Engine.request import LegalActions
+from constant_variable import ACTION
 
 
 class TestBattleActions(unittest.TestCase):
@@ -16,5 +21,34 @@ class TestBattleActions(unittest.TestCase):
         pass
 
 
+class TestRandomBotLegalActions(unittest.IsolatedAsyncioTestCase):
+    async def test_only_legal_actions_are_picked(self):
+        bot = RandomBot('battle-gen9randombattle-1', AsyncMock())
+        bot.legal_actions = LegalActions((2,), (4,))
+        for _ in range(20):
+            await bot.make_action(bot.sender)
+        for call in bot.sender.send_move.await_args_list:
+            self.assertEqual(call.args, (bot.battle_id, 3))
+        for call in bot.sender.send_switch.await_args_list:
+            self.assertEqual(call.args, (bot.battle_id, 5))
+
+    async def test_other_kind_is_used_when_none_is_legal(self):
+        bot = RandomBot('battle-gen9randombattle-1', AsyncMock())
+        bot.legal_actions = LegalActions((1,), ())
+        with patch.object(random_bot.random, 'randint', return_value=2):
+            # A switch is picked, but none is legal
+            await bot.make_action(bot.sender)
+        bot.sender.send_move.assert_awaited_once_with(bot.battle_id, 2)
+
+        bot.legal_actions = LegalActions((1,), (3,))
+        await bot.make_action(bot.sender, ACTION.SWITCH)
+        bot.sender.send_switch.assert_awaited_once_with(bot.battle_id, 4)
+
+    async def test_no_legal_action(self):
+        bot = RandomBot('battle-gen9randombattle-1', AsyncMock())
+        with self.assertRaises(ValueError):
+            await bot.make_action(bot.sender)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+from Engine.features import STATE_FEATURES, ACTION_FEATURES, MOVE_ACTION, SWITCH_ACTION
+from Engine.replays import ReplayBattle, iter_replay_files, iter_log_lines, replay_battle, ingest_chunk, ingest
+from Engine.usage_stats import UsageStats, MOVE
+from tests.dex_fixtures import species_entry, use_fixture_provider
+
+LOG = """|player|p1|alice|1
+|player|p2|bob|2
+|switch|p1a: Sparky|Pikachu, L88, M|100/100
+|switch|p2a: Charizard|Charizard, L84, F|100/100
+|turn|1
+|move|p1a: Sparky|Thunderbolt|p2a: Charizard
+|-damage|p2a: Charizard|40/100
+|switch|p2a: Blastoise|Blastoise, L80|100/100
+|turn|2
+|move|p1a: Sparky|Thunderbolt|p2a: Blastoise
+|-damage|p2a: Blastoise|0 fnt
+|faint|p2a: Blastoise
+|switch|p2a: Charizard|Charizard, L84, F|40/100
+|turn|3
+|move|p1a: Sparky|Thunderbolt|p2a: Charizard
+|-damage|p2a: Charizard|0 fnt
+|faint|p2a: Charizard
+|win|alice"""
+
+
+SPECIES = {'Pikachu': species_entry('Pikachu', 'electric'), 'Charizard': species_entry('Charizard', 'fire'),
+           'Blastoise': species_entry('Blastoise', 'water')}
+
+
+class TestReplays(unittest.TestCase):
+    def setUp(self):
+        # The provider of the fixtures is sent to the worker processes of the ingestion
+        use_fixture_provider(self, SPECIES)
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, 'gen9'))
+        self.log_path = os.path.join(self.directory.name, 'battle-1.log')
+        with open(self.log_path, 'w', encoding='utf-8') as replay:
+            replay.write(LOG)
+        self.json_path = os.path.join(self.directory.name, 'gen9', 'battle-2.json')
+        with open(self.json_path, 'w', encoding='utf-8') as replay:
+            json.dump({'id': 'battle-2', 'log': LOG}, replay)
+        with open(os.path.join(self.directory.name, 'notes.md'), 'w', encoding='utf-8') as notes:
+            notes.write('not a replay')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_iter_replay_files(self):
+        self.assertEqual(sorted(iter_replay_files(self.directory.name)), sorted([self.log_path, self.json_path]))
+        self.assertEqual(list(iter_log_lines(self.json_path)), list(iter_log_lines(self.log_path)))
+
+    def test_replay_battle_records_decisions(self):
+        battle = ReplayBattle('battle-1')
+        for line in LOG.splitlines():
+            battle.feed(line)
+
+        self.assertTrue(battle.finished)
+        self.assertEqual(battle.teams['p2'].fainted_count, 2)
+        kinds = [(record.player, record.action_kind, record.outcome) for record in battle.records]
+        # Blastoise comes in for the first time, so only the switch back to Charizard (after a faint) is recorded
+        self.assertEqual(kinds, [('p1', MOVE_ACTION, 1.0), ('p1', MOVE_ACTION, 1.0), ('p2', SWITCH_ACTION, -1.0),
+                                 ('p1', MOVE_ACTION, 1.0)])
+        for record in battle.records:
+            self.assertEqual(len(record.state), len(STATE_FEATURES))
+            self.assertEqual(len(record.action), len(ACTION_FEATURES))
+        # The last move hits a Charizard at 40% health
+        self.assertAlmostEqual(battle.records[3].state[1], 0.4)
+
+    def test_known_switch_is_recorded(self):
+        battle = ReplayBattle('battle-1')
+        lines = LOG.splitlines()
+        for line in lines[:lines.index('|turn|2')] + ['|switch|p2a: Charizard|Charizard, L84, F|40/100', '|tie']:
+            battle.feed(line)
+        last = battle.records[-1]
+        self.assertEqual((last.player, last.action_kind, last.outcome), ('p2', SWITCH_ACTION, 0.0))
+
+    def test_unfinished_battle_has_no_records(self):
+        path = os.path.join(self.directory.name, 'unfinished.log')
+        with open(path, 'w', encoding='utf-8') as replay:
+            replay.write(LOG.rsplit('\n', 1)[0])
+        self.assertEqual(replay_battle(path), [])
+
+    def test_ingest_chunk_writes_shard(self):
+        shard, records, failed, usage_stats = ingest_chunk(
+            [self.log_path, self.json_path, os.path.join(self.directory.name, 'missing.log')],
+            os.path.join(self.directory.name, 'shard-000000'))
+        self.assertEqual((records, failed), (8, 1))
+        self.assertTrue(os.path.exists(shard))
+        self.assertEqual(usage_stats.top('Pikachu', MOVE), [('Thunderbolt', 2)])
+
+    def test_ingest(self):
+        output = os.path.join(self.directory.name, 'dataset')
+        usage_stats = UsageStats()
+        totals = ingest(self.directory.name, output, workers=1, chunk_size=1, max_pending=1, usage_stats=usage_stats)
+        self.assertEqual(totals, {'shards': 2, 'records': 8, 'replays': 2, 'failed': 0})
+        self.assertEqual(len(os.listdir(output)), 2)
+        self.assertEqual(usage_stats.seen('Charizard'), 2)
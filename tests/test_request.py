@@ -0,0 +1,74 @@
+import unittest
+from Engine import request as request_module
+from Engine.request import BattleRequest, LegalActions, parse_request, is_new_request, decode_json, legal_actions
+
+
+class TestRequest(unittest.TestCase):
+    PAYLOAD = ('{"active":[{"moves":[{"move":"Earthquake","id":"earthquake","pp":15,"maxpp":16,"disabled":false}],'
+               '"maybeTrapped":true}],"side":{"name":"bot","id":"p2","pokemon":[{"ident":"p2: Beartic",'
+               '"details":"Beartic, L90, M","condition":"213/317","active":true}]},"rqid":5}')
+
+    def test_parse_request(self):
+        request = parse_request('|request|' + self.PAYLOAD)
+        self.assertEqual(request.rqid, 5)
+        self.assertEqual(request.moves[0]['move'], 'Earthquake')
+        self.assertEqual(request.pokemon[0]['details'], 'Beartic, L90, M')
+        self.assertTrue(request.maybe_trapped)
+        self.assertTrue(request.expects_decision())
+        self.assertIsNone(request.force_switch)
+
+        # A decoded request is shared as is
+        self.assertIs(parse_request(request), request)
+
+    def test_requests_without_decision(self):
+        wait = parse_request('{"wait":true,"side":{"pokemon":[]},"rqid":2}')
+        self.assertFalse(wait.expects_decision())
+        self.assertEqual(wait.moves, [])
+        self.assertFalse(wait.maybe_trapped)
+        self.assertFalse(parse_request('{"teamPreview":true,"side":{"pokemon":[]}}').expects_decision())
+        self.assertTrue(parse_request('{"forceSwitch":[true],"side":{"pokemon":[]}}').expects_decision())
+
+    def test_legal_actions(self):
+        side = ('"side":{"pokemon":[{"condition":"100/200","active":true},{"condition":"0 fnt","active":false},'
+                '{"condition":"50/100 par","active":false}]}')
+        moves = ('"moves":[{"move":"Tackle","pp":0,"disabled":false},{"move":"Ember","pp":5,"disabled":true},'
+                 '{"move":"Growl","pp":40,"disabled":false},{"move":"Surf","pp":15}]')
+        request = parse_request('{"active":[{' + moves + '}],' + side + '}')
+        self.assertEqual(legal_actions(request), LegalActions((2, 3), (2,)))
+
+        # A trapped Pokemon can't switch, and a forced switch can't move
+        trapped = parse_request('{"active":[{' + moves + ',"trapped":true}],' + side + '}')
+        self.assertEqual(legal_actions(trapped), LegalActions((2, 3), ()))
+        forced = parse_request('{"forceSwitch":[true],' + side + '}')
+        self.assertEqual(legal_actions(forced), LegalActions((), (2,)))
+
+        # A single move (e.g. Struggle) is always legal
+        struggle = parse_request('{"active":[{"moves":[{"move":"Struggle","id":"struggle"}]}],' + side + '}')
+        self.assertEqual(legal_actions(struggle).moves, (0,))
+        self.assertFalse(legal_actions(parse_request('{"wait":true,' + side + '}')))
+
+    def test_invalid_json(self):
+        with self.assertRaises(ValueError):
+            parse_request('{"active":')
+
+    def test_is_new_request(self):
+        request = BattleRequest({'rqid': 5})
+        self.assertTrue(is_new_request(request, None))
+        self.assertTrue(is_new_request(request, 4))
+        self.assertFalse(is_new_request(request, 5))
+        self.assertFalse(is_new_request(request, 6))
+        # A rejoined battle gets its last request again
+        self.assertTrue(is_new_request(request, 5, resyncing=True))
+        self.assertTrue(is_new_request(BattleRequest({}), 5))
+
+    def test_standard_decoder_fallback(self):
+        orjson = request_module.orjson
+        request_module.orjson = None
+        try:
+            self.assertEqual(decode_json('{"rqid": 1}'), {'rqid': 1})
+        finally:
+            request_module.orjson = orjson
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr
+import unittest
+from web_socket.results_store import ResultsStore, BattleRecord
+
+
+def create_record(battle_id: str, bot_type: str, result: str, latencies: list[float]) -> BattleRecord:
+    return BattleRecord(battle_id, bot_type, 'joshcoco', 'mechhere', result, 20, latencies,
+                        ['carbink', 'copperajah'], ['charizard'])
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ResultsStore(os.path.join(self.directory.name, 'res', 'results.sqlite3'), flush_interval=0.01)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_records_are_written_on_close(self):
+        self.store.start()
+        for index in range(10):
+            self.store.add(create_record(f'battle-{index}', 'greedy', 'WIN', [0.1]))
+        self.store.close()
+
+        self.assertEqual(self.store.count(), 10)
+
+    def test_records_added_before_start_are_kept(self):
+        self.store.add(create_record('battle-1', 'greedy', 'WIN', [0.1]))
+        self.store.start()
+        self.store.close()
+
+        self.assertEqual(self.store.count(), 1)
+
+    def test_only_the_failed_records_are_dropped(self):
+        self.store.add(create_record('battle-1', 'greedy', 'WIN', [0.1]))
+        self.store.add(create_record('battle-2', 'greedy', 'WIN', [0.1])._replace(turns=None))
+        self.store.add(create_record('battle-3', 'greedy', 'TIE', [object()]))
+        self.store.add(create_record('battle-4', 'greedy', 'LOST', [0.1]))
+        with redirect_stderr(io.StringIO()) as errors:
+            self.store.start()
+            self.store.close()
+
+        self.assertEqual(self.store.count(), 2)
+        self.assertIn('battle-2', errors.getvalue())
+        self.assertIn('battle-3', errors.getvalue())
+        self.assertIn('Traceback', errors.getvalue())
+
+    def test_summary(self):
+        self.store.start()
+        self.store.add(create_record('battle-1', 'greedy', 'WIN', [0.1, 0.3]))
+        self.store.add(create_record('battle-2', 'greedy', 'LOST', [0.2]))
+        self.store.add(create_record('battle-3', 'random', 'LOST', []))
+        self.store.close()
+
+        summary = self.store.summary()
+
+        self.assertEqual(summary['greedy']['games'], 2)
+        self.assertEqual(summary['greedy']['wins'], 1)
+        self.assertEqual(summary['greedy']['win_rate'], 0.5)
+        self.assertAlmostEqual(summary['greedy']['avg_latency'], 0.2)
+        self.assertEqual(summary['random']['wins'], 0)
+        self.assertIsNone(summary['random']['avg_latency'])
+
+
+if __name__ == '__main__':
+    unittest.main()
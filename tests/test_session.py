@@ -0,0 +1,110 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from websockets.asyncio.server import serve
+from constant_variable import Account, BOT_MODE
+from web_socket.login import LoginError
+from web_socket.session import BotSession
+from BattleBots.random_bot import RandomBot
+
+
+class TestSessionReconnect(unittest.IsolatedAsyncioTestCase):
+    async def test_reconnect_rejoins_kept_battles(self):
+        connections = []
+        rejoined = asyncio.get_running_loop().create_future()
+
+        async def fake_showdown(web_socket):
+            connections.append(web_socket)
+            await web_socket.send('|challstr|4|abc')
+            async for message in web_socket:
+                if message.startswith('|/trn '):
+                    await web_socket.send('|updateuser| joshcoco|1|aaron|{}')
+                    if len(connections) == 1:
+                        # Drop the first connection right after the login
+                        await web_socket.close()
+                        return
+                elif message.startswith('|/join ') and not rejoined.done():
+                    rejoined.set_result(message)
+
+        login_client = MagicMock()
+        login_client.get_assertion = AsyncMock(return_value='assertion')
+        session = BotSession(Account('joshcoco', '123456', 'mechhere'), BOT_MODE.ACCEPT_CHALLENGE, login_client)
+        battle = RandomBot('battle-gen9randombattle-1', None)
+        session.battles.append(battle)
+
+        async with serve(fake_showdown, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            task = asyncio.create_task(session.run(f'ws://127.0.0.1:{port}'))
+            try:
+                message = await asyncio.wait_for(rejoined, 5)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(message, '|/join battle-gen9randombattle-1')
+        self.assertEqual(len(connections), 2)
+
+        # The battle object was kept, and waits for its next request to re-sync
+        self.assertIs(session.battles[0], battle)
+        self.assertTrue(battle.resyncing)
+        self.assertFalse(session.rejoin_pending)
+
+    async def test_failed_login_reconnects(self):
+        connections = []
+        rejoined = asyncio.get_running_loop().create_future()
+
+        async def fake_showdown(web_socket):
+            connections.append(web_socket)
+            await web_socket.send('|challstr|4|abc')
+            async for message in web_socket:
+                if message.startswith('|/trn '):
+                    await web_socket.send('|updateuser| joshcoco|1|aaron|{}')
+                elif message.startswith('|/join ') and not rejoined.done():
+                    rejoined.set_result(message)
+
+        login_client = MagicMock()
+        # The login server is down for the first login
+        login_client.get_assertion = AsyncMock(side_effect=[LoginError('Login of joshcoco failed'), 'assertion'])
+        session = BotSession(Account('joshcoco', '123456', 'mechhere'), BOT_MODE.ACCEPT_CHALLENGE, login_client)
+        battle = RandomBot('battle-gen9randombattle-1', None)
+        session.battles.append(battle)
+
+        async with serve(fake_showdown, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            task = asyncio.create_task(session.run(f'ws://127.0.0.1:{port}'))
+            try:
+                message = await asyncio.wait_for(rejoined, 5)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(message, '|/join battle-gen9randombattle-1')
+        self.assertEqual(len(connections), 2)
+        self.assertEqual(login_client.get_assertion.await_count, 2)
+        self.assertIs(session.battles[0], battle)
+
+
+class TestSessionErrors(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.session = BotSession(Account('joshcoco', '123456', 'mechhere'), BOT_MODE.ACCEPT_CHALLENGE)
+        self.session.sender = MagicMock()
+        self.session.sender.leave = AsyncMock()
+
+    async def test_failed_battle_is_dropped(self):
+        battle = RandomBot('battle-gen9randombattle-1', None)
+        self.session.battles.append(battle)
+        self.session.cur_battles_count = 1
+
+        await self.session.handle_error('battle-gen9randombattle-1', RuntimeError('bad frame'))
+
+        self.session.sender.leave.assert_awaited_once_with('battle-gen9randombattle-1')
+        self.assertEqual(self.session.battles, [])
+        self.assertEqual(self.session.cur_battles_count, 0)
+
+    async def test_errors_outside_of_the_battles_are_fatal(self):
+        with self.assertRaisesRegex(RuntimeError, 'bad login'):
+            await self.session.handle_error('', RuntimeError('bad login'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import unittest
+from Engine.data_provider import BundleProvider, set_provider
+from Engine.move import Move, MoveCategory
+from Engine.pokemon import EnemyPokemon
+from Engine.showdown_import import compile_typechart, import_showdown_data, load_data_file, parse_js_export
+
+POKEDEX_TS = """
+export const Pokedex: import('../sim/dex-species').SpeciesDataTable = {
+    toxtricity: {
+        num: 849,
+        name: "Toxtricity",
+        types: ["Electric", "Poison"],
+        baseStats: {hp: 75, atk: 98, def: 70, spa: 114, spd: 70, spe: 75},
+        abilities: {0: "Punk Rock", 1: "Plus", H: 'Technician'},
+        otherFormes: ["Toxtricity-Low-Key"],
+    },
+    toxtricitylowkey: {
+        num: 849,
+        name: "Toxtricity-Low-Key",
+        baseSpecies: "Toxtricity",
+        forme: "Low-Key", // Its learnset is the one of Toxtricity
+        types: ["Electric", "Poison"],
+        baseStats: {hp: 75, atk: 98, def: 70, spa: 114, spd: 70, spe: 75},
+        abilities: {0: "Punk Rock", 1: "Minus", H: "Technician"},
+    },
+    /* A species of the community */
+    syclant: {
+        num: -1,
+        name: "Syclant",
+        types: ["Ice", "Bug"],
+        baseStats: {hp: 70, atk: 116, def: 70, spa: 114, spd: 64, spe: 121},
+        abilities: {0: "Compound Eyes", 1: "Mountaineer"},
+        isNonstandard: "CAP",
+    },
+};
+"""
+
+MOVES = {
+    'overdrive': {'num': 786, 'accuracy': 100, 'basePower': 80, 'category': 'Special', 'name': 'Overdrive',
+                  'priority': 0, 'type': 'Electric'},
+    'shiftgear': {'num': 508, 'accuracy': True, 'basePower': 0, 'category': 'Status', 'name': 'Shift Gear',
+                  'priority': 0, 'type': 'Steel'},
+    'suckerpunch': {'num': 389, 'accuracy': 100, 'basePower': 70, 'category': 'Physical', 'name': 'Sucker Punch',
+                    'priority': 1, 'type': 'Dark'},
+    'boltstrike': {'num': 550, 'accuracy': 85, 'basePower': 130, 'category': 'Physical', 'name': 'Bolt Strike',
+                   'priority': 0, 'type': 'Electric'},
+}
+
+LEARNSETS = {'toxtricity': {'learnset': {'overdrive': ['9L1', '8L1'], 'shiftgear': ['9L40']}}}
+
+TYPECHART_JS = """exports.BattleTypeChart = {
+    electric: {damageTaken: {par: 3, Electric: 2, Ground: 1, Steel: 2}},
+    ground: {damageTaken: {sandstorm: 3, Electric: 3, Ground: 0}},
+    steel: {damageTaken: {psn: 3, Electric: 0, Ground: 1, Steel: 2}}
+};
+"""
+
+
+class TestShowdownImport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.write('pokedex.ts', POKEDEX_TS)
+        self.write('moves.json', json.dumps(MOVES))
+        self.write('learnsets.json', json.dumps(LEARNSETS))
+        self.write('typechart.js', TYPECHART_JS)
+        self.bundle_path = os.path.join(self.directory.name, 'res', 'dex.json.gz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def test_import(self):
+        totals = import_showdown_data(self.directory.name, self.bundle_path)
+        self.assertEqual((totals['species'], totals['moves'], totals['types']), (2, 4, 3))
+
+        provider = BundleProvider(self.bundle_path)
+        self.assertEqual(provider.species('Toxtricity'),
+                         {'name': 'Toxtricity', 'types': ['electric', 'poison'],
+                          'base_stats': {'hp': 75, 'atk': 98, 'def': 70, 'spa': 114, 'spd': 70, 'spe': 75},
+                          'abilities': ['punkrock', 'plus', 'technician'], 'learnset': ['overdrive', 'shiftgear']})
+        # A form gets the learnset of its base species
+        self.assertEqual(provider.species('Toxtricity-Low-Key')['learnset'], ['overdrive', 'shiftgear'])
+        with self.assertRaises(ValueError):
+            provider.species('Syclant')
+
+        self.assertEqual(provider.move('Shift Gear'), {'name': 'Shift Gear', 'type': 'steel', 'power': 0,
+                                                       'accuracy': 1.0, 'priority': 0, 'category': 'status'})
+        self.assertEqual(provider.move('boltstrike')['accuracy'], 0.85)
+        self.assertEqual(provider.typechart['ground'], {'electric': 2.0, 'ground': 1.0, 'steel': 2.0})
+        self.assertEqual(provider.typechart['electric'], {'electric': 0.5, 'ground': 0.0, 'steel': 1.0})
+
+    def test_protocol_names_resolve_directly(self):
+        import_showdown_data(self.directory.name, self.bundle_path)
+        previous = set_provider(BundleProvider(self.bundle_path))
+        try:
+            # No form is added to the name, as the data of the remote API needs ("toxtricity-amped")
+            pokemon = EnemyPokemon('Toxtricity', '88', '100/100')
+            self.assertEqual(pokemon.types, ('electric', 'poison'))
+            self.assertEqual(pokemon.potential_moves, ('overdrive', 'shiftgear'))
+            move = Move('Sucker Punch', '8', False)
+            self.assertEqual((move.type, move.priority, move.move_category), ('dark', 1, MoveCategory.PHYSICAL))
+        finally:
+            set_provider(previous)
+
+    def test_missing_data_file(self):
+        os.remove(os.path.join(self.directory.name, 'learnsets.json'))
+        with self.assertRaises(FileNotFoundError):
+            import_showdown_data(self.directory.name, self.bundle_path)
+        self.assertFalse(os.path.exists(self.bundle_path))
+
+    def test_functions_can_not_be_read(self):
+        path = self.write('moves.ts', 'export const Moves = {\n  absorb: {\n    name: "Absorb",\n'
+                                      '    onTryHit(target) { return false; },\n  },\n};\n')
+        with self.assertRaisesRegex(ValueError, 'line 4'):
+            load_data_file(path)
+
+
+class TestParseJsExport(unittest.TestCase):
+    def test_literals(self):
+        text = ("// Generated\nexports.BattleData = {a: [1, -2.5, 'it\\'s', \"\\u00e9\",], 'b c': {0: true, H: null},"
+                " d: undefined, /* comment */ e: 1e3};")
+        self.assertEqual(parse_js_export(text),
+                         {'a': [1, -2.5, "it's", 'é'], 'b c': {'0': True, 'H': None}, 'd': None, 'e': 1000.0})
+
+    def test_no_export(self):
+        with self.assertRaises(ValueError):
+            parse_js_export('const Pokedex = {};')
+
+    def test_compile_typechart(self):
+        typechart = {'fairy': {'damageTaken': {'Dragon': 3, 'Fairy': 0, 'Steel': 1}},
+                     'dragon': {'damageTaken': {'Dragon': 1, 'Fairy': 1, 'Steel': 0}}}
+        self.assertEqual(compile_typechart(typechart), {'dragon': {'fairy': 0.0, 'dragon': 2.0},
+                                                        'fairy': {'fairy': 1.0, 'dragon': 2.0}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from Engine import api, names  # The modules of the sections
+from Engine.snapshot import write_snapshot, load_snapshot, read_snapshot, read_snapshot_sizes, _HEADER, MAGIC, \
+    SNAPSHOT_VERSION
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'res', 'warm_start.snapshot')
+        self.saved_responses = dict(api.get_cached_responses())
+
+    def tearDown(self):
+        api.get_cached_responses().clear()
+        api.load_cached_responses(self.saved_responses)
+        self.directory.cleanup()
+
+    def test_write_and_load(self):
+        url = 'https://pokeapi.co/api/v2/pokemon/carbink'
+        api.load_cached_responses({url: {'types': [{'type': {'name': 'rock'}}]}})
+
+        self.assertLess(0, write_snapshot(self.path))
+        api.get_cached_responses().clear()
+
+        self.assertTrue(load_snapshot(self.path))
+
+        # The answer is now served from the cache, without going to the network
+        self.assertEqual(api.fetch_json(url), {'types': [{'type': {'name': 'rock'}}]})
+
+    def test_read_some_sections(self):
+        write_snapshot(self.path)
+        self.assertEqual(set(read_snapshot(self.path, ['names'])), {'names'})
+        self.assertEqual(set(read_snapshot_sizes(self.path)), {'api', 'names'})
+
+    def test_other_version_is_skipped(self):
+        write_snapshot(self.path)
+        with open(self.path, 'r+b') as file:
+            file.write(_HEADER.pack(MAGIC, SNAPSHOT_VERSION + 1, 0)[:12])
+
+        self.assertFalse(load_snapshot(self.path))
+        with self.assertRaisesRegex(ValueError, 'version'):
+            read_snapshot(self.path)
+
+    def test_missing_file_is_skipped(self):
+        self.assertFalse(load_snapshot(self.path))
+
+    def test_invalid_file_is_skipped(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as file:
+            file.write(b'not a snapshot at all')
+
+        self.assertFalse(load_snapshot(self.path))
+        with self.assertRaises(ValueError):
+            read_snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+from Engine.footprint import battle_footprint, footprint_report
+from Engine.pokemon import EnemyPokemon, create_pokemon_objects_from_json
+from Engine.species import species_count
+from BattleBots.random_bot import RandomBot
+from tests.dex_fixtures import species_entry, use_fixture_provider
+
+REQUEST = ('{"side":{"name":"bot","id":"p2","pokemon":['
+           '{"ident":"p2: Carbink","details":"Carbink, L90","condition":"236/236","active":true,'
+           '"stats":{"atk":95,"def":321,"spa":141,"spd":321,"spe":141}}]}}')
+
+
+CARBINK = dict(species_entry('Carbink', 'rock', 'fairy'), abilities=['sturdy'], learnset=['moonblast'])
+
+
+class TestSpeciesData(unittest.TestCase):
+    def setUp(self):
+        self.provider = use_fixture_provider(self, {'Carbink': CARBINK})
+
+    def test_species_are_shared_by_both_sides(self):
+        with patch.object(self.provider, 'species', wraps=self.provider.species) as read_species:
+            bot_pokemon = create_pokemon_objects_from_json(REQUEST)[0]
+            enemies = [EnemyPokemon('Carbink', '90', '100/100') for _ in range(3)]
+        read_species.assert_called_once()
+        self.assertEqual(species_count(), 1)
+
+        for enemy in enemies:
+            self.assertIs(enemy.species, bot_pokemon.species)
+        self.assertEqual(bot_pokemon.types, ('rock', 'fairy'))
+        self.assertEqual(enemies[0].abilities, ('sturdy',))
+        self.assertEqual(enemies[0].potential_moves, ('moonblast',))
+        self.assertEqual(enemies[0].base_stats['def'], 80)
+        with self.assertRaises(TypeError):
+            enemies[0].base_stats['def'] = 100
+
+        # Only the battle state belongs to the objects
+        enemies[0].set_condition('50/100 par')
+        self.assertEqual((enemies[1].curr_health, enemies[1].status), ('100', None))
+        self.assertNotIn('types', vars(enemies[0]))
+
+    def test_unknown_species(self):
+        with self.assertRaises(ValueError):
+            EnemyPokemon('Missingno', '90', '100/100')
+        self.assertEqual(species_count(), 0)
+
+
+class TestFootprint(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        use_fixture_provider(self, {'Carbink': CARBINK})
+
+    async def test_battle_footprint(self):
+        bot = RandomBot('battle-gen9randombattle-1', AsyncMock())
+        empty = battle_footprint(bot)
+        await bot.update_enemy_team('Carbink', '90', '100/100')
+        bot.speculation_enabled = False
+        await bot.update_bot_team(REQUEST)
+
+        footprint = battle_footprint(bot)
+        self.assertEqual(footprint.battle_id, bot.battle_id)
+        self.assertLess(empty.bytes, footprint.bytes)
+        # Both Carbinks reference the same record, which isn't measured
+        self.assertEqual(footprint.species, 1)
+
+        report = footprint_report([bot])
+        self.assertIn(bot.battle_id, report)
+        self.assertIn('1 battles, sharing 1 species', report)
@@ -0,0 +1,36 @@
+import unittest
+from Engine.stat_calculator import StatCalculator, calculate_stat, stage_multiplier
+
+CARBINK = {'hp': 50, 'atk': 50, 'def': 150, 'spa': 50, 'spd': 150, 'spe': 50}
+
+
+class TestStatCalculator(unittest.TestCase):
+    def test_calculate_stat(self):
+        # The stats the server sends for a level 90 Carbink of a random battle
+        self.assertEqual(calculate_stat('hp', 50, 90), 236)
+        self.assertEqual(calculate_stat('def', 150, 90), 321)
+        self.assertEqual(calculate_stat('spe', 50, 90), 141)
+        self.assertEqual(calculate_stat('atk', 100, 100, ev=252, iv=31, nature=1.1), 328)
+        self.assertEqual(calculate_stat('hp', 1, 100), 1)
+
+    def test_stage_multiplier(self):
+        self.assertEqual(stage_multiplier(0), 1)
+        self.assertEqual(stage_multiplier(1), 1.5)
+        self.assertEqual(stage_multiplier(-2), 0.5)
+        self.assertEqual(stage_multiplier(6), 4)
+
+    def test_stats_are_memoized(self):
+        calculator = StatCalculator()
+        stats = calculator.stats('Carbink', CARBINK, '90')
+        self.assertEqual(stats, {'hp': 236, 'atk': 141, 'def': 321, 'spa': 141, 'spd': 321, 'spe': 141})
+        # The base stats aren't read again for the same species and level
+        self.assertIs(calculator.stats('carbink', {}, 90), stats)
+        self.assertEqual(len(calculator), 1)
+
+        boosted = calculator.stats('Carbink', CARBINK, 90, {'def': 2, 'spe': -1, 'accuracy': 1})
+        self.assertEqual((boosted['def'], boosted['spe'], boosted['hp']), (642, 94, 236))
+        self.assertIs(calculator.stats('Carbink', CARBINK, 90, {'spe': -1, 'def': 2, 'accuracy': 1}), boosted)
+        self.assertEqual(len(calculator), 2)
+
+        calculator.clear()
+        self.assertEqual(len(calculator), 0)
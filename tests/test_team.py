@@ -1,10 +1,14 @@
 import unittest
 from Engine.pokemon import Pokemon, EnemyPokemon, BotPokemon, create_pokemon_objects_from_json
 from Engine.team import Team
+from BattleBots.battle_bot import BattleBot
+from tests.dex_fixtures import species_entry, use_fixture_provider
 
 
 class TestTeam(unittest.TestCase):
     def setUp(self):
+        use_fixture_provider(self, {'Pikachu': species_entry('Pikachu', 'electric'),
+                                    'Charizard': species_entry('Charizard', 'fire', 'flying')})
         # Create some Pokemon objects for testing
         self.enemy_pokemon1 = EnemyPokemon("Pikachu", "50", "100/100")
         self.enemy_pokemon2 = EnemyPokemon("Charizard", "50", "100/100")
@@ -107,5 +111,51 @@ class TestTeam(unittest.TestCase):
             team.add(self.enemy_pokemon3)  # Another object of the same pokemon
 
 
+
+class TestTeamIndex(unittest.TestCase):
+    NAMES = ['Pikachu', 'Charizard', 'Carbink']
+
+    def setUp(self):
+        use_fixture_provider(self, {name: species_entry(name, 'normal') for name in self.NAMES})
+        self.team = Team([EnemyPokemon(name, '80', '100/100') for name in self.NAMES])
+
+    def test_lookup_by_name_or_id(self):
+        self.assertEqual(self.team.get_slot('Charizard'), 1)
+        self.assertIs(self.team.get('carbink'), self.team[2])
+        self.assertIsNone(self.team.get('Mew'))
+        self.assertIn('pikachu', self.team)
+        self.assertEqual(len(self.team), 3)
+        self.assertEqual([pokemon.name for pokemon in self.team], self.NAMES)
+
+    def test_set_active(self):
+        self.assertIsNone(self.team.get_active())
+        self.assertIs(self.team.set_active('Pikachu'), self.team[0])
+        self.team.set_active('Carbink')
+        self.assertIs(self.team.get_active(), self.team[2])
+        self.assertEqual([pokemon.active for pokemon in self.team], [False, False, True])
+
+        # An unknown Pokemon leaves no Pokemon active
+        self.assertIsNone(self.team.set_active('Mew'))
+        self.assertFalse(any(pokemon.active for pokemon in self.team))
+
+    def test_alive_counts(self):
+        self.assertEqual(self.team.alive_count, 3)
+        self.team.update_condition('Pikachu', '0 fnt')
+        self.team.update_condition('Pikachu', '0 fnt')
+        self.team.update_condition('Charizard', '40/100 par')
+        self.assertEqual(self.team.alive_count, 2)
+        self.assertEqual(self.team.fainted_count, 1)
+        self.assertEqual(self.team.get('Charizard').curr_health, '40')
+        self.assertEqual(BattleBot.get_lives_count_of_bot_pokemon(self.team), 2)
+
+    def test_add_active_pokemon(self):
+        team = Team()
+        pokemon = EnemyPokemon('Pikachu', '80', '0 fnt')
+        pokemon.active = True
+        team.add(pokemon)
+        self.assertIs(team.get_active(), pokemon)
+        self.assertEqual(team.alive_count, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
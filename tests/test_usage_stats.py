@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from Engine.usage_stats import UsageStats, observe_battle_log, MOVE, ITEM, ABILITY
+
+LOG = """|player|p1|alice|1
+|switch|p1a: Sparky|Pikachu, L88, M|100/100
+|switch|p2a: Charizard|Charizard, L84, F|100/100
+|move|p1a: Sparky|Volt Switch|p2a: Charizard
+|move|p1a: Sparky|Volt Switch|p2a: Charizard
+|-item|p2a: Charizard|Heavy-Duty Boots|[from] ability: Frisk
+|-ability|p1a: Sparky|Lightning Rod
+|move|p2a: Charizard|Flamethrower|p1a: Sparky
+|turn|2"""
+
+
+class TestUsageStats(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'res', 'usage.sqlite3')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_top_is_kept_in_order(self):
+        stats = UsageStats(top_k=2)
+        for name, count in [('Tackle', 1), ('Ember', 3), ('Growl', 2), ('Tackle', 3)]:
+            stats.observe('Charizard', MOVE, name, count)
+        self.assertEqual(stats.top('charizard', MOVE), [('Tackle', 4), ('Ember', 3)])
+        self.assertEqual(stats.top('Charizard', MOVE, 1), [('Tackle', 4)])
+        self.assertEqual(stats.top('Pikachu', MOVE), [])
+
+    def test_frequency_and_likely_moves(self):
+        stats = UsageStats()
+        for _ in range(4):
+            stats.observe_seen('Charizard')
+        stats.observe('Charizard', MOVE, 'Flamethrower', 4)
+        stats.observe('Charizard', MOVE, 'Roost', 2)
+        stats.observe('Charizard', MOVE, 'Tackle', 0)
+        self.assertEqual(stats.seen('Charizard'), 4)
+        self.assertEqual(stats.frequency('Charizard', MOVE, 'Roost'), 0.5)
+        self.assertEqual(stats.likely_moves('Charizard', set(), 4, 0.2), ['Flamethrower', 'Roost'])
+        self.assertEqual(stats.likely_moves('Charizard', {'Flamethrower'}, 4, 0.2), ['Roost'])
+        self.assertEqual(stats.likely_moves('Charizard', set(), 1, 0.2), ['Flamethrower'])
+        self.assertEqual(stats.likely_moves('Pikachu', set(), 4, 0.2), [])
+
+    def test_merge(self):
+        first, second = UsageStats(), UsageStats()
+        first.observe('Pikachu', MOVE, 'Volt Switch', 2)
+        second.observe('Pikachu', MOVE, 'Volt Switch', 3)
+        second.observe('Pikachu', ITEM, 'Light Ball')
+        first.merge(second)
+        self.assertEqual(first.top('Pikachu', MOVE), [('Volt Switch', 5)])
+        self.assertEqual(first.top('Pikachu', ITEM), [('Light Ball', 1)])
+
+    def test_save_adds_counts_of_every_process(self):
+        first, second = UsageStats(), UsageStats()
+        first.observe('Pikachu', MOVE, 'Volt Switch', 2)
+        second.observe('Pikachu', MOVE, 'Volt Switch', 3)
+        self.assertEqual(first.save(self.path), 1)
+        self.assertEqual(second.save(self.path), 1)
+        # Nothing new to save
+        self.assertEqual(first.save(self.path), 0)
+
+        loaded = UsageStats()
+        self.assertTrue(loaded.load(self.path))
+        self.assertEqual(loaded.top('Pikachu', MOVE), [('Volt Switch', 5)])
+        # Loaded counts aren't saved again
+        self.assertEqual(loaded.save(self.path), 0)
+        self.assertFalse(UsageStats().load(os.path.join(self.directory.name, 'missing.sqlite3')))
+
+    def test_observe_battle_log(self):
+        stats = UsageStats()
+        observe_battle_log(stats, LOG)
+        self.assertEqual(stats.seen('Pikachu'), 1)
+        self.assertEqual(stats.top('Pikachu', MOVE), [('Volt Switch', 1)])
+        self.assertEqual(stats.top('Pikachu', ABILITY), [('Lightning Rod', 1)])
+        self.assertEqual(stats.top('Charizard', ITEM), [('Heavy-Duty Boots', 1)])
+        self.assertEqual(stats.top('Charizard', MOVE), [('Flamethrower', 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
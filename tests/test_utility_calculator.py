@@ -4,10 +4,25 @@ from Engine.utility_calculator import evaluate_attacking_move_utility, evaluate_
 from Engine.pokemon import EnemyPokemon, BotPokemon, create_pokemon_objects_from_json
 from Engine.move import Move, MoveCategory, create_active_moves_list
 from BattleBots.greedy_bot import GreedyBot
+from tests.dex_fixtures import species_entry, use_fixture_provider
+
+def species_with_stats(name: str, types: list[str], hp: int, atk: int, defense: int, spa: int, spd: int, spe: int) -> dict:
+    return dict(species_entry(name, *types),
+                base_stats={'hp': hp, 'atk': atk, 'def': defense, 'spa': spa, 'spd': spd, 'spe': spe})
+
+
+SPECIES = {'Charizard': species_with_stats('Charizard', ['fire', 'flying'], 78, 84, 78, 109, 85, 100),
+           'Persian': species_with_stats('Persian', ['normal'], 65, 70, 60, 65, 65, 115),
+           'Beartic': species_entry('Beartic', 'ice'), 'Zoroark': species_entry('Zoroark', 'dark'),
+           'Tropius': species_entry('Tropius', 'grass', 'flying'),
+           'Ceruledge': species_entry('Ceruledge', 'fire', 'ghost'),
+           'Medicham': species_entry('Medicham', 'fighting', 'psychic'),
+           'Magearna': species_entry('Magearna', 'steel', 'fairy')}
 
 
 class Test(unittest.TestCase):
     def setUp(self):
+        use_fixture_provider(self, SPECIES)
         # Creating a variable that simulating "known_moves"
         self.move1 = Move("Tackle", "40", False)
         self.move2 = Move("Glare", "35", False)
@@ -1,20 +1,24 @@
 """This file includes numerous print statements to facilitate thorough project tracking and monitoring during development."""
-import os
-import time
-from constant_variable import BATTLES, BOT_MODE, FORMATS, ACTION, SELECTED_BOT_TYPE, USERNAME, PASSWORD, PLAYER
-from web_socket.sender import Sender
+import asyncio
+from constant_variable import BOT_MODE, FORMATS, ACTION, SELECTED_BOT_TYPE
 from BattleBots.battle_bot import BattleBot
 from BattleBots.random_bot import RandomBot
 from BattleBots.greedy_bot import GreedyBot
+from BattleBots.learned_bot import LearnedBot
 from web_socket.login import log_in
-import constant_variable
+from web_socket.results_store import BattleRecord
+from Engine.names import to_id
+from Engine.pokemon import parse_details
+from Engine.request import BattleRequest, parse_request
+from Engine.usage_stats import USAGE_STATS, MOVE, ITEM, ABILITY
 
 
-async def handle_showdown_messages(message: str, bot_mode: BOT_MODE):
-    """This function handles all the down messages and sends them to the correct function in the program.
+async def handle_showdown_messages(message: str, session):
+    """This function handles all the down messages of a session and sends them to the correct function in the program.
         If the message is about battle, its sends it to handle_showdown_battle_messages
         Specifically connect, start battling and send messages and commands."""
-    sender = Sender()
+    sender = session.sender
+    bot_mode = session.bot_mode
     room, command, *rest = message.split('|')
     print("room: ", room)
     print("command: ", command)
@@ -22,25 +26,34 @@ async def handle_showdown_messages(message: str, bot_mode: BOT_MODE):
 
     if command == 'challstr':
         # If we got the challstr, we now can log in.
-        await log_in(rest[0], rest[1])
+        await log_in(session, rest[0], rest[1])
 
     elif command == 'updateuser':
-        if USERNAME in rest[0].lower():
-            if bot_mode == BOT_MODE.CHALLENGE_OWNER:
-                await sender.challenge_user(PLAYER, FORMATS[0])
-                constant_variable.CUR_BATTLES_COUNT += 1
+        if session.username.lower() in rest[0].lower():
+            if await session.on_logged_in():
+                # Resumed after a reconnection: the kept battles are rejoined instead of starting new ones
+                pass
+            elif bot_mode == BOT_MODE.CHALLENGE_OWNER:
+                await sender.challenge_user(session.player, FORMATS[0])
             elif bot_mode == BOT_MODE.ACCEPT_CHALLENGE:
-                await sender.accept_challenge(PLAYER)
-                constant_variable.CUR_BATTLES_COUNT += 1
+                await sender.accept_challenge(session.player)
             elif bot_mode == BOT_MODE.SEARCH:
-                await sender.search_game_in_format(FORMATS[0])
-                constant_variable.CUR_BATTLES_COUNT += 1
+                await session.scheduler.fill()
             else:
                 raise ValueError("Illegal mode")
 
+    elif command == 'updatesearch':
+        if session.scheduler is not None:
+            await session.scheduler.on_update_search(rest[0])
+
+    elif command == 'popup':
+        # Refused searches (already searching, too many games, ...) are reported in popups
+        if session.scheduler is not None and session.scheduler.searching:
+            session.scheduler.on_search_refused('|'.join(rest))
+
     elif command == 'deinit':
-        if bot_mode == BOT_MODE.SEARCH and constant_variable.CUR_BATTLES_COUNT < constant_variable.MAX_BATTLES_COUNT:
-            await sender.search_game_in_format(FORMATS[0])
+        if session.scheduler is not None:
+            await session.scheduler.on_battle_ended(room.strip().lstrip('>'))
 
     elif command == 'pm':
         pass
@@ -49,7 +62,7 @@ async def handle_showdown_messages(message: str, bot_mode: BOT_MODE):
         print('***: other')
 
     if "battle" in room:
-        await handle_showdown_battle_messages(message)
+        await handle_showdown_battle_messages(message, session)
 
 
 def create_bot_based_on_type(battle_id, sender):
@@ -57,18 +70,35 @@ def create_bot_based_on_type(battle_id, sender):
         return RandomBot(battle_id, sender)
     elif SELECTED_BOT_TYPE == 'greedy':
         return GreedyBot(battle_id, sender)
+    elif SELECTED_BOT_TYPE == 'learned':
+        return LearnedBot(battle_id, sender)
     else:
         raise ValueError("Invalid BOT TYPE selected in config.ini")
 
 
-async def handle_showdown_battle_messages(message: str):
-    """This function handles messages about a battle"""
+async def handle_showdown_battle_messages(message: str, session):
+    """This function handles messages about a battle of the given session, under the profiler if it's sampled"""
+    battle_id = message.split('\n')[0].split('|')[0].split('>')[1]
+    if '|init|' in message:
+        session.profiler.start_battle(battle_id, SELECTED_BOT_TYPE)
+
+    try:
+        with session.profiler.profile(battle_id):
+            await handle_battle_message_parts(message, session)
+    finally:
+        if get_battle_from_battles(session.battles, battle_id) is None:
+            # The battle has ended (or crushed), so its profile is complete
+            session.profiler.finish_battle(battle_id)
+
+
+async def handle_battle_message_parts(message: str, session):
+    """This function handles the parts of a message about a battle"""
     # Split the message into parts based on newline characters
     message_parts = message.split('\n')
 
-    sender = Sender()
+    sender = session.sender
     battle_id = message_parts[0].split('|')[0].split('>')[1]
-    battle = get_battle_from_battles(BATTLES, battle_id)  # At the start of each iteration, get ref to the given battle
+    battle = get_battle_from_battles(session.battles, battle_id)  # At the start of each iteration, get ref to the given battle
 
     for message_part in message_parts:
         splitted_part = message_part.split('|')
@@ -80,26 +110,44 @@ async def handle_showdown_battle_messages(message: str):
             _, command, *rest = splitted_part
 
             if command == "init":
+                if battle is not None:
+                    # Rejoined after a reconnection: keep the battle and skip the replayed log of the frame
+                    await resume_battle_from_log(battle, session, message_parts)
+                    return
+
                 # Create an object to the battle and append it to BATTLES list
                 battle_id = message_parts[0].split("|")[0].split(">")[1]
                 battle = create_bot_based_on_type(battle_id, sender)
-                BATTLES.append(battle)
+                session.battles.append(battle)
+                session.cur_battles_count += 1
+                if session.scheduler is not None:
+                    await session.scheduler.on_battle_started(battle_id)
 
                 # Alert that the bot in the battle and start the timer
                 await sender.send_message(battle.battle_id, "Hey! The bot has started!")
                 await sender.send_message(battle.battle_id, "/timer on")
 
             elif command == "player":
-                if rest[1] == USERNAME.lower():
+                if rest[1] == session.username.lower():
                     battle.player_id = rest[0]
                     battle.turn = int(rest[0].split('p')[1]) - 1
+                elif len(rest) > 1 and rest[1]:
+                    battle.opponent = rest[1]
 
             elif command == "request":
                 if rest[0] != '':
                     if len(rest[0]) == 1:
-                        await battle.update_bot_team(rest[1].split('\n')[1])
+                        payload = rest[1].split('\n')[1]
                     else:
-                        await battle.update_bot_team(rest[0])
+                        payload = rest[0]
+                    # Decode the request once, and skip it if it's stale or a duplicate
+                    request = parse_request(payload)
+                    if not battle.accept_request(request):
+                        continue
+                    await battle.update_bot_team(request)
+                    if battle.resyncing:
+                        battle.resyncing = False
+                        await resume_battle_from_request(battle, sender, request)
 
             elif command == "teampreview":
                 print("started teampreview")
@@ -107,38 +155,35 @@ async def handle_showdown_battle_messages(message: str):
                 print("end teampreview")
 
             elif command == "turn":
+                battle.turns_played = int(rest[0])
                 if BattleBot.get_lives_count_of_bot_pokemon(battle.bot_team) == 1:
                     # When having 1 left it can't be switched, so move is forced
-                    await battle.make_action(sender, ACTION.MOVE)
-                elif '"maybeTrapped":true' in rest:
-                    await battle.make_action(sender, ACTION.MOVE)
+                    await battle.take_action(sender, ACTION.MOVE)
+                elif battle.request is not None and battle.request.maybe_trapped:
+                    await battle.take_action(sender, ACTION.MOVE)
                 else:
-                    await battle.make_action(sender)
+                    await battle.take_action(sender)
 
             elif command == "callback":
                 if rest[0] == "trapped":
-                    await battle.make_action(sender, ACTION.MOVE)
+                    await battle.take_action(sender, ACTION.MOVE)
 
             elif command == "poke":
                 if battle.player_id not in rest[0]:
                     await battle.update_enemy_team(*extract_argument_for_update_enemy_method(rest))
 
             elif command == "win":
-                await sender.send_message(battle.battle_id, "GG!")
-                await sender.leave(battle.battle_id)
-                BATTLES.remove(battle)
-                if PLAYER.lower() in rest[-1].lower():
-                    result = 'LOST'
-                else:
-                    result = 'WIN'
-                save_battle_res(f'res/{SELECTED_BOT_TYPE}_log.txt', f'{result}, {battle_id}, {USERNAME} vs {PLAYER}')
+                await end_battle(battle, session, rest[0])
+
+            elif command == "tie":
+                await end_battle(battle, session, None)
 
             elif command == "error":
                 # Error doesn't mean necessary a crushed!
                 for r in rest:
                     if "The active Pokémon is trapped" in r:
                         # Handle a case were an ability, move or item forced trapped
-                        await battle.make_action(sender, ACTION.MOVE)
+                        await battle.take_action(sender, ACTION.MOVE)
                         return
                 # Other error msgs that can be handled
                 else:
@@ -150,7 +195,7 @@ async def handle_showdown_battle_messages(message: str):
         except Exception as exception:
             await sender.send_message(battle_id, 'The bot has been crushed')
             await sender.forfeit(battle_id)
-            time.sleep(2)
+            await asyncio.sleep(2)
             raise exception
 
 
@@ -162,13 +207,23 @@ async def handle_actions(battle: BattleBot, command, rest):
 
 
 async def minor_actions(battle, command, rest):
-    pass
+    battle.state.apply(command, rest)
+    if command in ('-item', '-ability') and 1 < len(rest):
+        record_usage(battle, rest[0], ITEM if command == '-item' else ABILITY, rest[1])
 
 
 async def major_actions(battle, command, rest):
-    if command == "switch":
+    # Switches reset the stat stages of the Pokemon that leaves the field, and faints set the health to 0
+    battle.state.apply(command, rest)
+
+    if command in ("switch", "drag"):
         if battle.player_id not in rest[0]:
-            await battle.update_enemy_team(*extract_argument_for_update_enemy_method(rest))
+            arguments = extract_argument_for_update_enemy_method(rest)
+            # Keep the nickname the protocol uses for the Pokemon, e.g. "p2a: Indeedee" for "Indeedee-F"
+            battle.enemy_aliases[to_id(rest[0].split(': ', 1)[-1])] = to_id(arguments[0])
+            if arguments[0] not in battle.enemy_team:
+                USAGE_STATS.observe_seen(arguments[0])
+            await battle.update_enemy_team(*arguments)
             # update enemy
             pass
 
@@ -178,42 +233,104 @@ async def major_actions(battle, command, rest):
         else:
             # Get the current enemy_pokemon reference and updates its known moves.
             enemy_pokemon_name = rest[0][5:]
-            enemy_pokemon = battle.find_enemy_pokemon_by_name(battle.enemy_team.team, enemy_pokemon_name)
+            enemy_pokemon = battle.find_enemy_pokemon_by_name(battle.enemy_team, enemy_pokemon_name,
+                                                              battle.enemy_aliases)
             move_name = rest[1]
             enemy_pokemon.update_enemy_moves(move_name)
+            record_usage(battle, rest[0], MOVE, move_name)
         pass
 
     else:
         pass
 
 
-def save_battle_res(file_path, line_to_add):
-    # Check if the file exists
-    if not os.path.exists(file_path):
-        # If the file doesn't exist, create it
-        with open(file_path, 'w'): pass
+async def end_battle(battle: BattleBot, session, winner):
+    """Leave a finished battle, and keep its result. A None winner means a tie"""
+    await session.sender.send_message(battle.battle_id, "GG!")
+    if winner is None:
+        result = 'TIE'
+    elif winner.lower() == session.username.lower():
+        result = 'WIN'
+    else:
+        result = 'LOST'
+    await leave_battle(battle, session, result)
+
+
+async def abandon_battle(battle: BattleBot, session):
+    """Leave a battle whose handling failed. Its handler forfeited it, so it's kept as lost"""
+    await leave_battle(battle, session, 'LOST')
+    session.profiler.finish_battle(battle.battle_id)
 
-    # Open the file in append mode (a+)
-    with open(file_path, 'a+') as file:
-        # Move the file cursor to the beginning to ensure appending at the end
-        file.seek(0)
 
-        # Check if the file is empty, if so, add a newline
-        if not file.read(1):
-            file.write('\n')
+async def leave_battle(battle: BattleBot, session, result: str):
+    """Leave the room of a battle, drop the battle from the session and keep its result"""
+    battle.stop_speculation()
+    await session.sender.leave(battle.battle_id)
+    session.battles.remove(battle)
+    session.cur_battles_count -= 1
+    if session.results_store is not None:
+        session.results_store.add(create_battle_record(battle, session, result))
+    if session.scheduler is not None:
+        await session.scheduler.on_battle_ended(battle.battle_id)
 
-        # Move the file cursor back to the end
-        file.seek(0, 2)
 
-        # Add the line to the file
-        file.write(line_to_add + '\n')
+async def resume_battle_from_log(battle: BattleBot, session, message_parts: list[str]):
+    """
+    Catch up with a rejoined battle from its replayed log, without applying the log again: the kept objects already
+    know it. Only the turn number is taken, and the battle is ended if it was finished while we were away.
+    """
+    for message_part in message_parts:
+        splitted_part = message_part.split('|')
+        if len(splitted_part) < 3:
+            continue
+        if splitted_part[1] == 'turn':
+            battle.turns_played = int(splitted_part[2])
+        elif splitted_part[1] in ('win', 'tie'):
+            await end_battle(battle, session, splitted_part[2] if splitted_part[1] == 'win' else None)
+            return
+
+
+async def resume_battle_from_request(battle: BattleBot, sender, request: BattleRequest):
+    """
+    Answer the first request of a rejoined battle. Its turn was announced before the reconnection, so the decision
+    is made now unless the request doesn't expect one.
+    """
+    if not request.expects_decision() or request.force_switch is not None:
+        # Nothing to choose, or the forced switch was already made by update_bot_team
+        return
+    await battle.take_action(sender)
+
+
+def create_battle_record(battle: BattleBot, session, result: str) -> BattleRecord:
+    """Collect the data of a finished battle to be kept in the results store"""
+    return BattleRecord(battle_id=battle.battle_id,
+                        bot_type=SELECTED_BOT_TYPE,
+                        username=session.username,
+                        opponent=battle.opponent or session.player,
+                        result=result,
+                        turns=battle.turns_played,
+                        latencies=battle.decision_latencies,
+                        bot_team=[pokemon.name for pokemon in battle.bot_team],
+                        enemy_team=[pokemon.name for pokemon in battle.enemy_team.team])
 
 
 # ----------- Supportive functions ----------- #
 
+def record_usage(battle: BattleBot, ident: str, kind: str, name: str):
+    """Count a move, item or ability revealed by an enemy Pokemon in the usage statistics, once per battle"""
+    if battle.player_id is None or ident.startswith(battle.player_id):
+        return
+    found = battle.resolve_pokemon(ident)
+    if found is None or found[1] is None:
+        return
+    key = (found[1].id, kind, name)
+    if key not in battle.revealed_usage:
+        battle.revealed_usage.add(key)
+        USAGE_STATS.observe(found[1].id, kind, name)
+
+
 def extract_argument_for_update_enemy_method(rest):
-    name = rest[1].split(',')[0].lower()
-    level = rest[1].split(',')[1][2:]
+    name, level = parse_details(rest[1])
     condition = rest[2]
     return name, level, condition
 
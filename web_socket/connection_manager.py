@@ -0,0 +1,73 @@
+"""
+connection_manager.py - Multi Account Host Module
+
+This module provides the ConnectionManager class, which runs one BotSession per configured account inside a single
+event loop.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from constant_variable import Account, BOT_MODE
+from metrics import LIVE_BATTLES, BATTLES_MEMORY
+from Engine.footprint import battle_footprint, footprint_report
+from web_socket.login import LoginClient
+from web_socket.session import BotSession
+from web_socket.results_store import ResultsStore
+from web_socket.profiling import BattleProfiler
+
+
+class ConnectionManager:
+    """
+    Runs several account sessions concurrently, each with its own websocket, sender and battles.
+
+    Attributes:
+        uri (str): URI of the Showdown websocket.
+        sessions (list[BotSession]): A session for every account.
+        login_executor (ThreadPoolExecutor): Runs the logins, with a thread per account so they never wait for each other.
+        results_store (ResultsStore): Where all the sessions keep the results of their battles, or None.
+        profiler (BattleProfiler): Profiles a sample of the battles of all the sessions.
+    """
+
+    def __init__(self, accounts: list[Account], uri: str, bot_mode: BOT_MODE, results_store: ResultsStore = None,
+                 profiler: BattleProfiler = None):
+        if not accounts:
+            raise ValueError("At least one account is needed to run the bot")
+        self.uri = uri
+        self.login_executor = ThreadPoolExecutor(max_workers=len(accounts), thread_name_prefix='login')
+        self.results_store = results_store
+        self.profiler = profiler if profiler is not None else BattleProfiler()
+        self.sessions = [BotSession(account, bot_mode, LoginClient(executor=self.login_executor), results_store,
+                                    self.profiler)
+                         for account in accounts]
+        LIVE_BATTLES.set_function(lambda: len(self.get_battles()))
+        BATTLES_MEMORY.set_function(lambda: sum(battle_footprint(battle).bytes for battle in self.get_battles()))
+
+    def get_battles(self) -> list:
+        """
+        Get all the battles that are played by all the sessions.
+        """
+        return [battle for session in self.sessions for battle in session.battles]
+
+    def memory_report(self) -> str:
+        """
+        Get a report of the memory held by every live battle of all the sessions.
+        """
+        return footprint_report(self.get_battles())
+
+    async def run(self):
+        """
+        Run all the sessions until they end. A crushed session doesn't stop the others.
+        """
+        if self.results_store is not None:
+            self.results_store.start()
+        try:
+            results = await asyncio.gather(*(session.run(self.uri) for session in self.sessions),
+                                           return_exceptions=True)
+        finally:
+            for session in self.sessions:
+                session.login_client.close()
+            self.login_executor.shutdown(wait=False)
+            if self.results_store is not None:
+                self.results_store.close()
+        for session, result in zip(self.sessions, results):
+            if isinstance(result, Exception):
+                print(f'Session of {session.username} has ended with an error: {result!r}')
@@ -0,0 +1,198 @@
+"""
+inbound_router.py - Inbound Frames Router Module
+
+This module splits the frames received by a session by room. Every room gets a bounded queue and a consumer of its
+own, so a slow battle (or a chatty lobby) doesn't delay the frames of the other battles.
+
+A frame whose handling fails is reported with its traceback and passed to the error handler of the router, which decides whether the error
+is fatal: a fatal error stops the consumer of the room and is set on the `failed` future of the router.
+"""
+import asyncio
+import sys
+import traceback
+import weakref
+from metrics import INBOUND_QUEUE_DEPTH, INBOUND_DROPPED
+
+BATTLE_QUEUE_SIZE = 64
+GLOBAL_QUEUE_SIZE = 256
+
+# Frames of non battle rooms that are never shed, as the session can't work without them
+CRITICAL_COMMANDS = {'challstr', 'updateuser', 'updatesearch', 'popup', 'nametaken'}
+
+
+class InboundRouter:
+    """
+    Routes the frames of a session to per room queues, each consumed in order by its own task.
+
+    Battle rooms come first: their frames are never dropped (a full battle queue makes the reader wait), and frames of
+    other rooms are handled only while no battle frame is waiting. Under overload, non critical frames of other rooms
+    are dropped.
+
+    Attributes:
+        handler: An async function that handles a single frame.
+        error_handler: An async function called with the room and the exception of a frame whose handling failed, or
+                       None to only report the errors. The exceptions it raises are fatal.
+        battle_queue_size (int): The capacity of the queue of every battle room.
+        global_queue_size (int): The capacity of the queue of every other room.
+        queues (dict[str, asyncio.Queue]): The queue of every room, keyed by room id ('' is the global room).
+        dropped (int): The number of frames that were shed.
+        failed (asyncio.Future): Set to the first fatal error.
+    """
+
+    def __init__(self, handler, error_handler=None, battle_queue_size: int = BATTLE_QUEUE_SIZE,
+                 global_queue_size: int = GLOBAL_QUEUE_SIZE):
+        self.handler = handler
+        self.error_handler = error_handler
+        self.battle_queue_size = battle_queue_size
+        self.global_queue_size = global_queue_size
+        self.queues = {}
+        self.dropped = 0
+        self.failed = asyncio.get_running_loop().create_future()
+        self._consumers = {}
+        self._battles_idle = asyncio.Event()
+        self._battles_idle.set()
+        _routers.add(self)
+
+    def depth(self, room: str) -> int:
+        """
+        Get the number of frames waiting in the queue of a room.
+        """
+        queue = self.queues.get(room)
+        return queue.qsize() if queue is not None else 0
+
+    def battle_backlog(self) -> int:
+        return sum(queue.qsize() for room, queue in self.queues.items() if is_battle_room(room))
+
+    async def route(self, message: str):
+        """
+        Put a frame in the queue of its room. Waits only when a battle queue is full.
+        """
+        room = room_of(message)
+        queue = self._get_queue(room)
+
+        if is_battle_room(room):
+            self._battles_idle.clear()
+            await queue.put(message)
+            return
+
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if command_of(message) in CRITICAL_COMMANDS:
+                await queue.put(message)
+            else:
+                self.dropped += 1
+                INBOUND_DROPPED.inc()
+
+    def _get_queue(self, room: str) -> asyncio.Queue:
+        queue = self.queues.get(room)
+        if queue is None:
+            size = self.battle_queue_size if is_battle_room(room) else self.global_queue_size
+            queue = self.queues[room] = asyncio.Queue(maxsize=size)
+            self._consumers[room] = asyncio.create_task(self._consume(room, queue))
+        return queue
+
+    async def _consume(self, room: str, queue: asyncio.Queue):
+        battle_room = is_battle_room(room)
+        while True:
+            message = await queue.get()
+            if not battle_room:
+                await self._battles_idle.wait()
+
+            try:
+                await self.handler(message)
+            except Exception as exception:
+                print(f'Error while handling a frame of {room or "the global room"}:\n{traceback.format_exc()}',
+                      file=sys.stderr)
+                if not await self._handle_error(room, exception):
+                    return
+            finally:
+                queue.task_done()
+
+            if battle_room:
+                if self.battle_backlog() == 0:
+                    self._battles_idle.set()
+                if is_room_closed(message) and queue.empty():
+                    # The room was left, so its queue and consumer are not needed anymore
+                    del self.queues[room]
+                    del self._consumers[room]
+                    return
+
+    async def _handle_error(self, room: str, exception: Exception) -> bool:
+        """
+        Pass the error of a frame to the error handler.
+
+        Returns:
+            bool: False if the error was fatal, and the consumer of the room must stop.
+        """
+        if self.error_handler is None:
+            return True
+        try:
+            await self.error_handler(room, exception)
+        except Exception as fatal:
+            if not self.failed.done():
+                self.failed.set_exception(fatal)
+            return False
+        return True
+
+    async def join(self):
+        """
+        Wait until every queued frame is handled.
+        """
+        for queue in list(self.queues.values()):
+            await queue.join()
+
+    async def close(self):
+        """
+        Stop all the consumers. Frames that are still queued are discarded, and so is a fatal error nobody waited for
+        (e.g. the failed send of a frame handled while the connection was closing).
+        """
+        consumers = list(self._consumers.values())
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        if self.failed.done():
+            self.failed.exception()
+        else:
+            self.failed.cancel()
+        self._consumers.clear()
+        self.queues.clear()
+        self._battles_idle.set()
+
+
+# The routers of all the sessions, read by the queue depth gauges
+_routers = weakref.WeakSet()
+
+
+def _total_depth(battle_rooms: bool) -> int:
+    return sum(queue.qsize() for router in list(_routers) for room, queue in list(router.queues.items())
+               if is_battle_room(room) == battle_rooms)
+
+
+INBOUND_QUEUE_DEPTH.labels('battle').set_function(lambda: _total_depth(True))
+INBOUND_QUEUE_DEPTH.labels('other').set_function(lambda: _total_depth(False))
+
+
+def room_of(message: str) -> str:
+    """
+    Get the room of a frame, e.g. ">battle-gen9randombattle-1\\n|init|battle" -> "battle-gen9randombattle-1".
+    """
+    if message.startswith('>'):
+        return message[1:message.find('\n')] if '\n' in message else message[1:]
+    return ''
+
+
+def is_battle_room(room: str) -> bool:
+    return room.startswith('battle-')
+
+
+def command_of(message: str) -> str:
+    """
+    Get the command of the first line of a frame that has no room, e.g. "|challstr|4|abc" -> "challstr".
+    """
+    parts = message.split('|', 2)
+    return parts[1] if len(parts) > 1 else ''
+
+
+def is_room_closed(message: str) -> bool:
+    return '\n|deinit' in message
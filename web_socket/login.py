@@ -1,33 +1,146 @@
+"""
+login.py - Showdown Login Module
+
+This module logs accounts in to the Pokémon Showdown server without blocking the event loop. The HTTP calls to the
+login server run on worker threads, through a session that is kept per account so connections and cookies are reused.
+"""
+import asyncio
 import json
-import configparser
-from pathlib import Path
+import random
 import requests
-from web_socket.sender import Sender
-from constant_variable import USERNAME, PASSWORD
 
+LOGIN_URL = 'https://play.pokemonshowdown.com/action.php'
+LOGIN_TIMEOUT = 10.0  # Seconds to wait for the login server on every attempt
+LOGIN_ATTEMPTS = 5
+BACKOFF_BASE = 0.5  # Seconds before the first retry, doubled on every attempt
+BACKOFF_MAX = 30.0
+
+
+class LoginError(RuntimeError):
+    """Raised when the login server refuses to give an assertion, e.g. on a wrong password."""
+
+
+class LoginClient:
+    """
+    Gets login assertions from the Showdown login server (action.php) for a single account.
+
+    The client keeps a requests.Session, so the TCP connection and the session cookie of the login server are reused
+    between logins. Once logged in, a new challstr is answered with an "upkeep" request that uses the cookie, and the
+    password is sent again only when the upkeep is refused.
 
-async def log_in(challid: str, chall: str):
+    Attributes:
+        login_url (str): The URL of action.php.
+        timeout (float): Seconds to wait for every HTTP request.
+        attempts (int): How many times a failing request is tried before giving up.
+        backoff_base (float): The base delay of the exponential backoff, in seconds.
+        backoff_max (float): The longest delay between two attempts, in seconds.
+        executor: The executor running the HTTP requests, or None to use the loop's default one.
+    """
+
+    def __init__(self, login_url: str = LOGIN_URL, timeout: float = LOGIN_TIMEOUT, attempts: int = LOGIN_ATTEMPTS,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX, executor=None):
+        self.login_url = login_url
+        self.timeout = timeout
+        self.attempts = attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.executor = executor
+        self.http = requests.Session()
+        self.logged_in_as = None
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Get a jittered delay before the next attempt ("full jitter"), so many accounts don't retry all together.
+
+        Args:
+            attempt (int): The index of the attempt that has just failed, starting by 0.
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, data: dict) -> dict:
+        """
+        Send a blocking POST request to action.php and decode its answer.
+
+        Raises:
+            requests.RequestException: If the request fails or times out.
+            ValueError: If the answer is not a valid JSON.
+        """
+        resp = self.http.post(self.login_url, data=data, timeout=self.timeout)
+        resp.raise_for_status()
+        # The answers of action.php start with ']' to avoid JSON hijacking
+        text = resp.text[1:] if resp.text.startswith(']') else resp.text
+        return json.loads(text)
+
+    def request_assertion(self, username: str, password: str, challstr: str) -> str:
+        """
+        Get an assertion for the given challstr, preferring the cookie of a previous login over the password.
+        """
+        if self.logged_in_as == username:
+            assertion = self.post({'act': 'upkeep', 'challstr': challstr}).get('assertion')
+            if is_valid_assertion(assertion):
+                return assertion
+
+        data = self.post({'act': 'login', 'name': username, 'pass': password, 'challstr': challstr})
+        assertion = data.get('assertion')
+        if not data.get('actionsuccess') or not is_valid_assertion(assertion):
+            self.logged_in_as = None
+            raise LoginError(f'Login of {username} was refused: {assertion}')
+
+        self.logged_in_as = username
+        return assertion
+
+    async def get_assertion(self, username: str, password: str, challstr: str) -> str:
+        """
+        Get an assertion without blocking the event loop, retrying with a jittered exponential backoff.
+
+        Args:
+            username (str): The name of the account.
+            password (str): The password of the account.
+            challstr (str): The challstr sent by the server, "<challid>|<chall>".
+
+        Returns:
+            str: The assertion to send with /trn.
+
+        Raises:
+            LoginError: If the login was refused, or the server couldn't be reached after all the attempts.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.attempts):
+            try:
+                return await loop.run_in_executor(self.executor, self.request_assertion, username, password, challstr)
+            except (requests.RequestException, ValueError) as exception:
+                if attempt + 1 == self.attempts:
+                    raise LoginError(f'Login of {username} failed after {self.attempts} attempts') from exception
+                delay = self.backoff_delay(attempt)
+                print(f'Login of {username} failed ({exception!r}), retrying in {delay:.2f}s')
+                await asyncio.sleep(delay)
+
+    def close(self):
+        self.http.close()
+
+
+def is_valid_assertion(assertion) -> bool:
+    """Errors of the login server come back as assertions that start with ';'."""
+    return bool(assertion) and not assertion.startswith(';')
+
+
+async def log_in(session, challid: str, chall: str):
     """
     Log in to the Pokémon Showdown server.
 
-    This function performs the login process to connect to the Pokémon Showdown server
+    This function performs the login process of the session's account to connect to the Pokémon Showdown server
     using the provided challenge ID and challenge.
     """
-    sender = Sender()
-
-    # Send a POST request to log in with the provided credentials
-    resp = requests.post(
-        'https://play.pokemonshowdown.com/action.php?',
-        data={
-            'act': 'login',
-            'name': USERNAME,
-            'pass': PASSWORD,
-            'challstr': f'{challid}%7C{chall}'
-        }
-    )
+    sender = session.sender
+
+    # Get an assertion for the challenge, without blocking the other sessions
+    assertion = await session.login_client.get_assertion(session.username, session.password, f'{challid}|{chall}')
 
     # Log in with the generated assertion
-    await sender.send_message('', f'/trn {USERNAME},0,{json.loads(resp.text[1:])["assertion"]}')
+    await sender.send_message('', f'/trn {session.username},0,{assertion}')
 
     # Change the user's avatar (optional)
     await sender.send_message('', '/avatar aaron')
@@ -1,24 +1,51 @@
 import asyncio
-from datetime import datetime
-from web_socket.sender import Sender
-import websockets
-from web_socket.communication_manager import handle_showdown_messages
-from constant_variable import get_bot_mode, URI
+from BattleBots.decision_executor import create_executor, set_executor, shutdown_executor
+from Engine.data_provider import create_provider, index_names, set_provider
+from Engine.snapshot import load_snapshot, write_snapshot
+from Engine.usage_stats import USAGE_STATS
+from web_socket.connection_manager import ConnectionManager
+from web_socket.results_store import ResultsStore
+from web_socket.metrics_server import start_metrics_server
+from web_socket.profiling import BattleProfiler
+from constant_variable import get_bot_mode, URI, ACCOUNTS, RESULTS_PATH, METRICS_ENABLED, METRICS_HOST, METRICS_PORT, \
+    PROFILING_ENABLED, PROFILING_SAMPLE_RATE, PROFILING_TRACEMALLOC, PROFILING_DIRECTORY, SNAPSHOT_PATH, \
+    SNAPSHOT_WRITE_ON_EXIT, USAGE_STATS_PATH, DATA_PROVIDER, DATA_BUNDLE_PATH, DECISION_EXECUTOR, DECISION_WORKERS
 
 
 async def main():
     """
-    Loading function. Connect websocket then launch bot.
+    Loading function. Connect a websocket for every configured account then launch the bots.
     """
 
     bot_mode = get_bot_mode()
+    set_provider(create_provider(DATA_PROVIDER, DATA_BUNDLE_PATH))
+    set_executor(create_executor(DECISION_EXECUTOR, DECISION_WORKERS))
 
-    async with websockets.connect(URI) as web_socket:
-        Sender(web_socket)
-        while True:
-            message = await web_socket.recv()
-            print(f'[{datetime.now().replace(microsecond=0).isoformat()}] << {message}')
-            await handle_showdown_messages(message, bot_mode=bot_mode)
+    # Start warm: the data resolved by previous runs is loaded before connecting
+    if SNAPSHOT_PATH:
+        load_snapshot(SNAPSHOT_PATH)
+    if USAGE_STATS_PATH:
+        USAGE_STATS.load(USAGE_STATS_PATH)
+    # After the snapshot, which holds the key lists of the data API
+    index_names()
+
+    metrics_server = None
+    if METRICS_ENABLED:
+        metrics_server = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+
+    profiler = BattleProfiler(PROFILING_ENABLED, PROFILING_SAMPLE_RATE, PROFILING_TRACEMALLOC, PROFILING_DIRECTORY)
+
+    manager = ConnectionManager(ACCOUNTS, URI, bot_mode, ResultsStore(RESULTS_PATH), profiler)
+    try:
+        await manager.run()
+    finally:
+        shutdown_executor()
+        if metrics_server is not None:
+            metrics_server.close()
+        if USAGE_STATS_PATH:
+            USAGE_STATS.save(USAGE_STATS_PATH)
+        if SNAPSHOT_PATH and SNAPSHOT_WRITE_ON_EXIT:
+            write_snapshot(SNAPSHOT_PATH)
 
 
 # Press the green button in the gutter to run the script.
@@ -0,0 +1,123 @@
+"""
+matchmaking.py - Ladder Search Scheduler Module
+
+This module keeps a session searching for ladder games. It holds a target number of searches and battles in flight,
+spread across several formats, requeues as soon as a slot frees up and backs off when the server refuses a search.
+"""
+import asyncio
+import json
+import random
+
+BACKOFF_BASE = 2.0  # Seconds before the first retry of a refused search, doubled on every refusal
+BACKOFF_MAX = 120.0
+
+
+class LadderScheduler:
+    """
+    Schedules the ladder searches of a single session.
+
+    Showdown allows one search per format at a time, so the formats are searched round-robin: a format is searched
+    again once its search turns into a battle. The server's "updatesearch" messages are the source of truth for what
+    is searched and played; the scheduler only adds what it has sent since.
+
+    Attributes:
+        sender (Sender): Sends the searches of the session.
+        formats (list[str]): The formats to search in.
+        target (int): How many searches and battles should be in flight together.
+        searching (set[str]): The formats with a search in flight.
+        battles (set[str]): The ids of the battles in flight.
+    """
+
+    def __init__(self, sender, formats: list[str], target: int, backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX):
+        if not formats:
+            raise ValueError("At least one format is needed to search for games")
+        self.sender = sender
+        self.formats = list(formats)
+        self.target = target
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.searching = set()
+        self.battles = set()
+        self._next_format = 0
+        self._failures = 0
+        self._retry_task = None
+
+    def in_flight(self) -> int:
+        return len(self.searching) + len(self.battles)
+
+    def is_backing_off(self) -> bool:
+        return self._retry_task is not None and not self._retry_task.done()
+
+    async def fill(self):
+        """
+        Send searches until the target is reached or every format is already searched.
+        """
+        if self.is_backing_off():
+            return
+
+        while self.in_flight() < self.target:
+            battle_format = self._pick_format()
+            if battle_format is None:
+                break
+            self.searching.add(battle_format)
+            await self.sender.search_game_in_format(battle_format)
+
+    def _pick_format(self):
+        for _ in range(len(self.formats)):
+            battle_format = self.formats[self._next_format]
+            self._next_format = (self._next_format + 1) % len(self.formats)
+            if battle_format not in self.searching:
+                return battle_format
+        return None
+
+    async def on_update_search(self, data: str):
+        """
+        Sync with the server's view of our searches and games, then fill the free slots.
+
+        Args:
+            data (str): The JSON of an "updatesearch" message, e.g. '{"searching":[],"games":{"battle-...":"..."}}'.
+        """
+        search_state = json.loads(data)
+        self.searching = set(search_state.get('searching') or [])
+        self.battles = set(search_state.get('games') or {})
+        await self.fill()
+
+    async def on_battle_started(self, battle_id: str):
+        self.battles.add(battle_id)
+        self.searching.discard(format_of_battle(battle_id))
+        self._failures = 0
+        await self.fill()
+
+    async def on_battle_ended(self, battle_id: str):
+        self.battles.discard(battle_id)
+        await self.fill()
+
+    def on_search_refused(self, reason: str):
+        """
+        Forget the searches that weren't confirmed and retry them after a jittered exponential backoff.
+
+        Args:
+            reason (str): The text of the server's popup.
+        """
+        self.searching.clear()
+        delay = random.uniform(0.5, 1.0) * min(self.backoff_max, self.backoff_base * 2 ** self._failures)
+        self._failures += 1
+        print(f'Search was refused ({reason}), retrying in {delay:.1f}s')
+
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+        self._retry_task = asyncio.create_task(self._retry_later(delay))
+
+    async def _retry_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._retry_task = None
+        await self.fill()
+
+
+def format_of_battle(battle_id: str) -> str:
+    """
+    Get the format of a battle from its id, e.g. "battle-gen9randombattle-1234" -> "gen9randombattle".
+    """
+    parts = battle_id.split('-')
+    return parts[1] if 3 <= len(parts) else ''
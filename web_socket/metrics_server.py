@@ -0,0 +1,46 @@
+"""
+metrics_server.py - Metrics Endpoint Module
+
+This module serves the bot's metrics over a small local HTTP endpoint, in the Prometheus text format.
+"""
+import asyncio
+from metrics import REGISTRY, Registry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+async def start_metrics_server(host: str, port: int, registry: Registry = REGISTRY) -> asyncio.AbstractServer:
+    """
+    Start serving the metrics of the registry on http://<host>:<port>/metrics.
+
+    Args:
+        host (str): The address to listen on, keep it local.
+        port (int): The port to listen on.
+        registry (Registry): The metrics to serve.
+
+    Returns:
+        asyncio.AbstractServer: The running server, to be closed by the caller.
+    """
+
+    async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # Skip the headers of the request
+            while (await reader.readline()).strip():
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', registry.render().encode()
+            else:
+                status, body = '404 Not Found', b'Not Found\n'
+
+            writer.write(f'HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n'
+                         f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_client, host, port)
+    print(f'Metrics are served on http://{host}:{port}/metrics')
+    return server
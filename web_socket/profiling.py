@@ -0,0 +1,134 @@
+"""
+profiling.py - Battle Profiling Module
+
+This module profiles a sample of the battles. The message handling of a sampled battle (which includes its make_action
+calls) runs under cProfile, and optionally under tracemalloc. When the battle ends, a profile and an allocation report
+tagged with the battle id and the bot type are written to disk.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import tracemalloc
+from contextlib import contextmanager
+
+REPORT_LINES = 40  # Functions and allocation sites listed in a report
+
+
+class BattleProfile:
+    """
+    The profiling data of a single battle.
+
+    Attributes:
+        battle_id (str): The identifier of the battle.
+        bot_type (str): The type of the bot playing the battle.
+        profiler (cProfile.Profile): Collects the calls of the battle.
+        start_snapshot: The tracemalloc snapshot from the start of the battle, or None if memory isn't traced.
+    """
+
+    def __init__(self, battle_id: str, bot_type: str, trace_memory: bool):
+        self.battle_id = battle_id
+        self.bot_type = bot_type
+        self.profiler = cProfile.Profile()
+        self.start_snapshot = tracemalloc.take_snapshot() if trace_memory else None
+
+
+class BattleProfiler:
+    """
+    Decides which battles are profiled and writes their reports.
+
+    Only one battle can be profiled at a time: cProfile can't nest, so while one sampled battle is handled, others are
+    not profiled. Coroutines of other battles that run while a sampled battle awaits are counted in its profile.
+
+    Attributes:
+        enabled (bool): Whether battles are profiled at all.
+        sample_rate (float): The share of the battles that are profiled, between 0 and 1.
+        trace_memory (bool): Whether tracemalloc reports are made as well.
+        directory (str): Where the reports are written.
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 1.0, trace_memory: bool = False,
+                 directory: str = 'profiles'):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.trace_memory = trace_memory
+        self.directory = directory
+        self.profiles = {}
+        self._active = None
+        self._started_tracemalloc = False
+
+    def start_battle(self, battle_id: str, bot_type: str) -> bool:
+        """
+        Decide if a new battle is profiled.
+
+        Returns:
+            bool: True if the battle is profiled.
+        """
+        if not self.enabled or battle_id in self.profiles or self.sample_rate <= random.random():
+            return False
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        self.profiles[battle_id] = BattleProfile(battle_id, bot_type, self.trace_memory)
+        return True
+
+    @contextmanager
+    def profile(self, battle_id: str):
+        """
+        Profile the code run inside the context, if the battle is sampled and no other battle is being profiled.
+        """
+        battle_profile = self.profiles.get(battle_id)
+        if battle_profile is None or self._active is not None:
+            yield
+            return
+
+        self._active = battle_profile
+        battle_profile.profiler.enable()
+        try:
+            yield
+        finally:
+            battle_profile.profiler.disable()
+            self._active = None
+
+    def finish_battle(self, battle_id: str):
+        """
+        Write the reports of a profiled battle, and forget it.
+        """
+        battle_profile = self.profiles.pop(battle_id, None)
+        if battle_profile is None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        base_path = os.path.join(self.directory, f'{battle_profile.bot_type}_{battle_profile.battle_id}')
+        battle_profile.profiler.dump_stats(base_path + '.prof')
+
+        with open(base_path + '.txt', 'w') as report:
+            report.write(create_profile_report(battle_profile))
+
+        if self._started_tracemalloc and not self.profiles:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        print(f'Profile of {battle_id} was written to {base_path}.prof')
+
+
+def create_profile_report(battle_profile: BattleProfile) -> str:
+    """
+    Create a text report of the slowest functions of the battle, and of its allocations when memory is traced.
+    """
+    stream = io.StringIO()
+    stream.write(f'Battle: {battle_profile.battle_id}\nBot type: {battle_profile.bot_type}\n\n')
+
+    stats = pstats.Stats(battle_profile.profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LINES)
+
+    if battle_profile.start_snapshot is not None and tracemalloc.is_tracing():
+        stream.write('\nAllocations since the start of the battle:\n')
+        differences = tracemalloc.take_snapshot().compare_to(battle_profile.start_snapshot, 'lineno')
+        for difference in differences[:REPORT_LINES]:
+            stream.write(f'{difference}\n')
+
+    return stream.getvalue()
@@ -0,0 +1,205 @@
+"""
+results_store.py - Battle Results Store Module
+
+This module stores the result of every battle in a SQLite database in WAL mode. Records are queued by the event loop
+and written in batches by a background thread, so finishing a battle never waits for the disk. A record that can't be
+written is reported and dropped, and the writer goes on with the other records.
+"""
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from typing import NamedTuple
+
+BATCH_SIZE = 256  # Most records written in a single transaction
+FLUSH_INTERVAL = 1.0  # Seconds a record may wait in the queue before it's written
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS battles (
+    id INTEGER PRIMARY KEY,
+    battle_id TEXT NOT NULL,
+    bot_type TEXT NOT NULL,
+    username TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    result TEXT NOT NULL,
+    turns INTEGER NOT NULL,
+    decisions INTEGER NOT NULL,
+    avg_latency REAL,
+    max_latency REAL,
+    latencies TEXT NOT NULL,
+    bot_team TEXT NOT NULL,
+    enemy_team TEXT NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS battles_by_bot_type ON battles (bot_type, result);
+CREATE INDEX IF NOT EXISTS battles_by_finish ON battles (finished_at);
+"""
+
+_INSERT = ('INSERT INTO battles (battle_id, bot_type, username, opponent, result, turns, decisions, avg_latency, '
+           'max_latency, latencies, bot_team, enemy_team, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+
+
+class BattleRecord(NamedTuple):
+    """The result of a single battle."""
+    battle_id: str
+    bot_type: str
+    username: str
+    opponent: str
+    result: str  # 'WIN', 'LOST' or 'TIE'
+    turns: int
+    latencies: list[float]  # Seconds taken by every decision of the bot
+    bot_team: list[str]
+    enemy_team: list[str]
+    finished_at: float = 0.0
+
+
+class ResultsStore:
+    """
+    Append-only store of battle results with a background writer.
+
+    Attributes:
+        path (str): The path of the SQLite database.
+        batch_size (int): The most records written in a single transaction.
+        flush_interval (float): Seconds a record may wait before it's written.
+    """
+    _STOP = object()
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._writer = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        connection.executescript(_SCHEMA)
+        connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def start(self):
+        """
+        Start the background writer. Records added before the start are kept in the queue.
+        """
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name='results-writer', daemon=True)
+            self._writer.start()
+
+    def add(self, record: BattleRecord):
+        """
+        Queue a record to be written. Never blocks.
+        """
+        if not record.finished_at:
+            record = record._replace(finished_at=time.time())
+        self._queue.put_nowait(record)
+
+    def close(self):
+        """
+        Write all the queued records and stop the background writer.
+        """
+        if self._writer is not None:
+            self._queue.put(self._STOP)
+            self._writer.join()
+            self._writer = None
+
+    def _write_loop(self):
+        connection = self._connect()
+        stopped = False
+        while not stopped:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Collect whatever else is already waiting, up to a full batch
+            while True:
+                if item is self._STOP:
+                    stopped = True
+                    break
+                batch.append(item)
+                if len(batch) == self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(connection, batch)
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: list[BattleRecord]):
+        """
+        Write a batch of records in a single transaction. If the batch fails, it is rolled back and its records are
+        written one by one, so only the records that can't be written are dropped and the writer keeps running.
+        """
+        try:
+            with connection:
+                connection.executemany(_INSERT, [record_to_row(record) for record in batch])
+            return
+        except (sqlite3.Error, TypeError, ValueError):
+            pass
+        for record in batch:
+            try:
+                with connection:
+                    connection.execute(_INSERT, record_to_row(record))
+            except (sqlite3.Error, TypeError, ValueError):
+                print(f'The result of {record.battle_id} could not be written to {self.path} and was dropped:\n'
+                      f'{traceback.format_exc()}', file=sys.stderr)
+
+    # ----------- Queries ----------- #
+
+    def count(self) -> int:
+        """
+        Get the number of stored battles.
+        """
+        connection = self._connect()
+        try:
+            return connection.execute('SELECT COUNT(*) FROM battles').fetchone()[0]
+        finally:
+            connection.close()
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Aggregate the stored battles of every bot type.
+
+        Returns:
+            dict[str, dict]: For every bot type, its number of games, wins, win rate, average turns and average
+            decision latency.
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT bot_type, COUNT(*), SUM(result = 'WIN'), AVG(turns), "
+                "SUM(avg_latency * decisions) / NULLIF(SUM(decisions), 0) "
+                "FROM battles GROUP BY bot_type").fetchall()
+        finally:
+            connection.close()
+
+        return {bot_type: {'games': games,
+                           'wins': wins,
+                           'win_rate': wins / games,
+                           'avg_turns': avg_turns,
+                           'avg_latency': avg_latency}
+                for bot_type, games, wins, avg_turns, avg_latency in rows}
+
+
+def record_to_row(record: BattleRecord) -> tuple:
+    latencies = record.latencies
+    avg_latency = sum(latencies) / len(latencies) if latencies else None
+    max_latency = max(latencies) if latencies else None
+    return (record.battle_id, record.bot_type, record.username, record.opponent, record.result, record.turns,
+            len(latencies), avg_latency, max_latency, json.dumps(latencies), json.dumps(record.bot_team),
+            json.dumps(record.enemy_team), record.finished_at)
@@ -6,44 +6,31 @@ This module provides a class for sending messages and commands to the Pokemon Sh
 Example:
     To use the Sender class to send a challenge to another user:
     ```
-    sender = Sender()  # Initialize the Sender instance
+    sender = Sender(web_socket)  # Initialize a Sender bound to an open websocket
     await sender.challenge_user("opponent_username", "gen9ou")  # Challenge the user to a Gen 9 OU battle
     ```
 """
 from datetime import datetime
+from metrics import FRAMES_SENT
 
 
 class Sender:
-    def __new__(cls, _=None):
+    def __init__(self, web_socket):
         """
-        Initialize a new Sender instance if it doesn't already exist.
+        Initialize the Sender instance with the WebSocket it writes to.
 
-        Args:
-            cls: The Sender class.
-            _: Placeholder argument for class instantiation.
-
-        Returns:
-            Sender: A Sender instance.
-        """
-        if not hasattr(cls, 'instance'):
-            cls.instance = super(Sender, cls).__new__(cls)
-        return cls.instance
-
-    def __init__(self, web_socket=None):
-        """
-        Initialize the Sender instance with an optional WebSocket.
+        Every account session owns its own Sender, so several connections can live in the same process.
 
         Args:
             self: The Sender instance.
-            web_socket (optional): A WebSocket connection.
+            web_socket: A WebSocket connection.
 
         Raises:
             ValueError: If the 'web_socket' field is not initialized.
         """
-        if not hasattr(self, 'web_socket'):
-            self.web_socket = web_socket
-        if not self.web_socket:
-            raise ValueError('Field "web_socket" needs to be initialized at least one time.')
+        if not web_socket:
+            raise ValueError('Field "web_socket" needs to be initialized.')
+        self.web_socket = web_socket
 
     async def send_message(self, room: str, *messages: str):
         """
@@ -57,6 +44,7 @@ class Sender:
         string = f'{room}|{"|".join(messages)}'
         print(f'[{datetime.now().replace(microsecond=0).isoformat()}] >> {string}')
         await self.web_socket.send(string)
+        FRAMES_SENT.inc()
 
     async def search_game_in_format(self, battle_format: str):
         """
@@ -136,17 +124,3 @@ class Sender:
         """
         await self.send_message(battle_tag, '/forfeit')
         await self.leave(battle_tag)
-
-    @classmethod
-    def get_instance(cls):
-        """
-        Get the singleton instance of the Sender class.
-
-        Args:
-            cls: The Sender class.
-
-        Returns:
-            Sender: The Sender instance.
-        """
-        return cls.instance
-
@@ -0,0 +1,173 @@
+"""
+session.py - Account Session Module
+
+This module provides the BotSession class, which bundles everything a single Showdown account needs: its own
+websocket, Sender and the battles it is currently playing.
+"""
+import asyncio
+import random
+import time
+from datetime import datetime
+import websockets
+from constant_variable import Account, BOT_MODE, FORMATS, MAX_BATTLES_COUNT
+from metrics import FRAMES_RECEIVED, RECONNECTS, RECONNECT_DURATION
+from web_socket.sender import Sender
+from web_socket.login import LoginClient, LoginError
+from web_socket.results_store import ResultsStore
+from web_socket.profiling import BattleProfiler
+from web_socket.matchmaking import LadderScheduler
+from web_socket.inbound_router import InboundRouter, is_battle_room
+from web_socket.communication_manager import handle_showdown_messages, abandon_battle, get_battle_from_battles
+
+RECONNECT_BACKOFF_BASE = 0.5  # Seconds before the first reconnection, doubled on every failed attempt
+RECONNECT_BACKOFF_MAX = 60.0
+
+
+class BotSession:
+    """
+    A single account connected to Showdown.
+
+    Attributes:
+        account (Account): The credentials of the account and the player it stands against.
+        bot_mode (BOT_MODE): How the session starts its battles.
+        web_socket: The websocket of the session, set once connected.
+        sender (Sender): The Sender that writes to the session's websocket.
+        login_client (LoginClient): Gets login assertions for the account, reused on every login.
+        results_store (ResultsStore): Where the results of the finished battles are kept, or None to not keep them.
+        profiler (BattleProfiler): Profiles a sample of the session's battles.
+        scheduler (LadderScheduler): Keeps the session searching for games in search mode, otherwise None.
+        reconnect (bool): Whether the session connects again when its websocket is closed.
+        rejoin_pending (bool): True from a reconnection until the battles of the session are joined again.
+        battles (list): The battles the session is currently playing.
+        cur_battles_count (int): The number of battles the session is currently playing.
+    """
+
+    def __init__(self, account: Account, bot_mode: BOT_MODE, login_client: LoginClient = None,
+                 results_store: ResultsStore = None, profiler: BattleProfiler = None):
+        self.account = account
+        self.bot_mode = bot_mode
+        self.web_socket = None
+        self.sender = None
+        self.login_client = login_client if login_client is not None else LoginClient()
+        self.results_store = results_store
+        self.profiler = profiler if profiler is not None else BattleProfiler()
+        self.scheduler = None
+        self.reconnect = True
+        self.rejoin_pending = False
+        self._disconnected_at = None
+        self.battles = []
+        self.cur_battles_count = 0
+
+    @property
+    def username(self) -> str:
+        return self.account.username
+
+    @property
+    def password(self) -> str:
+        return self.account.password
+
+    @property
+    def player(self) -> str:
+        return self.account.player
+
+    async def run(self, uri: str):
+        """
+        Connect the session's websocket and handle its messages. When the connection drops, or the login fails (e.g.
+        the login server is down), connect again with a jittered exponential backoff, keeping the battles of the
+        session to be resumed.
+
+        Args:
+            uri (str): URI of the Showdown websocket.
+        """
+        failures = 0
+        while True:
+            try:
+                await self.connect(uri)
+                return
+            except (websockets.exceptions.WebSocketException, OSError, LoginError) as exception:
+                if not self.reconnect:
+                    raise
+                if self._disconnected_at is None:
+                    # The session was logged in since the last drop, so this is a new drop
+                    self._disconnected_at = time.perf_counter()
+                    failures = 0
+                    RECONNECTS.inc()
+                else:
+                    failures += 1
+                self.rejoin_pending = bool(self.battles)
+                delay = random.uniform(0, min(RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_BASE * 2 ** failures))
+                print(f'Connection of {self.username} was lost ({exception!r}), reconnecting in {delay:.2f}s')
+                await asyncio.sleep(delay)
+
+    async def connect(self, uri: str):
+        """
+        Connect the session's websocket once, and handle its messages until the connection is closed.
+
+        The Sender (and the scheduler) of the session are kept between connections, so the battles that hold them
+        keep working after a reconnection.
+        """
+        async with websockets.connect(uri) as web_socket:
+            self.web_socket = web_socket
+            if self.sender is None:
+                self.sender = Sender(web_socket)
+            else:
+                self.sender.web_socket = web_socket
+            if self.bot_mode == BOT_MODE.SEARCH and self.scheduler is None:
+                self.scheduler = LadderScheduler(self.sender, FORMATS, MAX_BATTLES_COUNT)
+            router = InboundRouter(self.handle_message, self.handle_error)
+            receiver = asyncio.create_task(self.receive(web_socket, router))
+            try:
+                await asyncio.wait((receiver, router.failed), return_when=asyncio.FIRST_COMPLETED)
+                # Raise whichever ended first: the connection, or a fatal error of a frame
+                (receiver if receiver.done() else router.failed).result()
+            finally:
+                receiver.cancel()
+                await asyncio.gather(receiver, return_exceptions=True)
+                await router.close()
+
+    @staticmethod
+    async def receive(web_socket, router: InboundRouter):
+        while True:
+            message = await web_socket.recv()
+            FRAMES_RECEIVED.inc()
+            await router.route(message)
+
+    async def on_logged_in(self):
+        """
+        Called when the server confirms the login. After a reconnection, the kept battles are joined again; their
+        state is re-synced from the next request of each of them.
+
+        Returns:
+            bool: True if this login resumed the session after a reconnection.
+        """
+        if self._disconnected_at is None:
+            return False
+
+        resumed = self.rejoin_pending
+        if self.rejoin_pending:
+            self.rejoin_pending = False
+            for battle in self.battles:
+                battle.resyncing = True
+                await self.sender.send_message('', f'/join {battle.battle_id}')
+
+        recovery = time.perf_counter() - self._disconnected_at
+        self._disconnected_at = None
+        RECONNECT_DURATION.observe(recovery)
+        print(f'Session of {self.username} recovered in {recovery * 1000:.0f}ms, resuming {len(self.battles)} battles')
+        return resumed
+
+    async def handle_message(self, message: str):
+        print(f'[{datetime.now().replace(microsecond=0).isoformat()}] [{self.username}] << {message}')
+        await handle_showdown_messages(message, self)
+
+    async def handle_error(self, room: str, exception: Exception):
+        """
+        Handle a frame whose handling failed. A failed battle was forfeited by its handler: its room is left and the
+        battle is dropped, while the other battles go on. An error outside of the battles (e.g. a failed login) is
+        fatal to the connection, and is raised again to end it.
+        """
+        if not is_battle_room(room):
+            raise exception
+        battle = get_battle_from_battles(self.battles, room)
+        if battle is not None:
+            await abandon_battle(battle, self)